@@ -0,0 +1,55 @@
+"""add foreign key and lookup indexes
+
+Revision ID: 3f8d0b6c2a17
+Revises: 7c2e9a41d5b3
+Create Date: 2026-10-17 11:02:19.504871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8d0b6c2a17'
+down_revision: Union[str, Sequence[str], None] = '7c2e9a41d5b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns): foreign keys we join on and the columns
+# crud.py looks rows up by
+INDEXES = [
+    ('ix_team_members_participant_id', 'team_members', ['participant_id']),
+    ('ix_team_events_event_id', 'team_events', ['event_id']),
+    ('ix_room_reserved_room_id', 'room_reserved', ['room_id']),
+    ('ix_participants_college_id', 'participants', ['college_id']),
+    ('ix_participants_club_id', 'participants', ['club_id']),
+    ('ix_certificates_participant_id', 'certificates', ['participant_id']),
+    ('ix_certificates_event_id', 'certificates', ['event_id']),
+    ('ix_clubs_college_id', 'clubs', ['college_id']),
+    ('ix_events_fest_id', 'events', ['fest_id']),
+    ('ix_events_name', 'events', ['name']),
+    ('ix_clubs_club_name', 'clubs', ['club_name']),
+    ('ix_colleges_name', 'colleges', ['name']),
+    ('ix_rooms_building_name_room_no', 'rooms', ['building_name', 'room_no']),
+    # Least occupied rooms first, for room allocation
+    ('ix_room_occupancy_current_occupancy', 'room_occupancy', ['current_occupancy', 'room_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    # Rooms that can take anyone at all, by gender, for room allocation
+    op.create_index('ix_rooms_gender_with_capacity', 'rooms', ['gender', 'room_id'], unique=False,
+                    postgresql_where=sa.text('max_capacity > 0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rooms_gender_with_capacity', table_name='rooms',
+                  postgresql_where=sa.text('max_capacity > 0'))
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,42 @@
+"""add trigram indexes for ilike filters
+
+Revision ID: 7c2e9a41d5b3
+Revises: e4f515dfbf0b
+Create Date: 2026-10-17 10:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9a41d5b3'
+down_revision: Union[str, Sequence[str], None] = 'e4f515dfbf0b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, column) for every column filtered with ILIKE '%...%'
+TRIGRAM_INDEXES = [
+    ('ix_colleges_name_trgm', 'colleges', 'name'),
+    ('ix_colleges_city_trgm', 'colleges', 'city'),
+    ('ix_colleges_state_trgm', 'colleges', 'state'),
+    ('ix_events_venue_trgm', 'events', 'venue'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(name, table, [column], unique=False,
+                        postgresql_using='gin',
+                        postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, column in TRIGRAM_INDEXES:
+        op.drop_index(name, table_name=table, postgresql_using='gin')
+    # pg_trgm is left installed: other objects may depend on it
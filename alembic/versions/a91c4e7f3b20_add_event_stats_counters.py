@@ -0,0 +1,45 @@
+"""add event_stats counters
+
+Revision ID: a91c4e7f3b20
+Revises: 3f8d0b6c2a17
+Create Date: 2026-10-17 12:27:51.093362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91c4e7f3b20'
+down_revision: Union[str, Sequence[str], None] = '3f8d0b6c2a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('event_stats',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('team_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('participant_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.event_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    # Backfill from the existing registrations
+    op.execute("""
+        INSERT INTO event_stats (event_id, team_count, participant_count)
+        SELECT e.event_id,
+               count(DISTINCT te.team_id),
+               count(DISTINCT tm.participant_id)
+        FROM events e
+        LEFT JOIN team_events te ON te.event_id = e.event_id
+        LEFT JOIN team_members tm ON tm.team_id = te.team_id
+        GROUP BY e.event_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('event_stats')
@@ -0,0 +1,74 @@
+"""track free room capacity in rooms.has_space
+
+Revision ID: b5e2c8d1f4a7
+Revises: d8f4a2b6e913
+Create Date: 2026-10-17 19:40:27.113904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e2c8d1f4a7'
+down_revision: Union[str, Sequence[str], None] = 'd8f4a2b6e913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = [
+    ("room_occupancy_has_space_insert", "INSERT"),
+    ("room_occupancy_has_space_update", "UPDATE"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('rooms', sa.Column('has_space', sa.Boolean(), server_default=sa.text('true'), nullable=False))
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION room_occupancy_sync_has_space() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE rooms r SET has_space = coalesce(n.current_occupancy, 0) < coalesce(r.max_capacity, 0)
+            FROM (SELECT room_id, current_occupancy FROM new_rows ORDER BY room_id) n
+            WHERE r.room_id = n.room_id
+              AND r.has_space <> (coalesce(n.current_occupancy, 0) < coalesce(r.max_capacity, 0));
+            RETURN NULL;
+        END
+        $$
+    """)
+    for name, operation in TRIGGERS:
+        op.execute(f"""
+            CREATE TRIGGER {name} AFTER {operation} ON room_occupancy
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION room_occupancy_sync_has_space()
+        """)
+
+    # Start from the current counts
+    op.execute("LOCK TABLE room_occupancy IN EXCLUSIVE MODE")
+    op.execute("""
+        UPDATE rooms r SET has_space = coalesce(
+            (SELECT o.current_occupancy FROM room_occupancy o WHERE o.room_id = r.room_id), 0
+        ) < coalesce(r.max_capacity, 0)
+    """)
+
+    # max_capacity > 0 left nearly every room in the old index; this one
+    # only holds rooms with a free bed
+    op.drop_index('ix_rooms_gender_with_capacity', table_name='rooms',
+                  postgresql_where=sa.text('max_capacity > 0'))
+    op.create_index('ix_rooms_gender_with_space', 'rooms', ['gender', 'room_id'], unique=False,
+                    postgresql_where=sa.text('has_space'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rooms_gender_with_space', table_name='rooms',
+                  postgresql_where=sa.text('has_space'))
+    op.create_index('ix_rooms_gender_with_capacity', 'rooms', ['gender', 'room_id'], unique=False,
+                    postgresql_where=sa.text('max_capacity > 0'))
+    for name, _ in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON room_occupancy")
+    op.execute("DROP FUNCTION IF EXISTS room_occupancy_sync_has_space()")
+    op.drop_column('rooms', 'has_space')
@@ -0,0 +1,81 @@
+"""maintain room_occupancy with triggers on room_reserved
+
+Revision ID: c3e1f7a9b250
+Revises: a91c4e7f3b20
+Create Date: 2026-10-17 15:02:11.418530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e1f7a9b250'
+down_revision: Union[str, Sequence[str], None] = 'a91c4e7f3b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = [
+    ("room_reserved_occupancy_insert", "INSERT", "REFERENCING NEW TABLE AS new_rows"),
+    ("room_reserved_occupancy_delete", "DELETE", "REFERENCING OLD TABLE AS old_rows"),
+    ("room_reserved_occupancy_update", "UPDATE", "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION room_reserved_sync_occupancy() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO room_occupancy (room_id, current_occupancy)
+                SELECT room_id, count(*) FROM new_rows GROUP BY room_id ORDER BY room_id
+                ON CONFLICT (room_id) DO UPDATE
+                SET current_occupancy = room_occupancy.current_occupancy + EXCLUDED.current_occupancy;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE room_occupancy o SET current_occupancy = o.current_occupancy - d.n
+                FROM (SELECT room_id, count(*) AS n FROM old_rows GROUP BY room_id ORDER BY room_id) d
+                WHERE o.room_id = d.room_id;
+            ELSE
+                UPDATE room_occupancy o SET current_occupancy = o.current_occupancy + d.n
+                FROM (
+                    SELECT room_id, sum(n) AS n FROM (
+                        SELECT room_id, 1 AS n FROM new_rows
+                        UNION ALL
+                        SELECT room_id, -1 AS n FROM old_rows
+                    ) moves
+                    GROUP BY room_id HAVING sum(n) <> 0 ORDER BY room_id
+                ) d
+                WHERE o.room_id = d.room_id;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    for name, operation, referencing in TRIGGERS:
+        op.execute(f"""
+            CREATE TRIGGER {name} AFTER {operation} ON room_reserved
+            {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION room_reserved_sync_occupancy()
+        """)
+
+    # Start from the true counts (the hand-kept counters may have drifted)
+    op.execute("LOCK TABLE room_reserved, room_occupancy IN EXCLUSIVE MODE")
+    op.execute("""
+        INSERT INTO room_occupancy (room_id, current_occupancy)
+        SELECT r.room_id, count(rr.participant_id)
+        FROM rooms r
+        LEFT JOIN room_reserved rr ON rr.room_id = r.room_id
+        GROUP BY r.room_id
+        ON CONFLICT (room_id) DO UPDATE SET current_occupancy = EXCLUDED.current_occupancy
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _, _ in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON room_reserved")
+    op.execute("DROP FUNCTION IF EXISTS room_reserved_sync_occupancy()")
@@ -0,0 +1,30 @@
+"""add participant phone and email indexes for the merch desk
+
+Revision ID: d8f4a2b6e913
+Revises: c3e1f7a9b250
+Create Date: 2026-10-17 16:40:27.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f4a2b6e913'
+down_revision: Union[str, Sequence[str], None] = 'c3e1f7a9b250'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_participants_phone', 'participants', ['phone'], unique=False)
+    op.create_index('ix_participants_email_lower', 'participants', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_participants_email_lower', table_name='participants')
+    op.drop_index('ix_participants_phone', table_name='participants')
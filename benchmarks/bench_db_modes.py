@@ -0,0 +1,140 @@
+"""
+Compares the sync (threadpool + psycopg2) and async (asyncpg) DB modes.
+
+For each mode it starts `uvicorn main:app` with DB_MODE set, then hammers a
+few read endpoints at several concurrency levels and prints requests/sec and
+latency percentiles. Point it at a seeded database (see seed_db.py) first.
+
+Usage (from the repo root):
+    python benchmarks/bench_db_modes.py
+    python benchmarks/bench_db_modes.py --concurrency 1 16 64 256 --requests 4000
+    python benchmarks/bench_db_modes.py --modes async --out results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The read-heavy mix the dashboard generates on every tab switch
+ENDPOINTS = [
+    "/events/query/?include_stats=true",
+    "/participants/query/?limit=100",
+    "/colleges/query/",
+    "/rooms/occupancy/",
+    "/events/stats/",
+]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_level(base_url: str, concurrency: int, total_requests: int):
+    """Fires total_requests requests with `concurrency` in flight at once."""
+    latencies = []
+    errors = 0
+    counter = iter(range(total_requests))
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        for i in counter:
+            path = ENDPOINTS[i % len(ENDPOINTS)]
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": errors,
+        "rps": total_requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+    }
+
+
+def wait_until_up(base_url: str, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(base_url + "/docs", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"server at {base_url} did not start")
+
+
+def bench_mode(mode: str, args):
+    base_url = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ, DB_MODE=mode)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    try:
+        wait_until_up(base_url)
+        # Warm up the pools and caches before measuring
+        asyncio.run(run_level(base_url, 8, 200))
+        results = []
+        for concurrency in args.concurrency:
+            result = asyncio.run(run_level(base_url, concurrency, args.requests))
+            result["mode"] = mode
+            results.append(result)
+            print(
+                f"{mode:>5}  c={concurrency:<4} {result['rps']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  "
+                f"errors {result['errors']}"
+            )
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    all_results = []
+    for mode in args.modes:
+        all_results.extend(bench_mode(mode, args))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(all_results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
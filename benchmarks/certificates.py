@@ -0,0 +1,64 @@
+"""
+Measures how certificate rendering scales with worker processes.
+
+Renders N synthetic certificates (20,000 by default) through
+certificates.stream_zip() with 1, 2, 4 ... up to one worker per CPU core,
+and prints certificates/sec for each pool size. Throughput should grow
+close to linearly until the workers run out of cores. No database needed.
+
+Usage (from the repo root):
+    python benchmarks/certificates.py
+    python benchmarks/certificates.py --count 50000 --workers 1 4 8
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import certificates  # noqa: E402
+
+
+def synthetic_rows(count: int):
+    for i in range(1, count + 1):
+        yield {
+            "certificate_id": i,
+            "certificate_type": "participation",
+            "participant_name": f"Participant Number {i}",
+            "college": f"College of Engineering {i % 250}",
+            "event_name": f"Event {i % 40}",
+            "event_date": date(2025, 12, 1 + i % 3),
+            "fest_name": "Techfest",
+            "fest_year": 2025,
+        }
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, *(2 ** k for k in range(1, cores.bit_length()) if 2 ** k < cores), cores})
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    args = parser.parse_args()
+
+    template = certificates.load_template()
+    print(f"{args.count} certificates, {cores} CPU core(s)\n")
+    print(f"{'workers':>8}{'seconds':>10}{'certs/s':>10}{'speedup':>10}{'zip MB':>9}")
+    baseline = None
+    for workers in args.workers:
+        with certificates.make_pool(workers) as pool:
+            # Start the workers before timing (spawning costs ~1 s)
+            list(pool.map(certificates.render_batch, [template] * workers, [[]] * workers))
+            started = time.perf_counter()
+            size = sum(len(chunk) for chunk in certificates.stream_zip(synthetic_rows(args.count), template, pool))
+            elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"{workers:>8}{elapsed:>10.2f}{args.count / elapsed:>10.0f}{baseline / elapsed:>9.1f}x"
+              f"{size / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Fails if a crud.py lookup sequentially scans a large table.
+
+Calls the lookup, listing and room-allocation functions from crud.py,
+captures every SELECT they send, and runs EXPLAIN on it. Any Seq Scan on
+a table with at least --min-rows rows (per pg_class statistics) is
+reported, and the script exits 1.
+
+Use --seed N to fill an EMPTY scratch database with N participants and
+proportionate teams, events, colleges, clubs, rooms and certificates.
+With tiny tables the planner rightly prefers sequential scans.
+
+Usage (from the repo root):
+    python benchmarks/explain_crud_queries.py --seed 200000
+    python benchmarks/explain_crud_queries.py --min-rows 5000 --verbose
+"""
+import argparse
+import os
+import sys
+
+from sqlalchemy import event, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crud  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from pagination import Page  # noqa: E402
+
+PAGE = Page(limit=100, cursor=None, include_total=False)
+
+# (label, call) pairs; `ids` holds sample keys picked from the database
+CASES = [
+    ("get_college_by_name", lambda db, ids: crud.get_college_by_name(db, name=ids["college_name"])),
+    ("get_club_by_name", lambda db, ids: crud.get_club_by_name(db, name=ids["club_name"])),
+    ("get_event_by_name", lambda db, ids: crud.get_event_by_name(db, name=ids["event_name"])),
+    ("get_room_by_details", lambda db, ids: crud.get_room_by_details(
+        db, building_name=ids["building_name"], room_no=ids["room_no"])),
+    ("get_event_stats", lambda db, ids: crud.get_event_stats(db, event_id=ids["event_id"])),
+    ("get_teams_for_event", lambda db, ids: crud.get_teams_for_event(db, event_id=ids["event_id"], page=PAGE)),
+    ("get_participants_from_team", lambda db, ids: crud.get_participants_from_team(db, team_id=ids["team_id"])),
+    ("get_participants_by_room", lambda db, ids: crud.get_participants_by_room(db, room_id=ids["room_id"], page=PAGE)),
+    ("participants by event", lambda db, ids: crud.get_participants_by_filters(
+        db, college_name=None, club_id=None, gender=None, state=None, city=None,
+        event_id=ids["event_id"], page=PAGE)),
+    ("participants by club", lambda db, ids: crud.get_participants_by_filters(
+        db, college_name=None, club_id=ids["club_id"], gender=None, state=None, city=None,
+        event_id=None, page=PAGE)),
+    ("_lock_rooms_with_space", lambda db, ids: crud._lock_rooms_with_space(
+        db, gender="MALE", needed=4, skip_locked=True)),
+    ("merch lookup by phone", lambda db, ids: crud.find_participants_for_merch(
+        db, phone=ids["phone"], email=None, page=PAGE)),
+    ("merch lookup by email", lambda db, ids: crud.find_participants_for_merch(
+        db, phone=None, email=ids["email"].upper(), page=PAGE)),
+]
+
+
+def seed(participants: int):
+    """Fills an empty database with generate_series; ids are assigned explicitly."""
+    teams = participants // 4
+    rooms = participants // 4
+    colleges = max(participants // 40, 1)
+    events = max(participants // 100, 1)
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT count(*) FROM participants")).scalar():
+            sys.exit("--seed needs an empty database")
+        statements = [
+            "INSERT INTO fests (fest_id, name, year) VALUES (1, 'Plan check', 2026)",
+            f"""INSERT INTO colleges (college_id, name, city, state)
+                SELECT i, 'College ' || i, 'City ' || (i % 300), 'State ' || (i % 30)
+                FROM generate_series(1, {colleges}) i""",
+            f"""INSERT INTO clubs (club_id, college_id, club_name, club_type, poc_contact)
+                SELECT i, i, 'Club ' || i, 'technical', '9999999999'
+                FROM generate_series(1, {colleges}) i""",
+            f"""INSERT INTO events (event_id, name, fest_id, category, venue, date, time, max_team_size)
+                SELECT i, 'Event ' || i, 1, 'technical', 'Hall ' || (i % 50), '2026-01-01', '10:00', 4
+                FROM generate_series(1, {events}) i""",
+            f"""INSERT INTO participants (participant_id, name, phone, email, merch_size, college_id, club_id, gender)
+                SELECT i, 'Participant ' || i, lpad(i::text, 10, '9'), 'p' || i || '@example.com', 'M',
+                       i % {colleges} + 1, CASE WHEN i % 3 = 0 THEN i % {colleges} + 1 END,
+                       (CASE WHEN i % 2 = 0 THEN 'MALE' ELSE 'FEMALE' END)::gender_enum
+                FROM generate_series(1, {participants}) i""",
+            f"""INSERT INTO teams (team_id, team_name)
+                SELECT i, 'Team ' || i FROM generate_series(1, {teams}) i""",
+            f"""INSERT INTO team_members (team_id, participant_id)
+                SELECT (i - 1) % {teams} + 1, i FROM generate_series(1, {participants}) i""",
+            f"""INSERT INTO team_events (team_id, event_id)
+                SELECT i, i % {events} + 1 FROM generate_series(1, {teams}) i""",
+            f"""INSERT INTO rooms (room_id, building_name, room_no, gender, max_capacity)
+                SELECT i, 'Block ' || (i % 20), i::text,
+                       (CASE WHEN i % 2 = 0 THEN 'MALE' ELSE 'FEMALE' END)::gender_enum, 4
+                FROM generate_series(1, {rooms}) i""",
+            f"""INSERT INTO room_occupancy (room_id, current_occupancy)
+                SELECT i, 0 FROM generate_series(1, {rooms}) i""",
+            # Half the participants have a room: two per room in the first half
+            # (the room_reserved trigger fills in room_occupancy)
+            f"""INSERT INTO room_reserved (participant_id, room_id)
+                SELECT i, (i - 1) / 2 + 1 FROM generate_series(1, {participants // 2}) i""",
+            f"""INSERT INTO certificates (participant_id, event_id, certificate_type)
+                SELECT i, i % {events} + 1, 'participation' FROM generate_series(1, {participants}, 2) i""",
+        ]
+        for statement in statements:
+            conn.execute(text(statement))
+        for table, column in [("fests", "fest_id"), ("colleges", "college_id"), ("clubs", "club_id"),
+                              ("events", "event_id"), ("participants", "participant_id"),
+                              ("teams", "team_id"), ("rooms", "room_id"), ("certificates", "certificate_id")]:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), (SELECT max({column}) FROM {table}))"
+            ))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+
+def sample_ids(db) -> dict:
+    """Picks keys from the middle of each table to look up."""
+    def middle(sql):
+        return db.execute(text(sql + " OFFSET (SELECT count(*) / 2 FROM ({0}) s) LIMIT 1".format(sql))).first()
+
+    college = middle("SELECT name FROM colleges ORDER BY college_id")
+    club = middle("SELECT club_id, club_name FROM clubs ORDER BY club_id")
+    event_row = middle("SELECT event_id, name FROM events ORDER BY event_id")
+    room = middle("SELECT room_id, building_name, room_no FROM rooms ORDER BY room_id")
+    team = middle("SELECT team_id FROM teams ORDER BY team_id")
+    participant = middle("SELECT phone, email FROM participants ORDER BY participant_id")
+    return {
+        "college_name": college.name, "club_id": club.club_id, "club_name": club.club_name,
+        "event_id": event_row.event_id, "event_name": event_row.name,
+        "room_id": room.room_id, "building_name": room.building_name, "room_no": room.room_no,
+        "team_id": team.team_id, "phone": participant.phone, "email": participant.email,
+    }
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def check(label: str, run, ids: dict, table_rows: dict, min_rows: int, verbose: bool) -> bool:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    db = SessionLocal()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run(db, ids)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    ok = True
+    try:
+        cursor = db.connection().connection.dbapi_connection.cursor()
+        for statement, parameters in statements:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = cursor.fetchone()[0][0]["Plan"]
+            scans = [
+                node["Relation Name"] for node in plan_nodes(plan)
+                if node["Node Type"] == "Seq Scan" and table_rows.get(node["Relation Name"], 0) >= min_rows
+            ]
+            if scans:
+                ok = False
+                print(f"FAIL {label}: seq scan on {', '.join(sorted(set(scans)))}")
+                print("     " + " ".join(statement.split()))
+            elif verbose:
+                print(f"     {label}: cost {plan['Total Cost']:.0f}, " + " ".join(statement.split())[:100])
+    finally:
+        db.rollback()
+        db.close()
+
+    if ok:
+        print(f"OK   {label} ({len(statements)} quer{'y' if len(statements) == 1 else 'ies'})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, metavar="N", help="first fill an empty database with N participants")
+    parser.add_argument("--min-rows", type=int, default=10000, help="tables at least this big count as large")
+    parser.add_argument("--verbose", action="store_true", help="also print the plans that passed")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("This check needs PostgreSQL")
+    if args.seed:
+        seed(args.seed)
+
+    with engine.connect() as conn:
+        table_rows = dict(conn.execute(text(
+            "SELECT relname, reltuples::bigint FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+        )).all())
+    db = SessionLocal()
+    try:
+        ids = sample_ids(db)
+    finally:
+        db.close()
+
+    results = [check(label, run, ids, table_rows, args.min_rows, args.verbose) for label, run in CASES]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
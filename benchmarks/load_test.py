@@ -0,0 +1,337 @@
+"""
+Load-tests the API with realistic traffic mixes and reports per-endpoint
+throughput, latency percentiles and error rates.
+
+Starts `uvicorn main:app` (or targets --base-url), sets up the data the
+traffic needs through the API the way seed_db.py does (and with its
+generators), then runs --concurrency virtual users for --duration seconds.
+Each user picks its next action from the mix:
+  registration  POST /teams/add_to_event/ with a random team
+  dashboard     one of the reads the dashboard tabs make
+  login         POST /users/validate/
+
+Scenarios (--scenario):
+  mixed         dashboard 70%, registration 20%, login 10% (default)
+  registration  a registration burst alongside some dashboard reads
+  dashboard     dashboard reads only
+  login         a login storm alongside some dashboard reads
+or give the weights yourself: --mix dashboard=50,registration=40,login=10
+
+--out FILE saves the results as JSON (with the git commit and settings).
+--compare FILE prints the change against a saved run and exits 1 if any
+endpoint's p95 grew by more than --max-regression percent or its error
+rate rose by more than a percentage point.
+
+This WRITES to the database (a fest, rooms, colleges, events, a user and
+every registration): point DATABASE_URL at a scratch copy.
+
+Usage (from the repo root):
+    python benchmarks/load_test.py --out baseline.json
+    python benchmarks/load_test.py --scenario registration --concurrency 100 --duration 60
+    python benchmarks/load_test.py --compare baseline.json --max-regression 15
+    DB_MODE=async python benchmarks/load_test.py --workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+from bench_db_modes import ROOT, percentile, wait_until_up
+
+sys.path.insert(0, ROOT)
+
+import seed_db  # noqa: E402
+
+SCENARIOS = {
+    "mixed": {"dashboard": 70, "registration": 20, "login": 10},
+    "registration": {"registration": 80, "dashboard": 20},
+    "dashboard": {"dashboard": 100},
+    "login": {"login": 80, "dashboard": 20},
+}
+
+# (label, path) of the reads behind the dashboard tabs; {event_id} is
+# filled with one of the load test's events
+DASHBOARD_READS = [
+    ("GET /events/query/", "/events/query/?include_stats=true"),
+    ("GET /events/stats/", "/events/stats/"),
+    ("GET /events/{event_id}/teams/", "/events/{event_id}/teams/?limit=50"),
+    ("GET /participants/query/", "/participants/query/?limit=100"),
+    ("GET /colleges/query/", "/colleges/query/"),
+    ("GET /clubs/query/", "/clubs/query/"),
+    ("GET /rooms/occupancy/", "/rooms/occupancy/"),
+    ("GET /merch/summary/", "/merch/summary/"),
+]
+
+
+class Fixture:
+    """What the traffic refers to, created through the API for this run."""
+
+    def __init__(self):
+        self.tag = uuid.uuid4().hex[:8]  # keeps names unique across runs on one database
+        self.events = []
+        self.colleges = []
+        self.clubs = []
+        self.credentials = None
+        self.used_emails = set()
+
+
+async def _create(client: httpx.AsyncClient, path: str, payload: dict) -> dict:
+    response = await client.post(path, json=payload)
+    response.raise_for_status()
+    return response.json()
+
+
+async def set_up(client: httpx.AsyncClient, beds_per_gender: int) -> Fixture:
+    fixture = Fixture()
+    fest = await _create(client, "/fests/", {"name": f"Load test {fixture.tag}", "year": 2026})
+
+    # Ten rooms per gender, enough beds for every registration of the run
+    await asyncio.gather(*(
+        _create(client, "/rooms/", {
+            "building_name": f"Load-{gender.title()}-{fixture.tag}", "room_no": str(100 + i),
+            "gender": gender, "max_capacity": -(-beds_per_gender // 10)
+        })
+        for gender in ("MALE", "FEMALE") for i in range(10)
+    ))
+
+    fixture.colleges = await asyncio.gather(*(
+        _create(client, "/colleges/", {**college, "name": f"{college['name']} {fixture.tag}"})
+        for college in seed_db.COLLEGES
+    ))
+    fixture.clubs = await asyncio.gather(*(
+        _create(client, "/clubs/", {
+            "club_name": f"{seed_db.CLUB_TEMPLATES[i % len(seed_db.CLUB_TEMPLATES)][0]} {fixture.tag}-{i}",
+            "college_id": college["college_id"],
+            "poc_contact": str(9000000000 + i),
+            "club_type": seed_db.CLUB_TEMPLATES[i % len(seed_db.CLUB_TEMPLATES)][1],
+            "poc": seed_db.random_name(),
+            "poc_position": "Coordinator"
+        })
+        for i, college in enumerate(fixture.colleges)
+    ))
+    fixture.events = await asyncio.gather(*(
+        _create(client, "/events/", {
+            "name": f"{name}-{fixture.tag}", "fest_id": fest["fest_id"], "category": category,
+            "venue": venue, "date": date, "time": time_s, "max_team_size": max_size
+        })
+        for name, (category, date, time_s, max_size, venue) in seed_db.EVENTS.items()
+    ))
+
+    fixture.credentials = {"username": f"load-{fixture.tag}", "password": "correct horse battery"}
+    await _create(client, "/users/", {
+        **fixture.credentials, "name": "Load Test", "phone": "9999999999",
+        "email": "load-test@example.com", "role": "Volunteer"
+    })
+    return fixture
+
+
+# --- Actions: each returns (label, request awaitable) ---
+def register_team(client: httpx.AsyncClient, fixture: Fixture):
+    event = random.choice(fixture.events)
+    size = random.randint(1, event["max_team_size"])
+    payload = {
+        "team_name": f"team-{uuid.uuid4().hex[:10]}",
+        "event_id": event["event_id"],
+        "participants": [
+            seed_db.random_participant(fixture.colleges, fixture.clubs, fixture.used_emails) for _ in range(size)
+        ]
+    }
+    return "POST /teams/add_to_event/", client.post("/teams/add_to_event/", json=payload)
+
+def read_dashboard(client: httpx.AsyncClient, fixture: Fixture):
+    label, path = random.choice(DASHBOARD_READS)
+    path = path.format(event_id=random.choice(fixture.events)["event_id"])
+    return label, client.get(path)
+
+def log_in(client: httpx.AsyncClient, fixture: Fixture):
+    return "POST /users/validate/", client.post("/users/validate/", json=fixture.credentials)
+
+ACTIONS = {"registration": register_team, "dashboard": read_dashboard, "login": log_in}
+
+
+async def run_users(client: httpx.AsyncClient, fixture: Fixture, mix: dict, concurrency: int,
+                    duration: float, warmup: float) -> tuple[dict, float]:
+    """
+    Runs `concurrency` virtual users until `duration` seconds after the
+    warm-up. Returns ({label: [(status, seconds)]}, measured seconds);
+    requests sent during the warm-up aren't counted.
+    """
+    samples = {}
+    actions = [ACTIONS[name] for name in mix]
+    weights = list(mix.values())
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def user():
+        while time.perf_counter() < stop_at:
+            label, request = random.choices(actions, weights)[0](client, fixture)
+            sent = time.perf_counter()
+            try:
+                status = (await request).status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            finished = time.perf_counter()
+            if sent >= measure_from:
+                samples.setdefault(label, []).append((status, finished - sent))
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return samples, time.perf_counter() - measure_from
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    latencies = sorted(seconds for _, seconds in samples)
+    statuses = {}
+    for status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400)
+    return {
+        "requests": len(samples),
+        "rps": len(samples) / elapsed,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "statuses": statuses,
+    }
+
+
+def print_table(endpoints: dict, overall: dict):
+    print(f"{'endpoint':<32}{'reqs':>8}{'req/s':>9}{'err %':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses")
+    for label, row in sorted(endpoints.items()) + [("overall", overall)]:
+        print(
+            f"{label:<32}{row['requests']:>8}{row['rps']:>9.1f}{row['error_rate'] * 100:>7.1f}"
+            f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}  {row['statuses']}"
+        )
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> list:
+    """Prints current vs baseline per endpoint; returns the regressions found."""
+    regressions = []
+    print(f"\nvs {baseline['meta'].get('git_commit') or 'baseline'} ({baseline['meta']['started_at']}):")
+    print(f"{'endpoint':<32}{'req/s':>16}{'p95 ms':>20}{'err %':>14}")
+    for label, row in sorted(current["endpoints"].items()):
+        before = baseline["endpoints"].get(label)
+        if before is None:
+            print(f"{label:<32}  (not in baseline)")
+            continue
+        p95_change = (row["p95_ms"] / before["p95_ms"] - 1) * 100 if before["p95_ms"] else 0.0
+        flag = ""
+        if p95_change > max_regression:
+            flag = "  <- p95 regression"
+            regressions.append(f"{label}: p95 {before['p95_ms']:.1f} -> {row['p95_ms']:.1f} ms")
+        if row["error_rate"] > before["error_rate"] + 0.01:
+            flag += "  <- more errors"
+            regressions.append(f"{label}: errors {before['error_rate']:.1%} -> {row['error_rate']:.1%}")
+        print(
+            f"{label:<32}{before['rps']:>7.1f} -> {row['rps']:<7.1f}"
+            f"{before['p95_ms']:>8.1f} -> {row['p95_ms']:<7.1f}({p95_change:+.0f}%)"
+            f"{before['error_rate'] * 100:>5.1f} -> {row['error_rate'] * 100:<5.1f}{flag}"
+        )
+    return regressions
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ACTIONS:
+            raise argparse.ArgumentTypeError(f"unknown action {name!r}; use {', '.join(ACTIONS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(base_url: str, args, mix: dict) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        fixture = await set_up(client, args.beds)
+        started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        samples, elapsed = await run_users(client, fixture, mix, args.concurrency, args.duration, args.warmup)
+
+    return {
+        "meta": {
+            "started_at": started_at,
+            "git_commit": git_commit(),
+            "scenario": args.scenario,
+            "mix": mix,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "db_mode": os.environ.get("DB_MODE", "sync"),
+            "workers": args.workers,
+            "base_url": args.base_url,
+        },
+        "overall": summarize([s for rows in samples.values() for s in rows], elapsed),
+        "endpoints": {label: summarize(rows, elapsed) for label, rows in samples.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--mix", type=parse_mix, help="action weights, e.g. dashboard=50,registration=40,login=10")
+    parser.add_argument("--concurrency", type=int, default=50, help="virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="seconds measured")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds run before measuring")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout, seconds")
+    parser.add_argument("--beds", type=int, default=20000, help="beds per gender to create for registrations")
+    parser.add_argument("--base-url", help="test a running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8768)
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=20, help="allowed p95 growth, percent")
+    args = parser.parse_args()
+    mix = args.mix or SCENARIOS[args.scenario]
+    if args.mix:
+        args.scenario = "custom"
+
+    server = None
+    base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+    if not args.base_url:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            cwd=ROOT
+        )
+    try:
+        wait_until_up(base_url)
+        results = asyncio.run(run(base_url, args, mix))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print(f"{args.scenario}: {mix}, {args.concurrency} users, {args.duration:g} s\n")
+    print_table(results["endpoints"], results["overall"])
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print("\nregressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Checks that a burst of logins doesn't slow down the rest of the API.
+
+Starts `uvicorn main:app`, creates a throwaway user, then measures the
+latency of a cheap read endpoint twice: on its own, and while many clients
+hammer /users/validate/ at the same time. Also prints login throughput,
+how many logins were shed with a 503, and /internal/hash-pool-stats/.
+
+Usage (from the repo root):
+    python benchmarks/login_storm.py
+    python benchmarks/login_storm.py --logins 400 --login-concurrency 200
+    BCRYPT_ROUNDS=10 HASH_WORKERS=4 python benchmarks/login_storm.py
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+from bench_db_modes import ROOT, percentile, wait_until_up
+
+PROBE_ENDPOINT = "/colleges/query/?limit=10"
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, concurrency: int):
+    """Calls PROBE_ENDPOINT in a loop until `stop` is set; returns latencies."""
+    latencies = []
+
+    async def worker():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await client.get(PROBE_ENDPOINT)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return sorted(latencies)
+
+
+async def storm(client: httpx.AsyncClient, credentials: dict, total: int, concurrency: int):
+    """Sends `total` logins with `concurrency` in flight; returns status counts."""
+    statuses = {}
+    counter = iter(range(total))
+
+    async def worker():
+        for _ in counter:
+            response = await client.post("/users/validate/", json=credentials)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return statuses
+
+
+async def run(base_url: str, args):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        credentials = {"username": f"storm-{uuid.uuid4().hex[:12]}", "password": "correct horse battery"}
+        response = await client.post("/users/", json={
+            **credentials, "name": "Login Storm", "phone": "9999999999",
+            "email": "storm@example.com", "role": "Volunteer"
+        })
+        response.raise_for_status()
+
+        # Baseline: the probe endpoint on its own
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, args.probe_concurrency))
+        await asyncio.sleep(args.probe_seconds)
+        stop.set()
+        baseline = await task
+
+        # Same probe while the login storm runs
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, args.probe_concurrency))
+        started = time.perf_counter()
+        statuses = await storm(client, credentials, args.logins, args.login_concurrency)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        during = await task
+
+        hash_stats = (await client.get("/internal/hash-pool-stats/")).json()
+
+    for label, latencies in (("alone", baseline), ("during storm", during)):
+        print(
+            f"{PROBE_ENDPOINT} {label:>13}: {len(latencies):6d} calls  "
+            f"p50 {percentile(latencies, 50) * 1000:7.1f} ms  p99 {percentile(latencies, 99) * 1000:7.1f} ms"
+        )
+    print(f"logins: {args.logins} in {elapsed:.1f} s ({args.logins / elapsed:.1f}/s), status codes {statuses}")
+    print(f"hash pool: {hash_stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--login-concurrency", type=int, default=100)
+    parser.add_argument("--probe-concurrency", type=int, default=4)
+    parser.add_argument("--probe-seconds", type=float, default=3)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=ROOT
+    )
+    try:
+        wait_until_up(base_url)
+        asyncio.run(run(base_url, args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
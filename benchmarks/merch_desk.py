@@ -0,0 +1,123 @@
+"""
+Measures how many merch scans per second the distribution desk API takes.
+
+Starts `uvicorn main:app`, takes the first participants in the database
+and marks them through POST /merch/distribute/{id} with
+many scanners at once, and prints marks/sec and latency percentiles. It
+also times a second pass of rescans (the idempotent path) and the batch
+endpoint.
+
+This WRITES to merch_distribution: point DATABASE_URL at a scratch copy
+that already has participants (e.g. seed it with
+benchmarks/explain_crud_queries.py --seed N).
+
+Usage (from the repo root):
+    python benchmarks/merch_desk.py
+    python benchmarks/merch_desk.py --scans 5000 --concurrency 64 --batch-size 200
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+import httpx
+
+from bench_db_modes import ROOT, percentile, wait_until_up
+
+
+async def participant_ids(client: httpx.AsyncClient, count: int) -> list:
+    """The first `count` participant ids, walking /participants/query/ pages."""
+    ids = []
+    cursor = None
+    while len(ids) < count:
+        params = {"limit": 500, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/participants/query/", params=params)
+        response.raise_for_status()
+        ids.extend(p["participant_id"] for p in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    return ids[:count]
+
+
+async def scan_all(client: httpx.AsyncClient, ids: list, concurrency: int):
+    """
+    Scans every id once with `concurrency` scanners. Returns (seconds,
+    sorted latencies, how many scans found merch already handed out).
+    """
+    latencies = []
+    repeats = 0
+    queue = iter(ids)
+
+    async def scanner():
+        nonlocal repeats
+        for participant_id in queue:
+            start = time.perf_counter()
+            response = await client.post(f"/merch/distribute/{participant_id}")
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+            repeats += response.json()["already_distributed"]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(scanner() for _ in range(concurrency)))
+    return time.perf_counter() - started, sorted(latencies), repeats
+
+
+async def run(base_url: str, args):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        summary = (await client.get("/merch/summary/")).json()
+        pending = sum(row["pending"] for row in summary)
+        if pending < args.scans + args.batch_size * args.batches:
+            sys.exit(f"only {pending} participants still need merch; reseed the scratch database first")
+
+        ids = await participant_ids(client, args.scans + args.batch_size * args.batches)
+        scans, batch_ids = ids[:args.scans], ids[args.scans:]
+
+        for label, pass_ids in (("first scans", scans), ("rescans", scans)):
+            elapsed, latencies, repeats = await scan_all(client, pass_ids, args.concurrency)
+            print(
+                f"{label:>12}: {len(pass_ids)} in {elapsed:5.2f} s  {len(pass_ids) / elapsed:7.1f} marks/s  "
+                f"p50 {percentile(latencies, 50) * 1000:6.1f} ms  p99 {percentile(latencies, 99) * 1000:6.1f} ms  "
+                f"{repeats} already handed out"
+            )
+
+        started = time.perf_counter()
+        marked = 0
+        for i in range(0, len(batch_ids), args.batch_size):
+            response = await client.post(
+                "/merch/distribute/", json={"participant_ids": batch_ids[i:i + args.batch_size]}
+            )
+            response.raise_for_status()
+            marked += len(response.json()["marked"])
+        elapsed = time.perf_counter() - started
+        if batch_ids:
+            print(f"{'batches':>12}: {marked} marked in {elapsed:5.2f} s  {marked / elapsed:7.1f} marks/s "
+                  f"({args.batch_size} per request)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scans", type=int, default=2000, help="single scans (then rescanned once)")
+    parser.add_argument("--concurrency", type=int, default=32, help="scanners working at once")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=ROOT
+    )
+    try:
+        wait_until_up(base_url)
+        asyncio.run(run(base_url, args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
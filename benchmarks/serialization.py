@@ -0,0 +1,123 @@
+"""
+Compares ways of serializing a large participant list response.
+
+Builds N participant rows (10,000 by default) and times each strategy:
+  - validate + dump_json: what FastAPI does for response_model=List[Participant]
+    (every ORM row validated through the schema, then dumped by pydantic)
+  - jsonable_encoder + json: the classic FastAPI / stdlib path
+  - rows_to_dicts + orjson: serialization.orm_response, used by the list endpoints
+It also prints the payload size uncompressed, gzipped and brotli-compressed
+(brotli only if the package is installed), with the time each codec takes.
+
+Rows are synthetic ORM objects unless --db is given, in which case the
+first N participants are loaded from DATABASE_URL.
+
+Usage (from the repo root):
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --rows 10000 --repeat 20 --db
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models, schemas  # noqa: E402
+from config import BROTLI_QUALITY, GZIP_LEVEL  # noqa: E402
+from serialization import rows_to_dicts  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def synthetic_rows(count: int) -> list:
+    return [
+        models.Participant(
+            participant_id=i,
+            name=f"Participant {i}",
+            phone=f"{9000000000 + i}",
+            email=f"participant{i}@college{i % 250}.example.edu",
+            merch_size=("S", "M", "L", "XL", "XXL")[i % 5],
+            college_id=i % 250 + 1,
+            club_id=i % 40 + 1 if i % 3 else None,
+            gender="MALE" if i % 2 else "FEMALE",
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def database_rows(count: int) -> list:
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rows = db.query(models.Participant).order_by(models.Participant.participant_id).limit(count).all()
+        db.expunge_all()
+        return rows
+    finally:
+        db.close()
+
+
+def timed(fn, repeat: int):
+    """Median wall time of fn() over `repeat` runs, and its last result."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10, help="runs per strategy (median is reported)")
+    parser.add_argument("--db", action="store_true", help="load rows from the database instead of generating them")
+    args = parser.parse_args()
+
+    rows = database_rows(args.rows) if args.db else synthetic_rows(args.rows)
+    print(f"{len(rows)} participants, median of {args.repeat} runs\n")
+
+    adapter = TypeAdapter(List[schemas.Participant])
+    strategies = [
+        ("validate + dump_json", lambda: adapter.dump_json(adapter.validate_python(rows, from_attributes=True))),
+        ("jsonable_encoder + json", lambda: json.dumps(jsonable_encoder(
+            [schemas.Participant.model_validate(row) for row in rows])).encode()),
+        ("rows_to_dicts + orjson", lambda: orjson.dumps(rows_to_dicts(rows, schemas.Participant))),
+    ]
+
+    print(f"{'serializer':<26}{'time (ms)':>10}{'speedup':>10}")
+    baseline = None
+    for label, fn in strategies:
+        elapsed, body = timed(fn, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{label:<26}{elapsed * 1000:>10.1f}{baseline / elapsed:>9.1f}x")
+        # All strategies must produce the same document
+        assert orjson.loads(body) == orjson.loads(strategies[0][1]()), label
+
+    codecs = [("identity", lambda data: data),
+              (f"gzip -{GZIP_LEVEL}", lambda data: gzip.compress(data, GZIP_LEVEL))]
+    if brotli is not None:
+        codecs.append((f"brotli q{BROTLI_QUALITY}", lambda data: brotli.compress(data, quality=BROTLI_QUALITY)))
+    else:
+        print("\n(brotli is not installed; skipping it)")
+
+    print(f"\n{'encoding':<26}{'bytes':>10}{'ratio':>10}{'time (ms)':>10}")
+    for label, compress in codecs:
+        elapsed, compressed = timed(lambda: compress(body), args.repeat)
+        print(f"{label:<26}{len(compressed):>10}{len(body) / len(compressed):>9.1f}x{elapsed * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Stress test for room allocation under concurrent team registrations.
+
+Creates a fresh event and a handful of small rooms through the API, fires
+hundreds of /teams/add_to_event/ requests in parallel, then checks the
+database directly:
+- no room holds more people than max_capacity
+- room_occupancy.current_occupancy matches the room_reserved rows
+- every participant of every successful team has exactly one room
+
+Exits with status 1 if any check fails. Run it against a disposable
+database with the server already up:
+    uvicorn main:app
+    python benchmarks/stress_room_allocation.py --teams 400 --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func  # noqa: E402
+
+import crud, models  # noqa: E402
+from database import SessionLocal  # noqa: E402
+
+
+def setup(client: httpx.Client, rooms_per_gender: int, capacity: int, tag: str):
+    """Creates the fest, college, event and rooms this run registers into."""
+    fest_id = client.post("/fests/", json={"name": f"stress-{tag}", "year": 2026}).json()["fest_id"]
+    college = client.post("/colleges/", json={"name": f"Stress College {tag}", "city": "X", "state": "Y"})
+    college.raise_for_status()
+    event = client.post("/events/", json={
+        "name": f"stress-event-{tag}",
+        "fest_id": fest_id,
+        "category": "technical",
+        "venue": "Stress Hall",
+        "date": "2025-12-01",
+        "time": "10:00:00",
+        "max_team_size": 4,
+    })
+    event.raise_for_status()
+    for gender in ("MALE", "FEMALE"):
+        for i in range(rooms_per_gender):
+            r = client.post("/rooms/", json={
+                "building_name": f"Stress-{tag}",
+                "room_no": f"{gender[0]}{i}",
+                "gender": gender,
+                "max_capacity": capacity,
+            })
+            r.raise_for_status()
+    return event.json()["event_id"], college.json()["college_id"]
+
+
+def team_payload(n: int, event_id: int, college_id: int, tag: str, rng: random.Random):
+    participants = []
+    for i in range(rng.randint(1, 4)):
+        participants.append({
+            "name": f"Stress {n}-{i}",
+            "phone": "9000000000",
+            "email": f"stress.{tag}.{n}.{i}@example.com",
+            "merch_size": "M",
+            "college_id": college_id,
+            "club_id": None,
+            "gender": rng.choice(["MALE", "FEMALE"]),
+        })
+    return {"team_name": f"stress-{tag}-{n}", "event_id": event_id, "participants": participants}
+
+
+async def fire(base_url: str, payloads, concurrency: int):
+    """Sends every registration, at most `concurrency` at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses = {}
+    server_errors = []
+
+    async def register(client, payload):
+        async with semaphore:
+            response = await client.post("/teams/add_to_event/", json=payload)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code >= 500:
+                server_errors.append(response.text)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        await asyncio.gather(*(register(client, p) for p in payloads))
+    return statuses, server_errors
+
+
+def check_invariants(event_id: int) -> list:
+    """Returns a list of human-readable violations (empty means all good)."""
+    problems = []
+    db = SessionLocal()
+    try:
+        reserved = db.query(
+            models.RoomReserved.room_id,
+            func.count(models.RoomReserved.participant_id).label("reserved")
+        ).group_by(models.RoomReserved.room_id).subquery()
+
+        rows = db.query(
+            models.Room.room_id,
+            models.Room.max_capacity,
+            models.RoomOccupancy.current_occupancy,
+            func.coalesce(reserved.c.reserved, 0)
+        ).join(
+            models.RoomOccupancy, models.Room.room_id == models.RoomOccupancy.room_id
+        ).outerjoin(
+            reserved, models.Room.room_id == reserved.c.room_id
+        ).all()
+
+        for room_id, capacity, occupancy, reserved_count in rows:
+            if reserved_count > capacity:
+                problems.append(f"room {room_id}: {reserved_count} reservations > capacity {capacity}")
+            if occupancy > capacity:
+                problems.append(f"room {room_id}: occupancy {occupancy} > capacity {capacity}")
+            if occupancy != reserved_count:
+                problems.append(f"room {room_id}: occupancy {occupancy} != {reserved_count} reservations")
+
+        # Participants of teams in this event that have no room
+        homeless = db.query(models.TeamMember.participant_id).join(
+            models.TeamEvent, models.TeamMember.team_id == models.TeamEvent.team_id
+        ).outerjoin(
+            models.RoomReserved, models.TeamMember.participant_id == models.RoomReserved.participant_id
+        ).filter(
+            models.TeamEvent.event_id == event_id,
+            models.RoomReserved.room_id.is_(None)
+        ).count()
+        if homeless:
+            problems.append(f"{homeless} registered participants have no room")
+
+        # The event_stats counters must match the registrations
+        for item in crud.reconcile_event_stats(db):
+            if item["event_id"] == event_id:
+                problems.append(f"event_stats {item['stored']} != counted {item['counted']}")
+    finally:
+        db.close()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--teams", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rooms", type=int, default=8, help="rooms per gender")
+    parser.add_argument("--capacity", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    tag = str(int(time.time()))
+    rng = random.Random(args.seed)
+    with httpx.Client(base_url=args.base_url, timeout=30) as client:
+        event_id, college_id = setup(client, args.rooms, args.capacity, tag)
+
+    payloads = [team_payload(n, event_id, college_id, tag, rng) for n in range(args.teams)]
+    started = time.perf_counter()
+    statuses, server_errors = asyncio.run(fire(args.base_url, payloads, args.concurrency))
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.teams} registrations in {elapsed:.2f}s, status codes: {statuses}")
+    for text in sorted(set(server_errors))[:5]:
+        print("  server error: " + text[:300])
+
+    problems = check_invariants(event_id)
+    if problems:
+        print("FAILED:")
+        for p in problems:
+            print("  " + p)
+        sys.exit(1)
+    print("OK: no room over capacity, counters match reservations and registrations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Checks that the ILIKE '%...%' filters are served by the pg_trgm indexes.
+
+Runs the real filter functions from crud.py, captures the SQL they send,
+and EXPLAIN ANALYZEs it. Each case passes if its plan uses the expected
+trigram index. The script exits 1 if any case falls back to a sequential
+scan.
+
+Point DATABASE_URL at a migrated database. --seed N first adds N
+synthetic colleges, events and participants. Use it on a scratch database
+only. Without enough rows the planner rightly prefers a sequential scan.
+
+Usage (from the repo root):
+    python benchmarks/trgm_query_plans.py --seed 200000
+    python benchmarks/trgm_query_plans.py
+"""
+import argparse
+import os
+import sys
+import time
+
+from sqlalchemy import event, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crud  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from pagination import Page  # noqa: E402
+
+# Search terms that match a handful of the rows --seed generates
+CASES = [
+    ("college city", "ix_colleges_city_trgm",
+     lambda db, page: crud.get_colleges_by_filters(db, city="ahmednagar-417", state=None, page=page)),
+    ("college state", "ix_colleges_state_trgm",
+     lambda db, page: crud.get_colleges_by_filters(db, city=None, state="region 0042", page=page)),
+    ("participant by college name", "ix_colleges_name_trgm",
+     lambda db, page: crud.get_participants_by_filters(
+         db, college_name="institute c4ca42", club_id=None, gender=None,
+         state=None, city=None, event_id=None, page=page)),
+    ("event venue", "ix_events_venue_trgm",
+     lambda db, page: crud.get_events_by_filters(db, category=None, venue="hall 8f14e4", date=None, page=page)),
+]
+
+
+def seed(rows: int):
+    """Bulk-inserts synthetic rows with generate_series and refreshes statistics."""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO colleges (name, city, state)
+            SELECT 'Institute ' || md5(i::text),
+                   'Ahmednagar-' || (i % 5000),
+                   'Region ' || lpad((i % 500)::text, 4, '0')
+            FROM generate_series(1, :rows) AS i
+        """), {"rows": rows})
+        fest_id = conn.execute(text(
+            "INSERT INTO fests (name, year) VALUES ('Plan check', 2026) RETURNING fest_id"
+        )).scalar()
+        conn.execute(text("""
+            INSERT INTO events (name, fest_id, category, venue, date, time, max_team_size)
+            SELECT 'Event ' || i, :fest_id, 'technical', 'Hall ' || md5(i::text), '2026-01-01', '10:00', 4
+            FROM generate_series(1, :rows / 4) AS i
+        """), {"rows": rows, "fest_id": fest_id})
+        conn.execute(text("""
+            INSERT INTO participants (name, phone, email, merch_size, college_id, gender)
+            SELECT 'Participant ' || i, '9999999999', 'p' || i || '@example.com', 'M',
+                   (SELECT min(college_id) FROM colleges) + (i % :rows), 'MALE'
+            FROM generate_series(1, :rows) AS i
+        """), {"rows": rows})
+        for table in ("colleges", "events", "participants"):
+            conn.execute(text(f"ANALYZE {table}"))
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def check(label: str, index_name: str, run) -> bool:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "ILIKE" in statement.upper():
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        run(db, Page(limit=100, cursor=None, include_total=False))
+        elapsed = time.perf_counter() - started
+
+        statement, parameters = statements[0]
+        cursor = db.connection().connection.dbapi_connection.cursor()
+        cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0][0]["Plan"]
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+        db.close()
+
+    indexes = {node.get("Index Name") for node in plan_nodes(plan)}
+    seq_scans = sorted({node["Relation Name"] for node in plan_nodes(plan) if node["Node Type"] == "Seq Scan"})
+    ok = index_name in indexes
+    print(
+        f"{'OK  ' if ok else 'FAIL'} {label:<28} {elapsed * 1000:8.1f} ms  "
+        f"index {index_name}{'' if ok else ' not used'}"
+        + (f"  (seq scan on {', '.join(seq_scans)})" if seq_scans else "")
+    )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, metavar="N", help="first insert N synthetic colleges/participants")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("This check needs PostgreSQL (pg_trgm)")
+    with engine.connect() as conn:
+        if conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is None:
+            sys.exit("pg_trgm is not installed in this database; run `alembic upgrade head` first")
+
+    if args.seed:
+        seed(args.seed)
+
+    results = [check(*case) for case in CASES]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
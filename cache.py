@@ -0,0 +1,142 @@
+"""
+In-process cache for reference data (fests, events, colleges, clubs, rooms).
+
+These rows change rarely but are read on almost every request, so crud
+read functions decorated with @cached(namespace) keep their results in a
+bounded LRU with a TTL, one per namespace. Create paths call
+invalidate(namespace) after they commit.
+
+The cache is per process. With several workers, a change made in one
+worker reaches the others when their entries expire (REFERENCE_CACHE_TTL).
+Only single-row lookups are cached, and only found rows, never "not
+found", so a row created elsewhere is found at once and only its edits can
+be stale. Listings and pages are always read from the database.
+"""
+from collections import OrderedDict
+from functools import wraps
+import threading
+import time
+
+from sqlalchemy import inspect
+
+from config import REFERENCE_CACHE_SIZE, REFERENCE_CACHE_TTL
+
+
+class TTLCache:
+    """Thread-safe LRU with a per-entry time-to-live and hit/miss counters."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self.max_size = max_size
+        self.ttl = ttl
+        # Bumped by every invalidation, so a read that started before it
+        # can't put stale data back afterwards
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Returns (True, value) on a fresh hit, else (False, generation)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, self.generation
+
+    def set(self, key, value, generation: int):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def _cache_for(namespace: str) -> TTLCache:
+    with _caches_lock:
+        if namespace not in _caches:
+            _caches[namespace] = TTLCache(REFERENCE_CACHE_SIZE, REFERENCE_CACHE_TTL)
+        return _caches[namespace]
+
+
+def _detached_copy(value):
+    """
+    Copies ORM rows into new, session-less instances holding just their
+    column values, so cached results never depend on (or get expired by)
+    the session that loaded them.
+    """
+    if isinstance(value, list):
+        return [_detached_copy(item) for item in value]
+    mapper = inspect(type(value), raiseerr=False)
+    if mapper is None:
+        return value
+    return mapper.class_(**{attr.key: getattr(value, attr.key) for attr in mapper.column_attrs})
+
+
+def cached(namespace: str):
+    """
+    Decorator for crud read functions `fn(db, ...)`: results are cached per
+    argument set under `namespace`. None results are not cached.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(db, *args, **kwargs):
+            if REFERENCE_CACHE_TTL <= 0:
+                return fn(db, *args, **kwargs)
+
+            cache = _cache_for(namespace)
+            key = (fn.__name__, args, tuple(sorted(kwargs.items())))
+            found, value = cache.get(key)
+            if found:
+                return value
+
+            generation = value
+            result = fn(db, *args, **kwargs)
+            if result is not None:
+                result = _detached_copy(result)
+                cache.set(key, result, generation)
+            return result
+        return wrapper
+    return decorator
+
+
+def invalidate(namespace: str):
+    """Drops everything cached under `namespace`; call after committing a change."""
+    _cache_for(namespace).clear()
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters for every namespace, for /internal/cache-stats/."""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {namespace: cache.snapshot() for namespace, cache in sorted(caches.items())}
@@ -0,0 +1,309 @@
+"""
+Renders participation certificates as PDFs, in parallel.
+
+A template (DEFAULT_TEMPLATE, or a JSON file of the same shape named by
+CERTIFICATE_TEMPLATE) places lines of text on a page. Each line is a
+str.format() string over these fields:
+  certificate_id, certificate_type, certificate_title, participant_name,
+  college, event_name, event_date, fest_name, fest_year
+
+The PDFs use the standard Helvetica fonts, so no font files or PDF
+libraries are needed. Names outside Windows-1252 print with "?" for the
+missing characters.
+
+Certificates are rendered CERTIFICATE_BATCH at a time on a process pool
+with one worker per CPU core by default. The pool hands them back as:
+  write_directory()  one file per certificate in a local directory,
+                     skipping files that are already there (resume)
+  stream_zip()       a zip archive produced chunk by chunk, for
+                     /events/{id}/certificates.zip
+Both take rows in certificate_id order, as crud.get_certificate_rows() yields
+them, and every file name starts with the certificate_id.
+"""
+import json
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from config import CERTIFICATE_BATCH, CERTIFICATE_TEMPLATE, CERTIFICATE_WORKERS
+
+DEFAULT_TEMPLATE = {
+    "page_size": [842, 595],  # A4 landscape, in points
+    "borders": [
+        {"inset": 22, "width": 6, "color": [0.13, 0.24, 0.45]},
+        {"inset": 34, "width": 1.5, "color": [0.75, 0.6, 0.25]},
+    ],
+    "lines": [
+        {"text": "{fest_name} {fest_year}", "font": "Helvetica-Bold", "size": 20, "y": 500,
+         "color": [0.13, 0.24, 0.45]},
+        {"text": "Certificate of {certificate_title}", "font": "Helvetica-Bold", "size": 34, "y": 430},
+        {"text": "This is to certify that", "size": 16, "y": 370},
+        {"text": "{participant_name}", "font": "Helvetica-Bold", "size": 30, "y": 320},
+        {"text": "of {college}", "size": 16, "y": 280},
+        {"text": "took part in {event_name}, held on {event_date}.", "size": 16, "y": 250},
+        {"text": "Certificate no. {certificate_id}", "size": 9, "y": 60, "color": [0.4, 0.4, 0.4]},
+    ],
+}
+
+FIELDS = (
+    "certificate_id", "certificate_type", "certificate_title", "participant_name",
+    "college", "event_name", "event_date", "fest_name", "fest_year",
+)
+
+# Glyph widths (1/1000 em) of the printable ASCII range, from the standard
+# Helvetica AFM files; used to centre lines. Other characters count as 556.
+_WIDTHS = {
+    "Helvetica": (
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+    ),
+    "Helvetica-Bold": (
+        278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+        975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+        333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+        611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+    ),
+}
+_FONT_KEYS = {"Helvetica": "F1", "Helvetica-Bold": "F2"}
+
+
+class TemplateError(ValueError):
+    pass
+
+
+def load_template(path: str | None = None) -> dict:
+    """The template in `path` (JSON), else CERTIFICATE_TEMPLATE, else DEFAULT_TEMPLATE."""
+    path = path or CERTIFICATE_TEMPLATE
+    if not path:
+        return DEFAULT_TEMPLATE
+    with open(path, encoding="utf-8") as f:
+        template = json.load(f)
+
+    if not template.get("lines"):
+        raise TemplateError("A template needs a list of \"lines\"")
+    sample = {field: "x" for field in FIELDS}
+    for line in template["lines"]:
+        if not {"text", "size", "y"} <= line.keys():
+            raise TemplateError(f"Every line needs \"text\", \"size\" and \"y\": {line!r}")
+        if line.get("font", "Helvetica") not in _FONT_KEYS:
+            raise TemplateError(f"Unknown font {line['font']!r}; use one of {', '.join(_FONT_KEYS)}")
+        try:
+            line["text"].format_map(sample)
+        except (KeyError, IndexError, ValueError) as e:
+            raise TemplateError(f"Bad template line {line.get('text')!r}: {e!r}")
+    return {"page_size": DEFAULT_TEMPLATE["page_size"], "borders": [], **template}
+
+
+# --- PDF rendering (runs in the worker processes) ---
+def _text_width(text: str, font: str, size: float) -> float:
+    widths = _WIDTHS[font]
+    return sum(widths[ord(c) - 32] if 32 <= ord(c) < 127 else 556 for c in text) * size / 1000
+
+def _pdf_string(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+def _fields(row: dict) -> dict:
+    event_date = row.get("event_date")
+    return {
+        **row,
+        "certificate_title": (row.get("certificate_type") or "participation").title(),
+        "college": row.get("college") or "",
+        "fest_name": row.get("fest_name") or "",
+        "fest_year": row.get("fest_year") or "",
+        "event_date": f"{event_date.day} {event_date:%B %Y}" if event_date else "",
+    }
+
+def render_certificate(template: dict, row: dict) -> bytes:
+    """One certificate as a single-page PDF."""
+    width, height = template["page_size"]
+    fields = _fields(row)
+
+    ops = []
+    for border in template.get("borders", []):
+        inset = border["inset"]
+        ops.append("%.3f %.3f %.3f RG %.2f w %.2f %.2f %.2f %.2f re S" % (
+            *border.get("color", (0, 0, 0)), border["width"], inset, inset, width - 2 * inset, height - 2 * inset
+        ))
+    content = "\n".join(ops).encode("ascii")
+    for line in template["lines"]:
+        font = line.get("font", "Helvetica")
+        text = line["text"].format_map(fields)
+        x = line.get("x", (width - _text_width(text, font, line["size"])) / 2)
+        content += b"\nBT %.3f %.3f %.3f rg /%s %.2f Tf %.2f %.2f Td %s Tj ET" % (
+            *line.get("color", (0, 0, 0)), _FONT_KEYS[font].encode(), line["size"], x, line["y"], _pdf_string(text)
+        )
+    stream = zlib.compress(content)
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R /F2 6 0 R >> >> >>" % (width, height),
+        b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+def file_name(row: dict) -> str:
+    """"<certificate_id>-<participant-name>.pdf"; resuming relies on the id prefix."""
+    slug = re.sub(r"[^a-z0-9]+", "-", (row.get("participant_name") or "").lower()).strip("-")
+    return f"{row['certificate_id']}-{slug or 'participant'}.pdf"
+
+def render_batch(template: dict, rows: list, out_dir: str | None = None) -> list:
+    """
+    Worker entry point. With `out_dir`, writes each PDF there (atomically,
+    via a temporary file) and returns the certificate ids written.
+    Otherwise returns [(file name, PDF bytes)].
+    """
+    if out_dir is None:
+        return [(file_name(row), render_certificate(template, row)) for row in rows]
+
+    written = []
+    for row in rows:
+        path = os.path.join(out_dir, file_name(row))
+        with open(path + ".part", "wb") as f:
+            f.write(render_certificate(template, row))
+        os.replace(path + ".part", path)
+        written.append(row["certificate_id"])
+    return written
+
+
+# --- Process pool ---
+_pool = None
+_pool_lock = threading.Lock()
+
+def make_pool(workers: int | None = None) -> ProcessPoolExecutor:
+    """
+    A rendering pool with `workers` processes (default: CERTIFICATE_WORKERS,
+    or one per CPU core). Workers are spawned rather than forked so they
+    don't inherit the parent's threads or database connections.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers or CERTIFICATE_WORKERS or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+def get_pool() -> ProcessPoolExecutor:
+    """The server's shared rendering pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = make_pool()
+        return _pool
+
+def _batched(rows, size: int):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+def render_in_pool(pool: ProcessPoolExecutor, template: dict, rows, out_dir: str | None = None,
+                   batch_size: int = CERTIFICATE_BATCH):
+    """
+    Yields render_batch() results in row order. Keeps two batches per
+    worker in flight, so every core stays busy without reading all rows
+    (or holding all PDFs) in memory at once.
+    """
+    in_flight = deque()
+    window = 2 * pool._max_workers
+    for batch in _batched(rows, batch_size):
+        in_flight.append(pool.submit(render_batch, template, batch, out_dir))
+        if len(in_flight) >= window:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+# --- Output ---
+def rendered_ids(out_dir: str) -> set:
+    """Certificate ids that already have a finished PDF in `out_dir`."""
+    ids = set()
+    for name in os.listdir(out_dir):
+        prefix = name.split("-", 1)[0]
+        if name.endswith(".pdf") and prefix.isdigit():
+            ids.add(int(prefix))
+    return ids
+
+def write_directory(rows, out_dir: str, template: dict, pool: ProcessPoolExecutor, progress=None,
+                    batch_size: int = CERTIFICATE_BATCH) -> tuple[int, int]:
+    """
+    Renders every row into `out_dir`, skipping certificates rendered by an
+    earlier (possibly interrupted) run. Calls progress(done) after every
+    batch, counting skipped certificates as done.
+    Returns (rendered, skipped).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    done_ids = rendered_ids(out_dir)
+    skipped = 0
+
+    def pending():
+        nonlocal skipped
+        for row in rows:
+            if row["certificate_id"] in done_ids:
+                skipped += 1
+            else:
+                yield row
+
+    rendered = 0
+    for written in render_in_pool(pool, template, pending(), out_dir, batch_size):
+        rendered += len(written)
+        if progress:
+            progress(rendered + skipped)
+    if progress and not rendered:
+        progress(skipped)
+    return rendered, skipped
+
+
+class _ChunkWriter:
+    """Write-only file object zipfile can stream into; it collects what's written."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_zip(rows, template: dict, pool: ProcessPoolExecutor, batch_size: int = CERTIFICATE_BATCH):
+    """
+    Yields a zip of every row's PDF, one chunk per rendered batch. The PDFs
+    are already deflated, so entries are stored rather than compressed again.
+    """
+    out = _ChunkWriter()
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as archive:
+        for batch in render_in_pool(pool, template, rows, batch_size=batch_size):
+            for name, pdf in batch:
+                archive.writestr(name, pdf)
+            yield out.take()
+    yield out.take()
@@ -0,0 +1,144 @@
+"""
+gzip / brotli response compression.
+
+CompressionMiddleware compresses text and JSON responses of at least
+COMPRESSION_MIN_SIZE bytes. It uses brotli when the client accepts it and
+the optional `brotli` package is installed (it is commented out in
+requirements.txt), and gzip otherwise. Streamed responses
+(e.g. /participants/export/) are compressed chunk by chunk and flushed
+after every chunk, so rows still reach the client as they're produced.
+Server-sent event streams (/live/) are never compressed.
+
+Add it after ConditionalGetMiddleware so it runs outside it: ETags are
+computed on the uncompressed body. When this middleware compresses a
+response it turns the ETag weak (W/"..."), as nginx does, because the
+bytes on the wire differ from the ones the tag was computed over.
+If-None-Match uses weak comparison, so 304s keep working.
+"""
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional: without it we only offer gzip
+    brotli = None
+
+_COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    """Codings in an Accept-Encoding header, minus any sent with q=0."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoder_for(self, scope):
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return _BrotliEncoder(self.brotli_quality)
+        if "gzip" in accepted:
+            return _GzipEncoder(self.gzip_level)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoder = self._encoder_for(scope)
+        if encoder is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        headers = None
+        compressing = False
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, headers, compressing, passthrough
+            if passthrough:
+                return await send(message)
+
+            if message["type"] == "http.response.start":
+                start = message
+                headers = MutableHeaders(raw=list(message["headers"]))
+                content_type = headers.get("content-type", "")
+                if message["status"] == 304:
+                    # No body, but it stands in for a response that may have been compressed
+                    headers.add_vary_header("Accept-Encoding")
+                    passthrough = True
+                    await send({**start, "headers": headers.raw})
+                elif ("content-encoding" in headers or not content_type.startswith(_COMPRESSIBLE_TYPES)
+                      or content_type.startswith("text/event-stream")):
+                    passthrough = True
+                    await send(start)
+                else:
+                    headers.add_vary_header("Accept-Encoding")
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if not compressing:
+                if not more_body and len(body) < self.minimum_size:
+                    # Small enough that compressing isn't worth the CPU
+                    await send({**start, "headers": headers.raw})
+                    await send(message)
+                    return
+                compressing = True
+                headers["content-encoding"] = encoder.name
+                del headers["content-length"]
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["etag"] = "W/" + etag
+                if not more_body:
+                    body = encoder.finish(body)
+                    headers["content-length"] = str(len(body))
+                    await send({**start, "headers": headers.raw})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send({**start, "headers": headers.raw})
+
+            body = encoder.chunk(body) if more_body else encoder.finish(body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
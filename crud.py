@@ -1,9 +1,20 @@
 from sqlalchemy.orm import Session
-import models, schemas, security
+from sqlalchemy import func, distinct, tuple_, select, insert, delete, text, true, literal
+from sqlalchemy.dialects import postgresql
+from pydantic import ValidationError
+import models, schemas, security, live
+from cache import cached, invalidate
+from pagination import Page, PageResult, paginate, encode_cursor, decode_cursor
 from typing import List
 from datetime import date
+import heapq
+from itertools import groupby
+import csv
+import io
+import json
 
 #fest crud
+@cached("fests")
 def get_fest(db: Session, fest_id: int):
     return db.query(models.Fest).filter(models.Fest.fest_id == fest_id).first()
 
@@ -13,6 +24,7 @@ def create_fest(db: Session, fest: schemas.FestCreate):
     
     db.add(db_item)
     db.commit()
+    invalidate("fests")
     db.refresh(db_item)
     return db_item
 
@@ -21,9 +33,26 @@ def get_user_by_username(db: Session, username: str):
     """Fetches a user from the DB by their username."""
     return db.query(models.User).filter(models.User.username == username).first()
 
-def create_user(db: Session, user: schemas.UserCreate):
-    """Creates a new user in the DB with a hashed password."""
-    hashed_password = security.get_password_hash(user.password)
+def get_user(db: Session, user_id: int):
+    return db.query(models.User).filter(models.User.user_id == user_id).first()
+
+def get_users(db: Session, page: Page) -> PageResult:
+    """Returns one page of users, ordered by user_id."""
+    query = db.query(models.User)
+    return paginate(query, models.User.user_id, page)
+
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: str | None = None):
+    """
+    Creates a new user in the DB with a hashed password.
+    Pass hashed_password when the hash was already computed (e.g. on the
+    hashing pool) to avoid hashing here.
+    Raises ValueError if the username is taken.
+    """
+    if get_user_by_username(db, username=user.username):
+        raise ValueError("Username already registered")
+
+    if hashed_password is None:
+        hashed_password = security.get_password_hash(user.password)
     
     # Create the SQLAlchemy model instance
     db_user = models.User(
@@ -40,6 +69,13 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.refresh(db_user)
     return db_user
 
+def update_user_password_hash(db: Session, user_id: int, password_hash: str):
+    """Stores a new password hash, e.g. after a bcrypt cost change."""
+    db.query(models.User).filter(models.User.user_id == user_id).update(
+        {models.User.password_hash: password_hash}, synchronize_session=False
+    )
+    db.commit()
+
 def check_user_credentials(db: Session, user_login: schemas.UserLogin):
     """
     Checks if a user's username and password are valid.
@@ -79,33 +115,43 @@ def add_team_to_event(db: Session, team_data: schemas.TeamCreateRequest):
         db_team_event = models.TeamEvent(team_id=db_team.team_id, event_id=team_data.event_id)
         db.add(db_team_event)
 
-        created_participants = []
-        
-        # 5. Loop and create Participants and TeamMember links
-        for p_data in team_data.participants:
-            # Create participant
-            db_participant = models.Participant(**p_data.model_dump())
-            db.add(db_participant)
-            db.flush() # Get the new participant_id
-
-            # Create TeamMember link
-            db_team_member = models.TeamMember(
-                team_id=db_team.team_id, 
-                participant_id=db_participant.participant_id
-            )
-            db.add(db_team_member)
-
-            #try and give the participant a room
-            if assign_room_to_participant(db, db_participant.participant_id) == None:
-                raise ValueError("team cannot be created as no suitable room space is available")
-            
-            created_participants.append(db_participant)
+        # 5. Create all Participants, flushing once to get their ids
+        created_participants = [
+            models.Participant(**p_data.model_dump()) for p_data in team_data.participants
+        ]
+        db.add_all(created_participants)
+        db.flush()
+
+        # 6. Create the TeamMember links
+        db.add_all([
+            models.TeamMember(team_id=db_team.team_id, participant_id=p.participant_id)
+            for p in created_participants
+        ])
 
+        # 7. Give every participant a room, all or nothing
+        if allocate_rooms(db, created_participants) is None:
+            raise ValueError("team cannot be created as no suitable room space is available")
+
+        # 8. Count the team in the event's stats
+        _bump_event_stats(db, {team_data.event_id: (1, len(created_participants))})
+        live.queue(db, live.EVENTS, {
+            "type": "team_added", "event_id": team_data.event_id,
+            "team_id": db_team.team_id, "team_name": db_team.team_name
+        })
+
+        participant_ids = [p.participant_id for p in created_participants]
         db.commit() # Commit all changes at once
         
+        # 9. Reload the team, then every member with one IN query
+        #    (refreshing them one by one is a SELECT per participant)
         db.refresh(db_team)
-        for p in created_participants:
-            db.refresh(p)
+        reloaded = {
+            p.participant_id: p
+            for p in db.query(models.Participant).filter(
+                models.Participant.participant_id.in_(participant_ids)
+            ).populate_existing().all()
+        }
+        created_participants = [reloaded[pid] for pid in participant_ids]
             
         # Return the created objects for the response
         return {
@@ -117,6 +163,205 @@ def add_team_to_event(db: Session, team_data: schemas.TeamCreateRequest):
         db.rollback() # Rollback all changes if any step fails
         raise e # Re-raise the exception to be handled by main.py
     
+def add_teams_bulk(db: Session, teams: List[schemas.TeamCreateRequest]):
+    """
+    Registers many teams at once (e.g. a college's pre-registration sheet).
+
+    Every team is validated up front against a handful of lookups (events,
+    colleges, clubs, free beds); teams that fail are reported and skipped,
+    the rest are written with multi-row INSERTs and a single room
+    allocation pass, all in one transaction.
+
+    Returns a list with one {"index", "team_name", "team_id", "error"} dict
+    per input team, in input order. team_id is None when the team failed.
+    """
+    results = [
+        {"index": i, "team_name": t.team_name, "team_id": None, "error": None}
+        for i, t in enumerate(teams)
+    ]
+
+    try:
+        # 1. Look up everything the teams reference, one query per table
+        event_ids = {t.event_id for t in teams}
+        college_ids = {p.college_id for t in teams for p in t.participants}
+        club_ids = {p.club_id for t in teams for p in t.participants if p.club_id is not None}
+
+        max_team_size = dict(db.query(models.Event.event_id, models.Event.max_team_size).filter(
+            models.Event.event_id.in_(event_ids)
+        ).all()) if event_ids else {}
+        known_colleges = {row[0] for row in db.query(models.College.college_id).filter(
+            models.College.college_id.in_(college_ids)
+        ).all()} if college_ids else set()
+        known_clubs = {row[0] for row in db.query(models.Club.club_id).filter(
+            models.Club.club_id.in_(club_ids)
+        ).all()} if club_ids else set()
+
+        # 2. Validate each team on its own
+        for result, t in zip(results, teams):
+            if t.event_id not in max_team_size:
+                result["error"] = "Event not found"
+            elif len(t.participants) > max_team_size[t.event_id]:
+                result["error"] = f"Team size ({len(t.participants)}) exceeds event limit ({max_team_size[t.event_id]})"
+            elif any(p.college_id not in known_colleges for p in t.participants):
+                result["error"] = "College not found"
+            elif any(p.club_id is not None and p.club_id not in known_clubs for p in t.participants):
+                result["error"] = "Club not found"
+
+        # 3. Lock every room with space for the genders we need and hand out
+        #    beds team by team. A team only gets rooms if all members fit.
+        genders = {p.gender.value for t in teams for p in t.participants}
+        heaps = {}
+        free_beds = {}
+        locked_occupancy = {}
+        for gender in sorted(genders):
+            rooms = _lock_rooms_with_space(db, gender, needed=None, skip_locked=False)
+            locked_occupancy.update((r.room_id, r.current_occupancy) for r in rooms)
+            heaps[gender] = [(r.current_occupancy, r.room_id, r.max_capacity) for r in rooms]
+            heapq.heapify(heaps[gender])
+            free_beds[gender] = sum(r.max_capacity - r.current_occupancy for r in rooms)
+
+        team_rooms = {}  # team index -> [room_id per participant, in order]
+        for result, t in zip(results, teams):
+            if result["error"]:
+                continue
+
+            needed = {}
+            for p in t.participants:
+                needed[p.gender.value] = needed.get(p.gender.value, 0) + 1
+            if any(free_beds[g] < n for g, n in needed.items()):
+                result["error"] = "team cannot be created as no suitable room space is available"
+                continue
+
+            room_ids = []
+            for p in t.participants:
+                heap = heaps[p.gender.value]
+                occupancy, room_id, capacity = heapq.heappop(heap)
+                room_ids.append(room_id)
+                if occupancy + 1 < capacity:
+                    heapq.heappush(heap, (occupancy + 1, room_id, capacity))
+            for g, n in needed.items():
+                free_beds[g] -= n
+            team_rooms[result["index"]] = room_ids
+
+        accepted = [(i, teams[i]) for i in sorted(team_rooms)]
+        if not accepted:
+            db.rollback()  # release the room locks
+            return results
+
+        # 4. Multi-row inserts. RETURNING with sort_by_parameter_order gives
+        #    the new ids back in the same order as the rows we sent.
+        team_ids = db.execute(
+            insert(models.Team).returning(models.Team.team_id, sort_by_parameter_order=True),
+            [{"team_name": t.team_name} for _, t in accepted]
+        ).scalars().all()
+
+        participant_rows = [p.model_dump(mode="json") for _, t in accepted for p in t.participants]
+        participant_ids = db.execute(
+            insert(models.Participant).returning(models.Participant.participant_id, sort_by_parameter_order=True),
+            participant_rows
+        ).scalars().all() if participant_rows else []
+
+        db.execute(
+            insert(models.TeamEvent),
+            [{"team_id": team_id, "event_id": t.event_id} for team_id, (_, t) in zip(team_ids, accepted)]
+        )
+
+        members = []
+        assignments = {}
+        next_participant = iter(participant_ids)
+        for team_id, (i, t) in zip(team_ids, accepted):
+            results[i]["team_id"] = team_id
+            live.queue(db, live.EVENTS, {
+                "type": "team_added", "event_id": t.event_id, "team_id": team_id, "team_name": t.team_name
+            })
+            for room_id in team_rooms[i]:
+                participant_id = next(next_participant)
+                members.append({"team_id": team_id, "participant_id": participant_id})
+                assignments[participant_id] = room_id
+
+        if members:
+            db.execute(insert(models.TeamMember), members)
+        _write_room_claims(db, assignments, locked_occupancy)
+
+        stats = {}
+        for _, t in accepted:
+            teams_added, participants_added = stats.get(t.event_id, (0, 0))
+            stats[t.event_id] = (teams_added + 1, participants_added + len(t.participants))
+        _bump_event_stats(db, stats)
+
+        db.commit()
+        return results
+
+    except Exception as e:
+        db.rollback() # Rollback all changes if any step fails
+        raise e # Re-raise the exception to be handled by main.py
+
+def _delete_teams_no_commit(db: Session, team_ids: List[int]):
+    """
+    Deletes the given teams with their participants, member and event links
+    and room reservations: one set-based DELETE per table, however big the
+    teams are. The room_reserved trigger gives the beds back with one
+    grouped UPDATE, and event_stats is adjusted with one upsert.
+    DOES NOT COMMIT.
+
+    Returns (deleted teams as (team_id, team_name) rows, number of
+    participants deleted).
+    """
+    if not team_ids:
+        return [], 0
+
+    # 1. Free the members' beds (room_occupancy follows via the trigger)
+    member_ids = select(models.TeamMember.participant_id).where(models.TeamMember.team_id.in_(team_ids))
+    room_ids = db.execute(
+        delete(models.RoomReserved)
+        .where(models.RoomReserved.participant_id.in_(member_ids))
+        .returning(models.RoomReserved.room_id)
+    ).scalars().all()
+
+    # 2. Delete the links (TeamMember and TeamEvent); they reference the
+    #    teams and participants
+    members = db.execute(
+        delete(models.TeamMember)
+        .where(models.TeamMember.team_id.in_(team_ids))
+        .returning(models.TeamMember.team_id, models.TeamMember.participant_id)
+    ).all()
+    registrations = db.execute(
+        delete(models.TeamEvent)
+        .where(models.TeamEvent.team_id.in_(team_ids))
+        .returning(models.TeamEvent.team_id, models.TeamEvent.event_id)
+    ).all()
+
+    # 3. Delete the participants who were on these teams, then the teams
+    participant_ids = [m.participant_id for m in members]
+    if participant_ids:
+        db.execute(delete(models.Participant).where(models.Participant.participant_id.in_(participant_ids)))
+    deleted_teams = db.execute(
+        delete(models.Team)
+        .where(models.Team.team_id.in_(team_ids))
+        .returning(models.Team.team_id, models.Team.team_name)
+    ).all()
+
+    # 4. Take the teams out of their events' stats
+    team_sizes = {}
+    for m in members:
+        team_sizes[m.team_id] = team_sizes.get(m.team_id, 0) + 1
+    stats = {}
+    for r in registrations:
+        teams_removed, participants_removed = stats.get(r.event_id, (0, 0))
+        stats[r.event_id] = (teams_removed - 1, participants_removed - team_sizes.get(r.team_id, 0))
+    _bump_event_stats(db, stats)
+
+    # 5. Tell live clients
+    team_names = {t.team_id: t.team_name for t in deleted_teams}
+    for r in registrations:
+        live.queue(db, live.EVENTS, {
+            "type": "team_removed", "event_id": r.event_id,
+            "team_id": r.team_id, "team_name": team_names.get(r.team_id)
+        })
+    _queue_room_occupancy(db, room_ids)
+
+    return deleted_teams, len(participant_ids)
+
 def delete_team_by_id(db: Session, team_id: int):
     """
     Deletes a team, its participants, and all associated links
@@ -125,53 +370,44 @@ def delete_team_by_id(db: Session, team_id: int):
     
     # Use a transaction to ensure all or nothing
     try:
-        # 1. Find the team
-        db_team = db.query(models.Team).filter(models.Team.team_id == team_id).first()
-        if not db_team:
+        deleted_teams, _ = _delete_teams_no_commit(db, [team_id])
+        if not deleted_teams:
             raise ValueError("Team not found")
 
-        # 2. Find all participants associated with this team
-        team_members = db.query(models.TeamMember).filter(models.TeamMember.team_id == team_id).all()
-        participant_ids = [tm.participant_id for tm in team_members]
-        
-        # 3. Find all event registrations for this team
-        team_events = db.query(models.TeamEvent).filter(models.TeamEvent.team_id == team_id).all()
+        db.commit()
+        return deleted_teams[0] # Return the deleted team (team_id, team_name) for reference
 
-        # 4. Delete the links first (TeamMember and TeamEvent)
-        # These reference the team and participants
-        for tm in team_members:
-            db.delete(tm)
-            
-        for te in team_events:
-            db.delete(te)
-            
-        # --- FIX: Flush the session ---
-        # This sends the DELETE commands for team_members and team_events
-        # to the database immediately, *before* we proceed.
-        # This resolves the foreign key violation.
-        db.flush() 
-        
-        # 5. Delete the team itself (as requested)
-        db.delete(db_team)
+    except Exception as e:
+        db.rollback() # Rollback all changes if any step fails
+        raise e # Re-raise the exception to be handled by main.py
 
-        for id in participant_ids:
-            remove_reservation(db, id)
+def delete_teams_for_event(db: Session, event_id: int):
+    """
+    Deletes every team registered for an event (with their participants,
+    links and room reservations) in a single transaction.
+    Returns {"event_id", "teams_deleted", "participants_deleted"}.
+    """
+    try:
+        # 1. Check the event exists
+        if not get_event(db, event_id=event_id):
+            raise ValueError("Event not found")
 
-        # 6. Delete the participants who were on this team
-        if participant_ids:
-            # Delete participants based on the collected IDs
-            db.query(models.Participant).filter(
-                models.Participant.participant_id.in_(participant_ids)
-            ).delete(synchronize_session=False)
+        # 2. Collect its teams and delete them all
+        team_ids = db.execute(
+            select(models.TeamEvent.team_id).where(models.TeamEvent.event_id == event_id)
+        ).scalars().all()
+        deleted_teams, participants_deleted = _delete_teams_no_commit(db, team_ids)
 
-        # 7. Commit all changes
         db.commit()
-        
-        return db_team # Return the deleted team object for reference
+        return {
+            "event_id": event_id,
+            "teams_deleted": len(deleted_teams),
+            "participants_deleted": participants_deleted
+        }
 
     except Exception as e:
-        db.rollback() # Rollback all changes if any step fails
-        raise e # Re-raise the exception to be handled by main.py
+        db.rollback()
+        raise e
     
 def get_participants_from_team(db:Session, team_id:int):
     team = db.query(models.Team).filter(models.Team.team_id == team_id).first()
@@ -187,32 +423,648 @@ def get_participants_from_team(db:Session, team_id:int):
     
     return participants
     
+def get_teams_for_event(
+    db: Session,
+    event_id: int,
+    sort_by: schemas.TeamSortField = schemas.TeamSortField.team_id,
+    order: schemas.SortOrder = schemas.SortOrder.asc,
+    page: Page | None = None
+) -> PageResult:
+    """
+    Lists the teams registered for an event with their member counts,
+    using one joined, grouped query (no per-team lookups).
+
+    Supports sorting by team_id, name or size and keyset pagination:
+    pass the returned next_cursor back as `cursor` to get the next page.
+    Without a page, every team is returned.
+    Raises ValueError if the event doesn't exist.
+    """
+    if not get_event(db, event_id=event_id):
+        raise ValueError("Event not found")
+
+    participant_count = func.count(models.TeamMember.participant_id).label("participant_count")
+
+    query = db.query(
+        models.Team.team_id,
+        models.Team.team_name,
+        participant_count
+    ).join(
+        models.TeamEvent,
+        models.Team.team_id == models.TeamEvent.team_id
+    ).outerjoin(
+        models.TeamMember,
+        models.Team.team_id == models.TeamMember.team_id
+    ).filter(
+        models.TeamEvent.event_id == event_id
+    ).group_by(
+        models.Team.team_id,
+        models.Team.team_name
+    )
+
+    sort_column = {
+        schemas.TeamSortField.team_id: models.Team.team_id,
+        schemas.TeamSortField.name: models.Team.team_name,
+        schemas.TeamSortField.size: participant_count,
+    }[sort_by]
+    descending = order == schemas.SortOrder.desc
+
+    # The total ignores the cursor so it stays the same on every page
+    total = query.order_by(None).count() if page and page.include_total else None
+
+    # Keyset: continue strictly after the (sort key, team_id) of the last row seen.
+    # team_id is the tie-breaker so pages never overlap or skip rows.
+    if page and page.cursor:
+        key_type = str if sort_by == schemas.TeamSortField.name else int
+        last_key, last_team_id = decode_cursor(page.cursor, key_type, int)
+        key = tuple_(sort_column, models.Team.team_id)
+        after = tuple_(last_key, last_team_id)
+        condition = key < after if descending else key > after
+        if sort_by == schemas.TeamSortField.size:
+            query = query.having(condition)  # aggregate, so it belongs in HAVING
+        else:
+            query = query.filter(condition)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), models.Team.team_id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), models.Team.team_id.asc())
+
+    if page is None:
+        return PageResult(query.all(), None, total)
+
+    # Fetch one extra row to find out whether another page exists
+    rows = query.limit(page.limit + 1).all()
+    if len(rows) <= page.limit:
+        return PageResult(rows, None, total)
+
+    rows = rows[:page.limit]
+    last = rows[-1]
+    last_key = {
+        schemas.TeamSortField.team_id: last.team_id,
+        schemas.TeamSortField.name: last.team_name,
+        schemas.TeamSortField.size: last.participant_count,
+    }[sort_by]
+    return PageResult(rows, encode_cursor(last_key, last.team_id), total)
+
+# --- Participant import (CSV / NDJSON) ---
+IMPORT_COLUMNS = ["team_name", "event_id", "name", "phone", "email", "merch_size", "college_id", "club_id", "gender"]
+_STAGING_COLUMNS = ["row_no", "team_name", "event_id", "name", "phone", "email",
+                    "merch_size", "college_id", "club_id", "gender", "error"]
+_COPY_NULL = "\\N"
+
+def _read_import_rows(fileobj, fmt: str):
+    """
+    Yields (row_no, dict) for every data row of an uploaded file without
+    loading it into memory. Rows that can't even be parsed yield a string
+    error instead of a dict.
+    """
+    stream = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        for row_no, row in enumerate(csv.DictReader(stream), start=1):
+            yield row_no, row
+    else:
+        row_no = 0
+        for line in stream:
+            if not line.strip():
+                continue
+            row_no += 1
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                row = f"invalid JSON: {e.msg}"
+            if not isinstance(row, (dict, str)):
+                row = "each line must be a JSON object"
+            yield row_no, row
+
+def _validate_import_row(row_no: int, row):
+    """
+    Checks one row against schemas.ParticipantCreate and turns it into a
+    staging row. Invalid rows are staged too (with their error) so that the
+    rest of their team can be rejected in SQL.
+    """
+    if isinstance(row, str):
+        return [row_no, None, None, None, None, None, None, None, None, None, row]
+
+    # CSV gives us strings; treat empty cells as missing
+    row = {k: (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k}
+    row = {k: v for k, v in row.items() if v not in ("", None)}
+
+    team_name = row.get("team_name")
+    try:
+        event_id = int(row["event_id"]) if "event_id" in row else None
+    except (TypeError, ValueError):
+        event_id = None
+
+    error = None
+    participant = None
+    if not team_name:
+        error = "team_name: Field required"
+    elif event_id is None:
+        error = "event_id: a valid integer is required"
+    else:
+        try:
+            participant = schemas.ParticipantCreate(**{k: row.get(k) for k in IMPORT_COLUMNS[2:] if k in row})
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(str(x) for x in err['loc'])}: {err['msg']}" for err in e.errors())
+        else:
+            if participant.merch_size not in models.Participant.merch_size.type.enums:
+                error = f"merch_size: must be one of {', '.join(models.Participant.merch_size.type.enums)}"
+
+    if error:
+        return [row_no, team_name, event_id, None, None, None, None, None, None, None, error]
+
+    return [
+        row_no, team_name, event_id,
+        participant.name, participant.phone, participant.email, participant.merch_size,
+        participant.college_id, participant.club_id, participant.gender.value,
+        None
+    ]
+
+def _copy_chunk(cursor, rows: list, table: str = "participant_import", columns: list = _STAGING_COLUMNS):
+    """Streams one chunk of staging rows into a temp table with COPY."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_COPY_NULL if v is None else v for v in row])
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) "
+        f"FROM STDIN WITH (FORMAT csv, NULL '{_COPY_NULL}')",
+        buffer
+    )
+
+def _reject_unhoused_teams(db: Session, cursor, chunk_size: int):
+    """
+    Locks every room with space for the genders being imported (room_id
+    order, as add_teams_bulk does) and walks the valid teams in file order,
+    keeping each only if all its members still fit. Teams that don't are
+    marked rejected in the staging table. Teams are streamed and rejected
+    keys are COPYed out chunk by chunk, so memory depends on the number of
+    rooms, not on the file. Returns the ids of the locked rooms.
+    """
+    genders = db.execute(text(
+        "SELECT DISTINCT gender FROM participant_import WHERE error IS NULL ORDER BY gender"
+    )).scalars().all()
+    free_beds = {}
+    room_ids = []
+    for gender in genders:
+        rooms = _lock_rooms_with_space(db, gender, needed=None, skip_locked=False)
+        free_beds[gender] = sum(r.max_capacity - r.current_occupancy for r in rooms)
+        room_ids.extend(r.room_id for r in rooms)
+
+    db.execute(text("CREATE TEMP TABLE import_unhoused (team_name text, event_id integer) ON COMMIT DROP"))
+    needs = db.execute(text("""
+        SELECT team_name, event_id, gender, count(*) AS n,
+               min(min(row_no)) OVER (PARTITION BY team_name, event_id) AS first_row
+        FROM participant_import WHERE error IS NULL
+        GROUP BY team_name, event_id, gender
+        ORDER BY first_row, gender
+    """), execution_options={"stream_results": True, "yield_per": chunk_size})
+
+    unhoused = []
+    for team, rows in groupby(needs, key=lambda r: (r.team_name, r.event_id)):
+        needed = {r.gender: r.n for r in rows}
+        if any(free_beds[g] < n for g, n in needed.items()):
+            unhoused.append(team)
+            if len(unhoused) >= chunk_size:
+                _copy_chunk(cursor, unhoused, "import_unhoused", ["team_name", "event_id"])
+                unhoused = []
+            continue
+        for g, n in needed.items():
+            free_beds[g] -= n
+    if unhoused:
+        _copy_chunk(cursor, unhoused, "import_unhoused", ["team_name", "event_id"])
+
+    db.execute(text("""
+        UPDATE participant_import s
+        SET error = 'team cannot be created as no suitable room space is available'
+        FROM import_unhoused u
+        WHERE s.error IS NULL AND s.team_name = u.team_name AND s.event_id = u.event_id
+    """))
+    return room_ids
+
+def import_participants(db: Session, fileobj, fmt: str, chunk_size: int, max_errors: int):
+    """
+    Imports participants (and their teams) from a CSV or NDJSON file.
+
+    Each row is one participant: team_name, event_id and the
+    ParticipantCreate fields. Rows with the same (team_name, event_id)
+    form one new team. The file is read and validated in chunks of
+    `chunk_size` rows, each chunk is COPYed into a temporary staging table,
+    and the staging table is then checked and merged into participants,
+    teams, team_members and team_events with set-based SQL in the same
+    transaction. A team is imported only if all its rows are valid and
+    every member gets a bed in a room of their gender, as with the JSON
+    endpoints; teams without beds are rejected in the report.
+
+    Memory use depends on chunk_size, not on the file size.
+    PostgreSQL only (needs COPY through psycopg2).
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        raise ValueError("Participant import requires PostgreSQL (COPY)")
+
+    try:
+        db.execute(text("""
+            CREATE TEMP TABLE participant_import (
+                row_no integer, team_name text, event_id integer,
+                name text, phone text, email text, merch_size text,
+                college_id integer, club_id integer, gender text,
+                error text, participant_id integer
+            ) ON COMMIT DROP
+        """))
+
+        # 1. Stream the file through validation into the staging table
+        cursor = db.connection().connection.dbapi_connection.cursor()
+        total_rows = 0
+        chunk = []
+        for row_no, row in _read_import_rows(fileobj, fmt):
+            chunk.append(_validate_import_row(row_no, row))
+            total_rows += 1
+            if len(chunk) >= chunk_size:
+                _copy_chunk(cursor, chunk)
+                chunk = []
+        if chunk:
+            _copy_chunk(cursor, chunk)
+        cursor.close()
+
+        db.execute(text("CREATE INDEX ON participant_import (team_name, event_id)"))
+        db.execute(text("ANALYZE participant_import"))
+
+        # 2. Checks that need the database, one statement each
+        db.execute(text("""
+            UPDATE participant_import s SET error = 'Event not found'
+            WHERE s.error IS NULL
+              AND NOT EXISTS (SELECT 1 FROM events e WHERE e.event_id = s.event_id)
+        """))
+        db.execute(text("""
+            UPDATE participant_import s SET error = 'College not found'
+            WHERE s.error IS NULL
+              AND NOT EXISTS (SELECT 1 FROM colleges c WHERE c.college_id = s.college_id)
+        """))
+        db.execute(text("""
+            UPDATE participant_import s SET error = 'Club not found'
+            WHERE s.error IS NULL AND s.club_id IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM clubs c WHERE c.club_id = s.club_id)
+        """))
+        db.execute(text("""
+            UPDATE participant_import s
+            SET error = format('Team size (%s) exceeds event limit (%s)', t.size, e.max_team_size)
+            FROM (
+                SELECT team_name, event_id, count(*) AS size
+                FROM participant_import GROUP BY team_name, event_id
+            ) t
+            JOIN events e ON e.event_id = t.event_id
+            WHERE s.error IS NULL
+              AND s.team_name = t.team_name AND s.event_id = t.event_id
+              AND t.size > e.max_team_size
+        """))
+        # A team is all or nothing: one bad row rejects its teammates too
+        db.execute(text("""
+            UPDATE participant_import s SET error = 'Another member of this team was rejected'
+            WHERE s.error IS NULL
+              AND EXISTS (
+                  SELECT 1 FROM participant_import b
+                  WHERE b.error IS NOT NULL
+                    AND b.team_name = s.team_name AND b.event_id = s.event_id
+              )
+        """))
+
+        # 3. Rooms: keep only the teams whose members all get a bed
+        cursor = db.connection().connection.dbapi_connection.cursor()
+        room_ids = _reject_unhoused_teams(db, cursor, chunk_size)
+        cursor.close()
+
+        # 4. Merge. Ids are drawn from the tables' own sequences up front so
+        #    the staging rows can be linked to the rows they become.
+        db.execute(text("""
+            CREATE TEMP TABLE import_teams ON COMMIT DROP AS
+            SELECT nextval(pg_get_serial_sequence('teams', 'team_id'))::integer AS team_id,
+                   team_name, event_id
+            FROM (SELECT DISTINCT team_name, event_id FROM participant_import WHERE error IS NULL) t
+        """))
+        db.execute(text("""
+            UPDATE participant_import
+            SET participant_id = nextval(pg_get_serial_sequence('participants', 'participant_id'))
+            WHERE error IS NULL
+        """))
+        db.execute(text("""
+            INSERT INTO teams (team_id, team_name)
+            SELECT team_id, team_name FROM import_teams
+        """))
+        db.execute(text("""
+            INSERT INTO team_events (team_id, event_id)
+            SELECT team_id, event_id FROM import_teams
+        """))
+        participants_created = db.execute(text("""
+            INSERT INTO participants (participant_id, name, phone, email, merch_size, college_id, club_id, gender)
+            SELECT participant_id, name, phone, email, merch_size::merch_size_enum,
+                   college_id, club_id, gender::gender_enum
+            FROM participant_import WHERE error IS NULL
+        """)).rowcount
+        db.execute(text("""
+            INSERT INTO team_members (team_id, participant_id)
+            SELECT t.team_id, s.participant_id
+            FROM participant_import s
+            JOIN import_teams t ON t.team_name = s.team_name AND t.event_id = s.event_id
+            WHERE s.error IS NULL
+        """))
+        # Beds: number the free beds of the locked rooms per gender (least
+        # occupied room first) and the imported participants per gender (in
+        # file order), and pair them up. The check above made sure there
+        # are enough; the room_reserved trigger updates room_occupancy.
+        db.execute(text("""
+            INSERT INTO room_reserved (participant_id, room_id)
+            SELECT p.participant_id, b.room_id
+            FROM (
+                SELECT participant_id, gender,
+                       row_number() OVER (PARTITION BY gender ORDER BY row_no) AS slot
+                FROM participant_import WHERE error IS NULL
+            ) p
+            JOIN (
+                SELECT r.room_id, r.gender::text AS gender,
+                       row_number() OVER (
+                           PARTITION BY r.gender ORDER BY o.current_occupancy, r.room_id, bed
+                       ) AS slot
+                FROM rooms r
+                JOIN room_occupancy o ON o.room_id = r.room_id
+                CROSS JOIN generate_series(1, r.max_capacity - o.current_occupancy) AS bed
+                WHERE r.room_id = ANY(:room_ids)
+            ) b ON b.gender = p.gender AND b.slot = p.slot
+        """), {"room_ids": room_ids})
+        if live.has_subscribers(live.ROOMS):
+            _queue_room_occupancy(db, db.execute(text("""
+                SELECT DISTINCT rr.room_id FROM room_reserved rr
+                JOIN participant_import s ON s.participant_id = rr.participant_id
+            """)).scalars().all())
+        db.execute(text("""
+            INSERT INTO event_stats AS es (event_id, team_count, participant_count)
+            SELECT t.event_id, count(DISTINCT t.team_id), count(*)
+            FROM import_teams t
+            JOIN participant_import s ON s.team_name = t.team_name AND s.event_id = t.event_id
+            WHERE s.error IS NULL
+            GROUP BY t.event_id
+            ORDER BY t.event_id
+            ON CONFLICT (event_id) DO UPDATE
+            SET team_count = es.team_count + EXCLUDED.team_count,
+                participant_count = es.participant_count + EXCLUDED.participant_count
+        """))
+
+        # 5. Build the report before the temp tables are dropped on commit
+        teams_created = db.execute(text("SELECT count(*) FROM import_teams")).scalar()
+        rejected = db.execute(text(
+            "SELECT count(*) FROM participant_import WHERE error IS NOT NULL"
+        )).scalar()
+        errors = [
+            {"row": r.row_no, "team_name": r.team_name, "error": r.error}
+            for r in db.execute(text("""
+                SELECT row_no, team_name, error FROM participant_import
+                WHERE error IS NOT NULL ORDER BY row_no LIMIT :limit
+            """), {"limit": max_errors})
+        ]
+
+        db.commit()
+
+        return {
+            "rows": total_rows,
+            "teams_created": teams_created,
+            "participants_created": participants_created,
+            "rejected": rejected,
+            "errors": errors
+        }
+
+    except Exception as e:
+        db.rollback() # Rollback all changes if any step fails
+        raise e # Re-raise the exception to be handled by main.py
+
+# --- Merch distribution ---
+def mark_merch_distributed(db: Session, participant_ids: List[int]):
+    """
+    Records that these participants have collected their merch. Safe to
+    repeat: a participant marked earlier keeps the time of the first scan.
+
+    The whole batch is one INSERT ... SELECT ... ON CONFLICT DO UPDATE
+    ... RETURNING. Selecting from participants skips unknown ids instead of
+    failing on the foreign key. Only when some ids come back unmarked
+    (rescans or unknown ids) does a second query tell the two apart.
+
+    Returns {"marked", "already_distributed"} lists of
+    {"participant_id", "time_of_distribution"}, and "not_found" ids.
+    """
+    ids = sorted(set(participant_ids))
+    if not ids:
+        return {"marked": [], "already_distributed": [], "not_found": []}
+
+    try:
+        # 1. Mark everyone not marked yet, in participant_id order so
+        #    concurrent batches lock rows in the same order
+        stmt = postgresql.insert(models.MerchDistribution).from_select(
+            ["participant_id", "distributed", "time_of_distribution"],
+            select(models.Participant.participant_id, true(), func.now())
+            .where(models.Participant.participant_id.in_(ids))
+            .order_by(models.Participant.participant_id)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.MerchDistribution.participant_id],
+            set_={"distributed": True, "time_of_distribution": stmt.excluded.time_of_distribution},
+            where=models.MerchDistribution.distributed.isnot(True)
+        ).returning(models.MerchDistribution.participant_id, models.MerchDistribution.time_of_distribution)
+        marked = dict(db.execute(stmt).all())
+
+        # 2. Sort the rest into rescans and unknown ids
+        already = {}
+        rest = [i for i in ids if i not in marked]
+        if rest:
+            already = dict(db.query(
+                models.MerchDistribution.participant_id, models.MerchDistribution.time_of_distribution
+            ).filter(
+                models.MerchDistribution.participant_id.in_(rest),
+                models.MerchDistribution.distributed.is_(True)
+            ).all())
+
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise e
+
+    return {
+        "marked": [{"participant_id": i, "time_of_distribution": t} for i, t in sorted(marked.items())],
+        "already_distributed": [{"participant_id": i, "time_of_distribution": t} for i, t in sorted(already.items())],
+        "not_found": [i for i in rest if i not in already],
+    }
+
+def get_merch_summary(db: Session):
+    """Participants, merch handed out and merch still pending per size, in one grouped query."""
+    distributed = func.count(models.MerchDistribution.participant_id).filter(
+        models.MerchDistribution.distributed.is_(True)
+    )
+    rows = db.query(
+        models.Participant.merch_size,
+        func.count(models.Participant.participant_id).label("total"),
+        distributed.label("distributed")
+    ).outerjoin(
+        models.MerchDistribution,
+        models.Participant.participant_id == models.MerchDistribution.participant_id
+    ).group_by(
+        models.Participant.merch_size
+    ).order_by(
+        models.Participant.merch_size
+    ).all()
+
+    return [
+        {"merch_size": r.merch_size, "total": r.total, "distributed": r.distributed, "pending": r.total - r.distributed}
+        for r in rows
+    ]
+
+def find_participants_for_merch(db: Session, phone: str | None, email: str | None, page: Page) -> PageResult:
+    """
+    Participants with this phone number and/or email (case-insensitive),
+    with their merch status: (Participant, distributed, time_of_distribution).
+    Served by ix_participants_phone / ix_participants_email_lower.
+    """
+    query = db.query(
+        models.Participant,
+        func.coalesce(models.MerchDistribution.distributed, False).label("distributed"),
+        models.MerchDistribution.time_of_distribution
+    ).outerjoin(
+        models.MerchDistribution,
+        models.Participant.participant_id == models.MerchDistribution.participant_id
+    )
+    if phone:
+        query = query.filter(models.Participant.phone == phone.strip())
+    if email:
+        query = query.filter(func.lower(models.Participant.email) == email.strip().lower())
+
+    return paginate(query, models.Participant.participant_id, page, key_of=lambda row: row.Participant.participant_id)
+
+# --- Certificates ---
+def issue_certificates(db: Session, event_id: int, certificate_type: str):
+    """
+    Gives every participant registered for the event a certificate of this
+    type, in one INSERT ... SELECT. Participants who already hold one for
+    the event are skipped, so it is safe to run again after late
+    registrations. Returns {"event_id", "certificate_type", "issued", "total"}.
+    """
+    try:
+        # 1. Lock the event row so two concurrent runs can't both issue
+        #    the same certificates
+        event = db.query(models.Event).filter(
+            models.Event.event_id == event_id
+        ).with_for_update().first()
+        if not event:
+            raise ValueError("Event not found")
+
+        # 2. One certificate per registered participant who lacks one
+        already_issued = select(models.Certificate.certificate_id).where(
+            models.Certificate.event_id == event_id,
+            models.Certificate.participant_id == models.TeamMember.participant_id
+        ).exists()
+        registered = select(
+            models.TeamMember.participant_id, literal(event_id), literal(certificate_type)
+        ).distinct().join(
+            models.TeamEvent, models.TeamMember.team_id == models.TeamEvent.team_id
+        ).where(
+            models.TeamEvent.event_id == event_id,
+            ~already_issued
+        ).order_by(models.TeamMember.participant_id)
+        issued = db.execute(
+            insert(models.Certificate).from_select(["participant_id", "event_id", "certificate_type"], registered)
+        ).rowcount
+
+        total = db.query(func.count(models.Certificate.certificate_id)).filter(
+            models.Certificate.event_id == event_id
+        ).scalar()
+
+        db.commit()
+        return {"event_id": event_id, "certificate_type": certificate_type, "issued": issued, "total": total}
+
+    except Exception as e:
+        db.rollback()
+        raise e
+
+def count_certificates(db: Session, event_id: int, after_id: int = 0) -> int:
+    """
+    The event's certificates after `after_id`. Raises ValueError if the
+    event doesn't exist.
+    """
+    if not get_event(db, event_id=event_id):
+        raise ValueError("Event not found")
+
+    return db.query(func.count(models.Certificate.certificate_id)).filter(
+        models.Certificate.event_id == event_id,
+        models.Certificate.certificate_id > after_id
+    ).scalar()
+
+def get_certificate_rows(db: Session, event_id: int, after_id: int = 0, batch_size: int = 1000):
+    """
+    Yields what certificates.render_certificate() needs for each of the
+    event's certificates after `after_id`, in certificate_id order (so an
+    interrupted download or run can pick up where it stopped). Rows come
+    from a server-side cursor `batch_size` at a time.
+    """
+    query = db.query(
+        models.Certificate.certificate_id,
+        models.Certificate.certificate_type,
+        models.Participant.name.label("participant_name"),
+        models.College.name.label("college"),
+        models.Event.name.label("event_name"),
+        models.Event.date.label("event_date"),
+        models.Fest.name.label("fest_name"),
+        models.Fest.year.label("fest_year")
+    ).join(
+        models.Participant, models.Certificate.participant_id == models.Participant.participant_id
+    ).join(
+        models.Event, models.Certificate.event_id == models.Event.event_id
+    ).outerjoin(
+        models.College, models.Participant.college_id == models.College.college_id
+    ).outerjoin(
+        models.Fest, models.Event.fest_id == models.Fest.fest_id
+    ).filter(
+        models.Certificate.event_id == event_id,
+        models.Certificate.certificate_id > after_id
+    ).order_by(
+        models.Certificate.certificate_id
+    ).yield_per(batch_size)
+
+    for row in query:
+        yield row._asdict()
+
 # --- College and Club CRUD ---
+@cached("colleges")
 def get_college_by_name(db: Session, name: str):
     """Fetches a college by name."""
     return db.query(models.College).filter(models.College.name == name).first()
 
 def create_college(db: Session, college: schemas.CollegeCreate):
-    """Creates a new college in the DB."""
+    """Creates a new college in the DB. Raises ValueError if the name is taken."""
+    if get_college_by_name(db, name=college.name):
+        raise ValueError("College with this name already exists")
+
     db_college = models.College(**college.model_dump())
     db.add(db_college)
     db.commit()
+    invalidate("colleges")
     db.refresh(db_college)
     return db_college
 
+@cached("clubs")
 def get_club_by_name(db: Session, name: str):
     """Fetches a club by name."""
     return db.query(models.Club).filter(models.Club.club_name == name).first() # <-- Changed from 'models.Club.name'
 
 def create_club(db: Session, club: schemas.ClubCreate):
-    """Creates a new club in the DB."""
+    """Creates a new club in the DB. Raises ValueError if the name is taken."""
+    if get_club_by_name(db, name=club.club_name):
+        raise ValueError("Club with this name already exists")
+
     db_club = models.Club(**club.model_dump())
     db.add(db_club)
     db.commit()
+    invalidate("clubs")
     db.refresh(db_club)
     return db_club
 
 #-- room crud--
+@cached("rooms")
 def get_room_by_details(db: Session, building_name: str, room_no: str):
     """
     Fetches a room by its building name and room number to check for duplicates.
@@ -226,7 +1078,11 @@ def create_room(db: Session, room: schemas.RoomCreate):
     """
     Creates a new room in the DB AND initializes its occupancy record.
     This is now a single transaction.
+    Raises ValueError if the building already has a room with this number.
     """
+    if get_room_by_details(db, building_name=room.building_name, room_no=room.room_no):
+        raise ValueError("Room with this building name and room number already exists")
+
     try:
         # 1. Create the room
         db_room = models.Room(**room.model_dump())
@@ -245,6 +1101,7 @@ def create_room(db: Session, room: schemas.RoomCreate):
         
         # 4. Commit both operations as a single transaction
         db.commit()
+        invalidate("rooms")
         
         # 5. Refresh the room object
         db.refresh(db_room)
@@ -265,218 +1122,324 @@ def add_participant_to_room_reserved(db: Session, participant_id: int, room_id:
     db.add(db_reservation)
     return db_reservation
 
-def increment_room_occupancy(db: Session, room_id: int):
-    """
-    Finds the occupancy record for a room and increments its count.
-    DOES NOT COMMIT. This is intended to be used within a transaction.
-    """
-    # Fetch the occupancy record
-    db_occupancy = db.query(models.RoomOccupancy).filter(
-        models.RoomOccupancy.room_id == room_id
-    ).first()
-    
-    if db_occupancy:
-        # Increment the count
-        db_occupancy.current_occupancy += 1
-        return db_occupancy
-    else:
-        # This should not happen if create_room is used correctly
-        raise Exception(f"No RoomOccupancy record found for room_id {room_id}")
-    
-def decrement_room_occupancy(db: Session, room_id: int, count: int = 1):
+def _queue_room_occupancy(db: Session, room_ids):
+    """Queues the current occupancy of `room_ids` for live clients (one query, only if anyone listens)."""
+    if not room_ids or not live.has_subscribers(live.ROOMS):
+        return
+    rows = db.query(models.RoomOccupancy.room_id, models.RoomOccupancy.current_occupancy).filter(
+        models.RoomOccupancy.room_id.in_(sorted(set(room_ids)))
+    ).all()
+    for row in rows:
+        live.queue(db, live.ROOMS, {
+            "type": "room_occupancy", "room_id": row.room_id, "current_occupancy": row.current_occupancy
+        })
+
+def _lock_rooms_with_space(db: Session, gender: str, needed: int | None, skip_locked: bool):
     """
-    Finds the occupancy record for a room and decrements its count.
-    Ensures occupancy does not go below zero.
-    DOES NOT COMMIT. This is intended to be used within a transaction.
+    Locks (SELECT ... FOR UPDATE) up to `needed` rooms of the given gender
+    that still have space, least occupied first. Every locked room has at
+    least one free bed, so `needed` rooms are always enough for `needed` people.
+    needed=None locks every room of that gender with space.
+
+    With skip_locked, rooms another registration is filling right now are
+    skipped instead of waited on. Without it we wait, and lock in room_id
+    order so two waiting transactions can't deadlock each other.
     """
-    # Fetch the occupancy record
-    db_occupancy = db.query(models.RoomOccupancy).filter(
-        models.RoomOccupancy.room_id == room_id
-    ).first()
-    
-    if db_occupancy:
-        # Decrement the count, ensuring it stays at 0 or above
-        db_occupancy.current_occupancy = max(0, db_occupancy.current_occupancy - count)
-        return db_occupancy
+    query = db.query(
+        models.RoomOccupancy.room_id,
+        models.RoomOccupancy.current_occupancy,
+        models.Room.max_capacity
+    ).join(
+        models.Room,
+        models.Room.room_id == models.RoomOccupancy.room_id
+    ).filter(
+        models.Room.gender == gender,
+        models.Room.has_space,  # matches the partial index ix_rooms_gender_with_space
+        models.RoomOccupancy.current_occupancy < models.Room.max_capacity
+    )
+
+    if skip_locked:
+        query = query.order_by(
+            models.RoomOccupancy.current_occupancy.asc(),
+            models.RoomOccupancy.room_id.asc()
+        ).with_for_update(of=models.RoomOccupancy, skip_locked=True)
     else:
-        # This case is problematic (data inconsistency), but we shouldn't
-        # block the team deletion. We'll just return None.
-        return None
+        query = query.order_by(
+            models.RoomOccupancy.room_id.asc()
+        ).with_for_update(of=models.RoomOccupancy)
 
-def _remove_reservation_no_commit(db: Session, participant_id: int):
+    if needed is not None:
+        query = query.limit(needed)
+    return query.all()
+
+def _write_room_claims(db: Session, assignments: dict, locked_occupancy: dict):
     """
-    Internal helper: Finds and removes a participant's room reservation.
-    Decrements room occupancy.
+    Writes {participant_id: room_id} assignments for rooms the caller has
+    already locked, as one multi-row INSERT into room_reserved; the
+    room_reserved trigger updates room_occupancy to match.
+    `locked_occupancy` is {room_id: current_occupancy} as read when the
+    rooms were locked; it gives the new counts to publish to live clients.
     DOES NOT COMMIT.
     """
-    # 1. Find the participant's reservation
-    reservation = db.query(models.RoomReserved).filter(
-        models.RoomReserved.participant_id == participant_id
-    ).first()
-    
-    if not reservation:
-        # Participant has no reservation, nothing to do
-        return None
-        
-    # 2. Get the room_id from the reservation
-    room_id = reservation.room_id
-    
-    # 3. Delete the reservation
-    db.delete(reservation)
-    
-    # 4. Decrement the room's occupancy (this is already a no-commit fn)
-    decrement_room_occupancy(db, room_id, count=1)
-    
-    return reservation
+    if not assignments:
+        return
 
-def remove_reservation(db: Session, participant_id: int):
-    """
-    Removes a participant's room reservation and decrements occupancy.
-    This function manages its own transaction (commit/rollback).
-    """
-    try:
-        deleted_res = _remove_reservation_no_commit(db, participant_id)
-        
-        if deleted_res:
-            db.commit()
-            return deleted_res
-        else:
-            # No reservation found, no changes to commit or rollback
-            return None
-            
-    except Exception as e:
-        db.rollback()
-        raise e
+    claimed = {}  # room_id -> beds taken
+    for room_id in assignments.values():
+        claimed[room_id] = claimed.get(room_id, 0) + 1
+
+    db.execute(
+        insert(models.RoomReserved),
+        [{"participant_id": pid, "room_id": rid} for pid, rid in assignments.items()]
+    )
 
-def assign_room_to_participant(db: Session, participant_id: int):
+    for room_id, count in sorted(claimed.items()):
+        live.queue(db, live.ROOMS, {
+            "type": "room_occupancy", "room_id": room_id,
+            "current_occupancy": locked_occupancy[room_id] + count
+        })
+
+def allocate_rooms(db: Session, participants: List[models.Participant]):
     """
-    Finds the first available room for a participant based on their gender
-    and available capacity, then assigns them to it.
-    
-    This function manages its own transaction (commit/rollback).
-    
+    Gives each participant a bed in a room of their gender, all or nothing.
+
+    Candidate rooms are row-locked first, so concurrent registrations can
+    never both claim the last bed of a room. Members are then spread over
+    the locked rooms least-occupied first, and the claim is written with
+    one multi-row INSERT into room_reserved (the trigger on it updates
+    room_occupancy).
+
+    DOES NOT COMMIT. This is intended to be used within a transaction:
+    the locks are held until the caller commits or rolls back.
+
     Returns:
-        - The new 'models.RoomReserved' object if successful.
-        - The *existing* 'models.RoomReserved' object if participant is already assigned.
-        - None if no suitable room is available.
+        - {participant_id: room_id} if everyone got a room.
+        - None if there is not enough space (nothing is written).
     """
-    
-    # 1. Get participant details (especially gender)
-    participant = db.query(models.Participant).filter(
-        models.Participant.participant_id == participant_id
-    ).first()
-    
-    if not participant:
-        raise ValueError(f"Participant with id {participant_id} not found.")
+    # Group the participants by gender
+    by_gender = {}
+    for p in participants:
+        gender = p.gender.value if hasattr(p.gender, "value") else p.gender
+        by_gender.setdefault(gender, []).append(p)
 
-    # 2. Check if participant is already assigned a room
-    existing_reservation = db.query(models.RoomReserved).filter(
-        models.RoomReserved.participant_id == participant_id
-    ).first()
-    
-    if existing_reservation:
-        return existing_reservation # Already assigned, do nothing
-
-    participant_gender = participant.gender # Assumes participant model has 'gender'
-
-    # 3. Find the first available room
-    #    We join Room (for max_capacity and gender)
-    #    with RoomOccupancy (for current_occupancy)
-    available_room = db.query(models.Room) \
-        .join(models.RoomOccupancy, models.Room.room_id == models.RoomOccupancy.room_id) \
-        .filter(
-            models.Room.gender == participant_gender,
-            models.RoomOccupancy.current_occupancy < models.Room.max_capacity
-        ) \
-        .order_by(models.RoomOccupancy.current_occupancy.asc()) \
-        .first() # Get the first room that's not full
-    
-    if not available_room:
-        return None
+    assignments = {}
+    locked_occupancy = {}  # room_id -> occupancy when locked
 
-    try:
-        # Add to RoomReserved (adds to session)
-        db_reservation = add_participant_to_room_reserved(
-            db=db,
-            participant_id=participant_id,
-            room_id=available_room.room_id
-        )
-        
-        increment_room_occupancy(db=db, room_id=available_room.room_id)
-        
-        db.commit()
-        
-        db.refresh(db_reservation)
-        return db_reservation
-        
-    except Exception as e:
-        db.rollback() # Rollback on failure
-        raise e # Re-raise exception for the API layer to handle
+    for gender, members in sorted(by_gender.items()):
+        savepoint = db.begin_nested()
+        rooms = _lock_rooms_with_space(db, gender, len(members), skip_locked=True)
+        if sum(r.max_capacity - r.current_occupancy for r in rooms) < len(members):
+            # Not enough unlocked space: wait for the busy rooms instead of failing.
+            # Rolling back to the savepoint first drops the rooms we just locked,
+            # so we never wait while holding a room another waiter needs (deadlock).
+            savepoint.rollback()
+            rooms = _lock_rooms_with_space(db, gender, len(members), skip_locked=False)
+            if sum(r.max_capacity - r.current_occupancy for r in rooms) < len(members):
+                return None
+        else:
+            savepoint.commit()
+
+        locked_occupancy.update((r.room_id, r.current_occupancy) for r in rooms)
+        # (occupancy, room_id, capacity) heap so each member goes to the emptiest room
+        heap = [(r.current_occupancy, r.room_id, r.max_capacity) for r in rooms]
+        heapq.heapify(heap)
+        for member in members:
+            occupancy, room_id, capacity = heapq.heappop(heap)
+            assignments[member.participant_id] = room_id
+            if occupancy + 1 < capacity:
+                heapq.heappush(heap, (occupancy + 1, room_id, capacity))
+
+    _write_room_claims(db, assignments, locked_occupancy)
+    return assignments
 
-def get_all_rooms_with_occupancy(db: Session):
+def get_all_rooms_with_occupancy(db: Session, page: Page) -> PageResult:
     """
-    Returns all rooms with their current occupancy.
+    Returns one page of rooms with their current occupancy.
     """
-    return db.query(
+    query = db.query(
         models.Room,
         models.RoomOccupancy.current_occupancy
     ).join(
         models.RoomOccupancy,
         models.Room.room_id == models.RoomOccupancy.room_id
-    ).all()
+    )
+    return paginate(query, models.Room.room_id, page, key_of=lambda row: row.Room.room_id)
+
+def audit_room_occupancy(db: Session):
+    """
+    Compares every room's occupancy counter with its actual number of
+    reservations, in one grouped query. Returns one
+    {"room_id", "stored", "counted", "max_capacity"} dict per room that
+    disagrees (stored is None if the room has no occupancy row).
+    """
+    counted = func.count(models.RoomReserved.participant_id)
+    rows = db.query(
+        models.Room.room_id,
+        models.Room.max_capacity,
+        models.RoomOccupancy.current_occupancy.label("stored"),
+        counted.label("counted")
+    ).outerjoin(
+        models.RoomOccupancy, models.Room.room_id == models.RoomOccupancy.room_id
+    ).outerjoin(
+        models.RoomReserved, models.Room.room_id == models.RoomReserved.room_id
+    ).group_by(
+        models.Room.room_id, models.Room.max_capacity, models.RoomOccupancy.current_occupancy
+    ).having(
+        models.RoomOccupancy.current_occupancy.is_distinct_from(counted)
+    ).order_by(models.Room.room_id).all()
 
-def get_participants_by_room(db: Session, room_id: int):
+    return [
+        {"room_id": r.room_id, "stored": r.stored, "counted": r.counted, "max_capacity": r.max_capacity}
+        for r in rows
+    ]
+
+def get_participants_by_room(db: Session, room_id: int, page: Page) -> PageResult:
     """
-    Returns all participants currently residing in a given room.
+    Returns one page of the participants currently residing in a given room.
     """
-    return db.query(models.Participant).join(
+    query = db.query(models.Participant).join(
         models.RoomReserved,
         models.Participant.participant_id == models.RoomReserved.participant_id
     ).filter(
         models.RoomReserved.room_id == room_id
-    ).all()
+    )
+    return paginate(query, models.Participant.participant_id, page)
 # -- Event crud --
 
+@cached("events")
 def get_event(db: Session, event_id: int):
     """Helper function to get an event by its ID."""
     return db.query(models.Event).filter(models.Event.event_id == event_id).first()
 
+@cached("events")
 def get_event_by_name(db: Session, name: str):
     """Get a single event by its name."""
     return db.query(models.Event).filter(models.Event.name == name).first()
 
 def create_event(db: Session, event: schemas.EventCreate):
-    """Create a new event."""
+    """
+    Create a new event. Raises ValueError if the name is taken or the fest
+    doesn't exist.
+    """
+    if get_event_by_name(db, name=event.name):
+        raise ValueError(f"Event with name '{event.name}' already exists")
+    if not get_fest(db, fest_id=event.fest_id):
+        raise ValueError(f"Fest with fest_id {event.fest_id} not found")
+
     # Use .model_dump() instead of .dict()
     db_event = models.Event(**event.model_dump()) 
     db.add(db_event)
+    db.flush()
+    db.add(models.EventStats(event_id=db_event.event_id, team_count=0, participant_count=0))
     db.commit()
+    invalidate("events")
     db.refresh(db_event)
     return db_event
 
 def get_event_stats(db:Session, event_id:int):
-    team_count = db.query(models.TeamEvent).filter(
-        models.TeamEvent.event_id == event_id
-    ).count()
-    
-    # Count participants (through teams)
-    participant_count = db.query(models.Participant).join(
-        models.TeamMember,
-        models.Participant.participant_id == models.TeamMember.participant_id
-    ).join(
-        models.TeamEvent,
-        models.TeamMember.team_id == models.TeamEvent.team_id
-    ).filter(
-        models.TeamEvent.event_id == event_id
-    ).distinct().count()
+    """
+    Team and participant counts for an event, read from event_stats.
+    Raises ValueError if the event doesn't exist.
+    """
+    if not get_event(db, event_id=event_id):
+        raise ValueError("Event not found")
+
+    stats = db.get(models.EventStats, event_id)
 
     return {
         "event_id": event_id,
-        "team_count": team_count,
-        "participant_count": participant_count
+        "team_count": stats.team_count if stats else 0,
+        "participant_count": stats.participant_count if stats else 0
     }
+
+def _bump_event_stats(db: Session, deltas: dict):
+    """
+    Adds {event_id: (teams, participants)} deltas to event_stats with one
+    upsert, in event_id order so concurrent writers lock rows in the same
+    order. Callers do this at the end of their transaction, after any room
+    locks, since each row stays locked until commit. The new counts are
+    queued for live clients.
+    DOES NOT COMMIT.
+    """
+    if not deltas:
+        return
+
+    stmt = postgresql.insert(models.EventStats).values([
+        {"event_id": event_id, "team_count": teams, "participant_count": participants}
+        for event_id, (teams, participants) in sorted(deltas.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.EventStats.event_id],
+        set_={
+            "team_count": models.EventStats.team_count + stmt.excluded.team_count,
+            "participant_count": models.EventStats.participant_count + stmt.excluded.participant_count,
+        }
+    ).returning(models.EventStats.event_id, models.EventStats.team_count, models.EventStats.participant_count)
+    for row in db.execute(stmt):
+        live.queue(db, live.EVENTS, {
+            "type": "event_stats", "event_id": row.event_id,
+            "team_count": row.team_count, "participant_count": row.participant_count
+        })
+
+def _counted_event_stats_query(db: Session):
+    """(event_id, team_count, participant_count) for every event, counted from the team tables."""
+    return db.query(
+        models.Event.event_id,
+        func.count(distinct(models.TeamEvent.team_id)).label("team_count"),
+        func.count(distinct(models.TeamMember.participant_id)).label("participant_count")
+    ).outerjoin(
+        models.TeamEvent,
+        models.Event.event_id == models.TeamEvent.event_id
+    ).outerjoin(
+        models.TeamMember,
+        models.TeamEvent.team_id == models.TeamMember.team_id
+    ).group_by(
+        models.Event.event_id
+    )
+
+def reconcile_event_stats(db: Session, fix: bool = False):
+    """
+    Recounts every event's teams and participants from the team tables and
+    compares them with event_stats. Returns one dict per event that
+    drifted (stored vs counted); with fix=True the counted values are
+    written back.
+
+    On PostgreSQL event_stats is locked against writers while this runs,
+    so registrations that commit meanwhile can't be overwritten.
+    """
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("LOCK TABLE event_stats IN EXCLUSIVE MODE"))
+
+        stored = {
+            row.event_id: (row.team_count, row.participant_count)
+            for row in db.query(models.EventStats).all()
+        }
+        drift = []
+        for row in _counted_event_stats_query(db).all():
+            counted = (row.team_count, row.participant_count)
+            if stored.get(row.event_id) != counted:
+                drift.append({"event_id": row.event_id, "stored": stored.get(row.event_id), "counted": counted})
+
+        if fix:
+            for item in drift:
+                db.merge(models.EventStats(
+                    event_id=item["event_id"],
+                    team_count=item["counted"][0],
+                    participant_count=item["counted"][1]
+                ))
+
+        if fix:
+            db.commit()
+        else:
+            db.rollback()  # release the lock
+        return drift
+
+    except Exception as e:
+        db.rollback()
+        raise e
 #--filter crud--
-def get_participants_by_filters(
+def _participant_filter_query(
     db: Session, 
     college_name: str | None,
     club_id: int | None,
@@ -484,10 +1447,11 @@ def get_participants_by_filters(
     state: str | None,
     city: str | None,
     event_id: int | None
-) -> List[models.Participant]:
+):
     """
-    Dynamically queries the Participant table based on provided filters,
-    joining with College, Club, and Event tables as needed.
+    Dynamically builds a query on the Participant table based on provided
+    filters, joining with College, Club, and Event tables as needed.
+    Shared by the paginated listing and the streaming export.
     """
     
     # Start with a query for all participants
@@ -546,11 +1510,106 @@ def get_participants_by_filters(
         
     # Prevent duplicate participants if multiple joins match
     query = query.distinct()
-        
-    # Execute the final query and return all results
-    return query.all()
 
-def get_colleges_by_filters(db: Session, city: str | None, state: str | None) -> List[models.College]:
+    return query
+
+def get_participants_by_filters(
+    db: Session, 
+    college_name: str | None,
+    club_id: int | None,
+    gender: schemas.Gender | None,
+    state: str | None,
+    city: str | None,
+    event_id: int | None,
+    page: Page
+) -> PageResult:
+    """
+    Queries participants matching the given filters, one page at a time.
+    """
+    query = _participant_filter_query(db, college_name, club_id, gender, state, city, event_id)
+
+    # Execute the final query and return one page of results
+    return paginate(query, models.Participant.participant_id, page)
+
+EXPORT_COLUMNS = [
+    "participant_id", "name", "phone", "email", "merch_size", "gender",
+    "college", "club", "events", "building_name", "room_no"
+]
+
+def export_participants(
+    db: Session, 
+    college_name: str | None,
+    club_id: int | None,
+    gender: schemas.Gender | None,
+    state: str | None,
+    city: str | None,
+    event_id: int | None,
+    batch_size: int
+):
+    """
+    Yields full roster rows (participant, college, club, event names and
+    room) for every participant matching the filters, as dicts keyed by
+    EXPORT_COLUMNS.
+
+    Rows come from a server-side cursor `batch_size` at a time, so memory
+    use doesn't grow with the number of participants. A participant in
+    several events appears in several joined rows; they arrive next to
+    each other (ordered by participant_id) and are folded into one here.
+    """
+    matching = _participant_filter_query(
+        db, college_name, club_id, gender, state, city, event_id
+    ).with_entities(models.Participant.participant_id).subquery()
+
+    query = db.query(
+        models.Participant.participant_id,
+        models.Participant.name,
+        models.Participant.phone,
+        models.Participant.email,
+        models.Participant.merch_size,
+        models.Participant.gender,
+        models.College.name.label("college"),
+        models.Club.club_name.label("club"),
+        models.Event.name.label("event"),
+        models.Room.building_name,
+        models.Room.room_no
+    ).join(
+        matching, matching.c.participant_id == models.Participant.participant_id
+    ).outerjoin(
+        models.College, models.Participant.college_id == models.College.college_id
+    ).outerjoin(
+        models.Club, models.Participant.club_id == models.Club.club_id
+    ).outerjoin(
+        models.TeamMember, models.Participant.participant_id == models.TeamMember.participant_id
+    ).outerjoin(
+        models.TeamEvent, models.TeamMember.team_id == models.TeamEvent.team_id
+    ).outerjoin(
+        models.Event, models.TeamEvent.event_id == models.Event.event_id
+    ).outerjoin(
+        models.RoomReserved, models.Participant.participant_id == models.RoomReserved.participant_id
+    ).outerjoin(
+        models.Room, models.RoomReserved.room_id == models.Room.room_id
+    ).order_by(
+        models.Participant.participant_id, models.Event.name
+    ).yield_per(batch_size)
+
+    for _, rows in groupby(query, key=lambda r: r.participant_id):
+        rows = list(rows)
+        first = rows[0]
+        yield {
+            "participant_id": first.participant_id,
+            "name": first.name,
+            "phone": first.phone,
+            "email": first.email,
+            "merch_size": first.merch_size,
+            "gender": first.gender,
+            "college": first.college,
+            "club": first.club,
+            "events": [r.event for r in rows if r.event is not None],
+            "building_name": first.building_name,
+            "room_no": first.room_no
+        }
+
+def get_colleges_by_filters(db: Session, city: str | None, state: str | None, page: Page) -> PageResult:
     """
     Dynamically queries the College table based on city and/or state.
     """
@@ -562,9 +1621,9 @@ def get_colleges_by_filters(db: Session, city: str | None, state: str | None) ->
     if state:
         query = query.filter(models.College.state.ilike(f"%{state}%"))
         
-    return query.all()
+    return paginate(query, models.College.college_id, page)
 
-def get_clubs_by_filters(db: Session, club_type: schemas.CategoryEnum | None) -> List[models.Club]:
+def get_clubs_by_filters(db: Session, club_type: schemas.CategoryEnum | None, page: Page) -> PageResult:
     """
     Dynamically queries the Club table based on club type.
     """
@@ -574,31 +1633,83 @@ def get_clubs_by_filters(db: Session, club_type: schemas.CategoryEnum | None) ->
         # Use .ilike() for case-insensitive partial matching
         query = query.filter(models.Club.club_type == club_type)
         
-    return query.all()
+    return paginate(query, models.Club.club_id, page)
+
+def _apply_event_filters(query, category, venue, date):
+    """
+    Applies the shared event filters (category, venue, date) to a query
+    that selects from the Event table.
+    """
+    if category:
+        query = query.filter(models.Event.category == category)
+        
+    if venue:
+        query = query.filter(models.Event.venue.ilike(f"%{venue}%"))
+
+    if date:
+        query = query.filter(models.Event.date == date)
+
+    return query
 
 def get_events_by_filters(
     db: Session,
     category: schemas.CategoryEnum | None,
     venue: str | None,
-    date: date | None # Make sure `from datetime import date` is at the top
-) -> List[models.Event]:
+    date: date | None, # Make sure `from datetime import date` is at the top
+    page: Page
+) -> PageResult:
     """
     Dynamically queries the Event table based on provided filters.
     """
     
     # Start with a query for all events
     query = db.query(models.Event)
-    
-    if category:
-        query = query.filter(models.Event.category == category)
+    query = _apply_event_filters(query, category, venue, date)
         
-    if venue:
-        query = query.filter(models.Event.venue.ilike(f"%{venue}%"))
+    # Execute the final query and return one page of results
+    return paginate(query, models.Event.event_id, page)
 
-    if date:
-        query = query.filter(models.Event.date == date)
-        
-    # Execute the final query and return all results
-    return query.all()
+def _event_stats_query(db: Session, *entities):
+    """
+    Selects the given entities with each event's counts from event_stats.
+    The LEFT JOIN keeps events without a stats row (their counts come back as 0).
+    """
+    team_count = func.coalesce(models.EventStats.team_count, 0).label("team_count")
+    participant_count = func.coalesce(models.EventStats.participant_count, 0).label("participant_count")
+
+    return db.query(*entities, team_count, participant_count).outerjoin(
+        models.EventStats,
+        models.Event.event_id == models.EventStats.event_id
+    )
+
+def get_event_stats_by_filters(
+    db: Session,
+    category: schemas.CategoryEnum | None,
+    venue: str | None,
+    date: date | None,
+    page: Page
+) -> PageResult:
+    """
+    Returns (event_id, team_count, participant_count) rows for every event
+    matching the filters, read from event_stats.
+    """
+    query = _event_stats_query(db, models.Event.event_id)
+    query = _apply_event_filters(query, category, venue, date)
+    return paginate(query, models.Event.event_id, page)
+
+def get_events_with_stats_by_filters(
+    db: Session,
+    category: schemas.CategoryEnum | None,
+    venue: str | None,
+    date: date | None,
+    page: Page
+) -> PageResult:
+    """
+    Same as get_events_by_filters, but each row also carries the event's
+    team_count and participant_count: (Event, team_count, participant_count).
+    """
+    query = _event_stats_query(db, models.Event)
+    query = _apply_event_filters(query, category, venue, date)
+    return paginate(query, models.Event.event_id, page, key_of=lambda row: row.Event.event_id)
 
 
@@ -0,0 +1,105 @@
+"""
+ETag / If-None-Match support for GET endpoints.
+
+ConditionalGetMiddleware hashes each complete 200 response on the
+configured routes into a strong ETag. It also sets the route's
+Cache-Control header. When the client's If-None-Match matches, it answers
+304 Not Modified with no body. Polling clients then get a few hundred
+bytes back instead of the whole list whenever nothing changed.
+
+Routes are matched by path prefix (longest prefix wins) against
+CACHE_CONTROL_RULES. Streaming responses (more than one body chunk, e.g.
+/participants/export/) pass through untouched.
+"""
+import hashlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Response headers that are part of the content, so they go into the ETag
+# along with the body: the same page with a different next cursor or
+# total is a different response
+_HASHED_HEADERS = (b"x-next-cursor", b"x-total-count")
+
+
+def make_etag(body: bytes, headers: list) -> str:
+    digest = hashlib.blake2b(body, digest_size=16)
+    for name, value in headers:
+        if name.lower() in _HASHED_HEADERS:
+            digest.update(b"\0" + name.lower() + b"=" + value)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x"."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ConditionalGetMiddleware:
+    def __init__(self, app, rules: dict):
+        self.app = app
+        # Longest prefix first, so "/events/stats/" can override "/events/"
+        self.rules = sorted(rules.items(), key=lambda rule: len(rule[0]), reverse=True)
+
+    def _cache_control_for(self, path: str):
+        for prefix, cache_control in self.rules:
+            if path.startswith(prefix):
+                return cache_control
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        cache_control = self._cache_control_for(scope["path"])
+        if not cache_control:
+            return await self.app(scope, receive, send)
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start = None
+        chunks = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if passthrough:
+                return await send(message)
+
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                # A streamed body: don't buffer it, send what we have and step aside
+                passthrough = True
+                await send(start)
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+                return
+
+            body = b"".join(chunks)
+            if start["status"] != 200:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            headers = MutableHeaders(raw=list(start["headers"]))
+            etag = make_etag(body, headers.raw)
+            headers["etag"] = etag
+            if "cache-control" not in headers:
+                headers["cache-control"] = cache_control
+
+            if if_none_match and etag_matches(if_none_match, etag):
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -5,6 +5,8 @@ const AccommodationModule = (function () {
     const API_URL = 'http://127.0.0.1:8000';
     let roomsTable;
     let participantsInRoomTable;
+    let roomsPager;
+    let roomParticipantsPager;
     let currentRoomId = null;
 
     function init() {
@@ -52,6 +54,10 @@ const AccommodationModule = (function () {
             pageLength: 25
         });
 
+        roomsPager = createCursorPager(document.getElementById('rooms-table'), updateRoomsTable);
+        roomParticipantsPager = createCursorPager(
+            document.getElementById('participants-in-room-table'), updateParticipantsInRoomTable);
+
         const user = getStoredUser();
         const addRoomButton = document.querySelector('[data-bs-target="#addRoomModal"]');
         if (addRoomButton) {
@@ -65,6 +71,27 @@ const AccommodationModule = (function () {
 
         // Load initial data
         loadRooms();
+        subscribeToOccupancy();
+    }
+
+    // The server pushes each room whose occupancy changed (/live/), so the
+    // table stays current without reloading every room
+    function subscribeToOccupancy() {
+        const source = new EventSource(`${API_URL}/live/?topic=rooms`);
+
+        source.addEventListener('room_occupancy', (e) => {
+            const change = JSON.parse(e.data);
+            const row = roomsTable.row((idx, data) => data.room_id === change.room_id);
+            if (!row.any()) return;
+
+            row.data({ ...row.data(), current_occupancy: change.current_occupancy }).draw(false);
+            if (currentRoomId === change.room_id) {
+                updateRoomDetailsHeader(currentRoomId);
+            }
+        });
+
+        // We missed some changes; reload the page of rooms on screen
+        source.addEventListener('resync', () => roomsPager.reload());
     }
 
     function setupEventListeners() {
@@ -85,17 +112,11 @@ const AccommodationModule = (function () {
     async function loadRooms() {
         try {
             const url = `${API_URL}/rooms/occupancy/`;
-            const response = await fetch(url);
+            const response = await roomsPager.load(url);
 
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
-
-            const data = await response.json();
-
-            // Update table
-            updateRoomsTable(data);
-
         } catch (error) {
             console.error('Error loading rooms:', error);
             alert('Failed to load rooms. Please try again.');
@@ -118,7 +139,7 @@ const AccommodationModule = (function () {
 
         try {
             const url = `${API_URL}/rooms/${roomId}/participants/`;
-            const response = await fetch(url);
+            const response = await roomParticipantsPager.load(url);
 
             if (!response.ok) {
                 if (response.status === 404) {
@@ -128,14 +149,9 @@ const AccommodationModule = (function () {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
 
-            const data = await response.json();
-
             // Update the room details header
             updateRoomDetailsHeader(roomId);
 
-            // Update participants table
-            updateParticipantsInRoomTable(data);
-
             // Show room details view
             showRoomDetails();
 
@@ -34,4 +34,147 @@ function getStoredUser() {
         window.location.href = 'login.html';
         return null;
     }
-}
\ No newline at end of file
+}
+
+// Sends a request with the stored access token. If the token has expired
+// it is renewed once with the refresh token; if that fails too the session
+// is over and we go back to the login page.
+async function authFetch(url, options = {}) {
+    const send = () => {
+        const user = getStoredUser();
+        const headers = new Headers(options.headers || {});
+        if (user && user.access_token) {
+            headers.set('Authorization', `Bearer ${user.access_token}`);
+        }
+        return fetch(url, { ...options, headers });
+    };
+
+    let response = await send();
+    if (response.status === 401 && await refreshTokens(new URL(url).origin)) {
+        response = await send();
+    }
+    return response;
+}
+
+async function refreshTokens(apiUrl) {
+    const user = getStoredUser();
+    if (!user || !user.refresh_token) return false;
+
+    const response = await fetch(`${apiUrl}/auth/refresh/`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: user.refresh_token }),
+    });
+    if (!response.ok) {
+        localStorage.removeItem('festUser');
+        window.location.href = 'login.html';
+        return false;
+    }
+
+    localStorage.setItem('festUser', JSON.stringify({ ...user, ...await response.json() }));
+    return true;
+}
+
+// List endpoints are paginated: each response carries at most one page and
+// an X-Next-Cursor header if there is more.
+async function fetchPage(url, cursor = null) {
+    const pageUrl = new URL(url);
+    if (cursor) pageUrl.searchParams.set('cursor', cursor);
+
+    const response = await authFetch(pageUrl.toString());
+    if (!response.ok) {
+        return { ok: false, status: response.status, data: [], nextCursor: null };
+    }
+
+    return {
+        ok: true,
+        status: response.status,
+        data: await response.json(),
+        nextCursor: response.headers.get('X-Next-Cursor'),
+    };
+}
+
+// Follows the cursors for at most maxPages pages. Only for filter dropdowns,
+// which need every option at once; tables show one page at a time through
+// createCursorPager() instead.
+async function fetchAllPages(url, maxPages) {
+    const items = [];
+    let cursor = null;
+
+    for (let pages = 0; pages < maxPages; pages++) {
+        const response = await fetchPage(url, cursor);
+        if (!response.ok) {
+            return { ok: false, status: response.status, data: items };
+        }
+
+        items.push(...response.data);
+        cursor = response.nextCursor;
+        if (!cursor) {
+            return { ok: true, status: 200, data: items };
+        }
+    }
+
+    console.warn(`Stopped after ${maxPages} pages of ${url}; the list is incomplete.`);
+    return { ok: true, status: 200, data: items };
+}
+
+// Previous / Next buttons placed after `element`, driven by the page cursors.
+// pager.load(url) shows the first page of url, pager.reload() the current
+// one again; render(rows) is called with the rows of each page shown.
+// Both resolve to the fetchPage() result so callers can report errors.
+function createCursorPager(element, render) {
+    const controls = document.createElement('div');
+    controls.className = 'd-flex justify-content-end align-items-center gap-2 mt-2';
+    controls.innerHTML = `
+        <span class="text-muted small"></span>
+        <button type="button" class="btn btn-sm btn-outline-secondary">Previous</button>
+        <button type="button" class="btn btn-sm btn-outline-secondary">Next</button>
+    `;
+    const [label, previousButton, nextButton] = controls.children;
+    (element.closest('.dt-container') || element).after(controls);
+
+    let url = null;
+    let cursors = [];       // cursor of every page up to the current one (null for the first)
+    let nextCursor = null;
+
+    function update() {
+        label.textContent = cursors.length ? `Page ${cursors.length}` : '';
+        previousButton.disabled = cursors.length <= 1;
+        nextButton.disabled = !nextCursor;
+    }
+
+    async function show() {
+        const response = await fetchPage(url, cursors[cursors.length - 1]);
+        if (response.ok) {
+            nextCursor = response.nextCursor;
+            render(response.data);
+            update();
+        }
+        return response;
+    }
+
+    async function move(newCursors) {
+        const oldCursors = cursors;
+        cursors = newCursors;
+        const response = await show();
+        if (!response.ok) {
+            cursors = oldCursors;
+            alert(`Failed to load the page (status ${response.status}). Please try again.`);
+        }
+    }
+
+    previousButton.addEventListener('click', () => move(cursors.slice(0, -1)));
+    nextButton.addEventListener('click', () => move([...cursors, nextCursor]));
+    update();
+
+    return {
+        load(newUrl) {
+            url = newUrl;
+            cursors = [null];
+            return show();
+        },
+        reload() {
+            return url ? show() : Promise.resolve({ ok: true, status: 200, data: [] });
+        },
+    };
+}
@@ -4,6 +4,7 @@
 const ClubsModule = (function () {
     const API_URL = 'http://127.0.0.1:8000';
     let clubsTable;
+    let clubsPager;
 
     function init() {
         // Initialize DataTable
@@ -14,6 +15,7 @@ const ClubsModule = (function () {
             info: true,
             pageLength: 25
         });
+        clubsPager = createCursorPager(document.getElementById('clubs-table'), updateTable);
 
         const user = getStoredUser();
         const addClubButton = document.querySelector('[data-bs-target="#addClubModal"]');
@@ -55,17 +57,11 @@ const ClubsModule = (function () {
             if (clubType) params.append('club_type', clubType);
 
             const url = `${API_URL}/clubs/query/?${params.toString()}`;
-            const response = await fetch(url);
+            const response = await clubsPager.load(url);
 
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
-
-            const data = await response.json();
-
-            // Update table
-            updateTable(data);
-
         } catch (error) {
             console.error('Error loading clubs:', error);
             alert('Failed to load clubs. Please try again.');
@@ -4,6 +4,7 @@
 const CollegesModule = (function () {
     const API_URL = 'http://127.0.0.1:8000';
     let collegesTable;
+    let collegesPager;
 
     function init() {
         // Initialize DataTable
@@ -14,6 +15,7 @@ const CollegesModule = (function () {
             info: true,
             pageLength: 25
         });
+        collegesPager = createCursorPager(document.getElementById('colleges-table'), updateTable);
 
         const user = getStoredUser();
         const addCollegeButton = document.querySelector('[data-bs-target="#addCollegeModal"]');
@@ -57,17 +59,11 @@ const CollegesModule = (function () {
             if (state) params.append('state', state);
 
             const url = `${API_URL}/colleges/query/?${params.toString()}`;
-            const response = await fetch(url);
+            const response = await collegesPager.load(url);
 
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
-
-            const data = await response.json();
-
-            // Update table
-            updateTable(data);
-
         } catch (error) {
             console.error('Error loading colleges:', error);
             alert('Failed to load colleges. Please try again.');
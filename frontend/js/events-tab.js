@@ -4,7 +4,9 @@
 const EventsModule = (function() {
     const API_URL = 'http://127.0.0.1:8000';
     let teamMembersTable;
-    let allEvents = [];
+    let allEvents = [];     // the page of events on screen
+    let eventsPager;
+    let teamsPager;
 
     const publicApi = {
         init: init,
@@ -25,11 +27,50 @@ const EventsModule = (function() {
             pageLength: 25
         });
 
+        eventsPager = createCursorPager(
+            document.getElementById('managerial-events-container').closest('.category-section'),
+            (events) => {
+                allEvents = events;
+                renderEventsByCategory(events);
+            });
+        teamsPager = createCursorPager(document.getElementById('teams-list-container'), renderTeamsList);
+
         // Set up event listeners
         setupEventListeners();
         
         // Load initial data
         loadEvents();
+        subscribeToEventChanges();
+    }
+
+    // The server pushes new team/participant counts and team additions or
+    // removals (/live/), so the cards stay current without reloading
+    function subscribeToEventChanges() {
+        const source = new EventSource(`${API_URL}/live/?topic=events`);
+
+        source.addEventListener('event_stats', (e) => {
+            const stats = JSON.parse(e.data);
+            const event = allEvents.find(ev => ev.event_id === stats.event_id);
+            if (!event) return;
+
+            event.team_count = stats.team_count;
+            event.participant_count = stats.participant_count;
+            renderEventsByCategory(allEvents);
+        });
+
+        // Refresh the open event's team list when one of its teams changes
+        const refreshOpenEvent = (e) => {
+            const change = JSON.parse(e.data);
+            const detailsVisible = document.getElementById('event-details-view').style.display === 'block';
+            if (detailsVisible && publicApi.currentEvent && publicApi.currentEvent.event_id === change.event_id) {
+                viewEventDetails(publicApi.currentEvent);
+            }
+        };
+        source.addEventListener('team_added', refreshOpenEvent);
+        source.addEventListener('team_removed', refreshOpenEvent);
+
+        // We missed some changes; reload the page of events on screen
+        source.addEventListener('resync', () => eventsPager.reload());
     }
 
     function setupEventListeners() {
@@ -55,35 +96,12 @@ const EventsModule = (function() {
         // ... (this function is unchanged)
         showLoading(true);
         try {
-            // Get all events without filters
-            const response = await fetch(`${API_URL}/events/query/`);
+            // Get a page of events with their team/participant counts in one request
+            const response = await eventsPager.load(`${API_URL}/events/query/?include_stats=true`);
 
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
-
-            const events = await response.json();
-            allEvents = events;
-
-            // Get stats for each event
-            const eventsWithStats = await Promise.all(
-                events.map(async (event) => {
-                    try {
-                        const statsResponse = await fetch(`${API_URL}/events/${event.event_id}/stats/`);
-                        if (statsResponse.ok) {
-                            const stats = await statsResponse.json();
-                            return { ...event, ...stats };
-                        }
-                    } catch (error) {
-                        console.error(`Error loading stats for event ${event.event_id}:`, error);
-                    }
-                    return { ...event, team_count: 0, participant_count: 0 };
-                })
-            );
-
-            // Render events by category
-            renderEventsByCategory(eventsWithStats);
-
         } catch (error) {
             console.error('Error loading events:', error);
             alert('Failed to load events. Please try again.');
@@ -188,15 +206,12 @@ const EventsModule = (function() {
             `;
 
             // Load teams for this event
-            const teamsResponse = await fetch(`${API_URL}/events/${event.event_id}/teams/`);
+            const teamsResponse = await teamsPager.load(`${API_URL}/events/${event.event_id}/teams/`);
             
             if (!teamsResponse.ok) {
                 throw new Error(`HTTP error! status: ${teamsResponse.ok}`);
             }
 
-            const teams = await teamsResponse.json();
-            renderTeamsList(teams);
-
             // Show event details view
             showEventDetailsView();
 
@@ -44,9 +44,8 @@ document.addEventListener('DOMContentLoaded', () => {
                 // Login successful
                 const userData = await response.json();
                 
-                // Store user data in localStorage to persist session
-                // Your API doesn't return a JWT, so we'll store the user object.
-                // In a real app, you'd store the JWT here.
+                // Store user data and its access/refresh tokens in
+                // localStorage to persist session (see authFetch in auth.js)
                 localStorage.setItem('festUser', JSON.stringify(userData));
                 
                 // Redirect to the dashboard
@@ -3,7 +3,12 @@
 
 const ParticipantsModule = (function() {
     const API_URL = 'http://127.0.0.1:8000';
+    // The filter dropdowns need every option, so they follow the cursors,
+    // but never for more than this many pages of DROPDOWN_PAGE_SIZE rows
+    const DROPDOWN_PAGE_SIZE = 1000;
+    const DROPDOWN_MAX_PAGES = 5;
     let participantsTable;
+    let participantsPager;
 
     function init() {
         participantsTable = new DataTable('#participants-table', {
@@ -13,6 +18,7 @@ const ParticipantsModule = (function() {
             info: true,
             pageLength: 25
         });
+        participantsPager = createCursorPager(document.getElementById('participants-table'), updateTable);
 
         setupEventListeners();
 
@@ -46,12 +52,12 @@ const ParticipantsModule = (function() {
         }
 
         try {
-            const response = await fetch(`${API_URL}/colleges/query`);
+            const response = await fetchAllPages(`${API_URL}/colleges/query/?limit=${DROPDOWN_PAGE_SIZE}`, DROPDOWN_MAX_PAGES);
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
 
-            const colleges = await response.json();
+            const colleges = response.data;
 
             while (selectElement.options.length > 1) {
                 selectElement.remove(1);
@@ -80,12 +86,12 @@ const ParticipantsModule = (function() {
         }
 
         try {
-            const response = await fetch(`${API_URL}/clubs/query`);
+            const response = await fetchAllPages(`${API_URL}/clubs/query/?limit=${DROPDOWN_PAGE_SIZE}`, DROPDOWN_MAX_PAGES);
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
 
-            const clubs = await response.json();
+            const clubs = response.data;
 
             while (selectElement.options.length > 1) {
                 selectElement.remove(1);
@@ -117,12 +123,12 @@ const ParticipantsModule = (function() {
         try {
             // NOTE: Assuming your endpoint for ALL events is '/events/'
             // Change this if your API endpoint is different.
-            const response = await fetch(`${API_URL}/events/query/`);
+            const response = await fetchAllPages(`${API_URL}/events/query/?limit=${DROPDOWN_PAGE_SIZE}`, DROPDOWN_MAX_PAGES);
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
 
-            const events = await response.json();
+            const events = response.data;
 
             // Clear any existing options (except the first "All Events" one)
             while (selectElement.options.length > 1) {
@@ -164,17 +170,11 @@ const ParticipantsModule = (function() {
             if (eventId) params.append('event_id', eventId);
 
             const url = `${API_URL}/participants/query/?${params.toString()}`;
-            const response = await fetch(url);
+            const response = await participantsPager.load(url);
 
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
-
-            const data = await response.json();
-            
-            // Update table
-            updateTable(data);
-
         } catch (error) {
             console.error('Error loading participants:', error);
             alert('Failed to load participants. Please try again.');
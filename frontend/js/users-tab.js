@@ -4,6 +4,7 @@
 const UsersModule = (function() {
     const API_URL = 'http://127.0.0.1:8000';
     let usersTable;
+    let usersPager;
     let addUserModal; // Variable to hold the modal instance
 
     function init() {
@@ -26,6 +27,7 @@ const UsersModule = (function() {
             info: true,
             pageLength: 25
         });
+        usersPager = createCursorPager(document.getElementById('users-table'), updateTable);
 
         // Get the Bootstrap modal instance
         const addUserModalElement = document.getElementById('addUserModal');
@@ -106,17 +108,11 @@ const UsersModule = (function() {
     async function loadUsers() {
         try {
             const url = `${API_URL}/users/`;
-            const response = await fetch(url);
+            const response = await usersPager.load(url);
 
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
-
-            const data = await response.json();
-            
-            // Update table
-            updateTable(data);
-
         } catch (error) {
             console.error('Error loading users:', error);
             alert('Failed to load users. Please try again.');
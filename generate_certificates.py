@@ -0,0 +1,67 @@
+"""
+Renders an event's certificates into a directory, one PDF per certificate,
+on a pool of worker processes (one per CPU core unless --workers is given).
+
+Certificates already in the directory are skipped, so rerunning after an
+interrupted run only renders what's missing. --issue first issues
+certificates to registered participants who don't have one yet.
+
+Usage:
+    python generate_certificates.py --event 10 --out certificates/event-10 --issue
+    python generate_certificates.py --event 10 --out certificates/event-10 --workers 8
+"""
+import argparse
+import sys
+import time
+
+import certificates
+import crud
+from config import CERTIFICATE_BATCH
+from database import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--event", type=int, required=True, help="event_id")
+    parser.add_argument("--out", required=True, help="directory to write the PDFs to")
+    parser.add_argument("--issue", action="store_true", help="issue missing certificates first")
+    parser.add_argument("--type", default="participation", help="certificate_type for --issue")
+    parser.add_argument("--workers", type=int, help="rendering processes (default: CERTIFICATE_WORKERS or one per core)")
+    parser.add_argument("--template", help="JSON template (default: CERTIFICATE_TEMPLATE or the built-in one)")
+    args = parser.parse_args()
+
+    template = certificates.load_template(args.template)
+    db = SessionLocal()
+    try:
+        try:
+            if args.issue:
+                result = crud.issue_certificates(db, event_id=args.event, certificate_type=args.type)
+                print(f"issued {result['issued']} certificate(s); the event has {result['total']}")
+
+            total = crud.count_certificates(db, event_id=args.event)
+        except ValueError as e:
+            sys.exit(f"event {args.event}: {e}")
+        if not total:
+            sys.exit(f"event {args.event} has no certificates; run with --issue to issue them")
+
+        started = time.perf_counter()
+
+        def progress(done: int):
+            elapsed = time.perf_counter() - started
+            print(f"\r{done}/{total} certificates ({done / elapsed if elapsed else 0:.0f}/s)",
+                  end="", file=sys.stderr, flush=True)
+
+        rows = crud.get_certificate_rows(db, event_id=args.event, batch_size=CERTIFICATE_BATCH)
+        with certificates.make_pool(args.workers) as pool:
+            rendered, skipped = certificates.write_directory(rows, args.out, template, pool, progress)
+        print(file=sys.stderr)
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"rendered {rendered} in {elapsed:.1f} s ({rendered / elapsed:.0f}/s), "
+          f"skipped {skipped} already in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
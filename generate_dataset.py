@@ -0,0 +1,302 @@
+"""
+Fills the database with a large, realistic dataset for performance work.
+It writes straight to the tables (COPY on PostgreSQL, multi-row INSERTs
+elsewhere) instead of going through the API like seed_db.py, and reuses
+seed_db.py's names, colleges, clubs and events.
+
+Everything is drawn from random.Random(--seed): the same arguments on an
+empty database give the same rows every time. Ids continue after each
+table's current maximum, so it can also add to an existing dataset.
+
+The dataset is consistent:
+  - every participant is in exactly one team, and every team is registered
+    for one event, with at most that event's max_team_size members
+  - --accommodated of the participants (0.8 by default) ask for a room.
+    They fill rooms of their own gender in order and never exceed
+    max_capacity (a few may go without a bed).
+  - event_stats and room_occupancy match the rows (the room_reserved
+    triggers keep the latter)
+All of it is one transaction: an interrupted run leaves nothing behind.
+On PostgreSQL the loaded tables' foreign keys are dropped for the load
+and re-added (so re-checked in one pass) before the commit; the tables
+are locked meanwhile, so run it against a scratch database.
+
+Usage:
+    python generate_dataset.py --participants 1000000
+    python generate_dataset.py --participants 50000 --events 40 --colleges 300 --seed 7
+"""
+import argparse
+import csv
+import datetime
+import io
+import random
+import sys
+import time
+
+from sqlalchemy import func, insert, select, text
+
+import models
+import seed_db
+from database import engine
+
+# Participants (with their teams, members and reservations) per write
+CHUNK_ROWS = 100_000
+ROOM_CAPACITIES = (2, 3, 3, 4, 4, 4, 6)
+POSITIONS = ("President", "Secretary", "Coordinator")
+LOADED_TABLES = [
+    models.Fest.__table__, models.College.__table__, models.Club.__table__, models.Event.__table__,
+    models.Room.__table__, models.RoomOccupancy.__table__, models.Participant.__table__, models.Team.__table__,
+    models.TeamEvent.__table__, models.TeamMember.__table__, models.RoomReserved.__table__,
+    models.EventStats.__table__,
+]
+
+
+class TableWriter:
+    """Writes rows (tuples in `columns` order) to a table: COPY on PostgreSQL, INSERTs otherwise."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.copy = conn.dialect.name == "postgresql"
+        self.counts = {}
+
+    def write(self, table, columns: tuple, rows: list):
+        if not rows:
+            return
+        if self.copy:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor = self.conn.connection.dbapi_connection.cursor()
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        else:
+            self.conn.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+
+def next_id(conn, column) -> int:
+    return (conn.execute(select(func.max(column))).scalar() or 0) + 1
+
+
+class Generator:
+    def __init__(self, conn, args):
+        self.conn = conn
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.out = TableWriter(conn)
+
+    # --- Reference data ---
+    def fests(self) -> list:
+        first = next_id(self.conn, models.Fest.fest_id)
+        rows = [(first + i, "Infotsav", 2026 - i) for i in range(self.args.fests)]
+        self.out.write(models.Fest.__table__, ("fest_id", "name", "year"), rows)
+        return [row[0] for row in rows]
+
+    def colleges_and_clubs(self) -> tuple[list, list]:
+        """Colleges cycle through seed_db.COLLEGES (numbered after the first round), 3 clubs each."""
+        rng = self.rng
+        first_college = next_id(self.conn, models.College.college_id)
+        first_club = next_id(self.conn, models.Club.club_id)
+        colleges, clubs = [], []
+        for i in range(self.args.colleges):
+            base = seed_db.COLLEGES[i % len(seed_db.COLLEGES)]
+            college_id = first_college + i
+            round_no = i // len(seed_db.COLLEGES)
+            name = base["name"] if round_no == 0 else f"{base['name']} {round_no + 1}"
+            colleges.append((college_id, name, base["city"], base["state"]))
+            for j in range(3):
+                club_name, club_type = seed_db.CLUB_TEMPLATES[(i + j) % len(seed_db.CLUB_TEMPLATES)]
+                clubs.append((
+                    first_club + len(clubs), college_id, f"{club_name} - {name.split()[0][:10]}_{college_id}",
+                    club_type, self._name(rng.choice(("MALE", "FEMALE"))),
+                    f"{9000000000 + rng.randrange(10 ** 9)}", rng.choice(POSITIONS)
+                ))
+        self.out.write(models.College.__table__, ("college_id", "name", "city", "state"), colleges)
+        self.out.write(
+            models.Club.__table__,
+            ("club_id", "college_id", "club_name", "club_type", "poc", "poc_contact", "poc_position"), clubs
+        )
+        return [c[0] for c in colleges], [c[0] for c in clubs]
+
+    def events(self, fest_ids: list) -> list:
+        """Events cycle through seed_db.EVENTS; returns (event_id, name, max_team_size)."""
+        first = next_id(self.conn, models.Event.event_id)
+        templates = list(seed_db.EVENTS.items())
+        rows = []
+        for i in range(self.args.events):
+            name, (category, date, time_s, max_size, venue) = templates[i % len(templates)]
+            event_id = first + i
+            rows.append((event_id, f"{name}-{event_id}", fest_ids[i % len(fest_ids)], category, venue,
+                         datetime.date.fromisoformat(date), datetime.time.fromisoformat(time_s), max_size))
+        self.out.write(
+            models.Event.__table__,
+            ("event_id", "name", "fest_id", "category", "venue", "date", "time", "max_team_size"), rows
+        )
+        return [(r[0], r[1], r[7]) for r in rows]
+
+    def rooms(self) -> dict:
+        """
+        Enough rooms per gender for the expected bed requests (plus 5%).
+        Returns {gender: [[room_id, free beds], ...]}.
+        """
+        rng = self.rng
+        beds_per_gender = int(self.args.participants * self.args.accommodated / 2 * 1.05) + 1
+        room_id = next_id(self.conn, models.Room.room_id)
+        rows, rooms = [], {"MALE": [], "FEMALE": []}
+        for gender, prefix in (("MALE", "Hostel-Boys"), ("FEMALE", "Hostel-Girls")):
+            beds = 0
+            while beds < beds_per_gender:
+                capacity = rng.choice(ROOM_CAPACITIES)
+                block = len(rooms[gender]) // 200
+                rows.append((room_id, f"{prefix}-{block + 1}", f"{room_id}", gender, capacity))
+                rooms[gender].append([room_id, capacity])
+                beds += capacity
+                room_id += 1
+        self.out.write(models.Room.__table__, ("room_id", "building_name", "room_no", "gender", "max_capacity"), rows)
+        self.out.write(models.RoomOccupancy.__table__, ("room_id", "current_occupancy"),
+                       [(r[0], 0) for r in rows])
+        return rooms
+
+    # --- Registrations ---
+    def _name(self, gender: str) -> str:
+        first = self.rng.choice(seed_db.MALE_FIRST_NAMES if gender == "MALE" else seed_db.FEMALE_FIRST_NAMES)
+        return f"{first} {self.rng.choice(seed_db.LAST_NAMES)}"
+
+    def registrations(self, college_ids: list, club_ids: list, events: list, rooms: dict) -> dict:
+        """
+        Teams of participants, chunk by chunk. Returns {event_id: (teams,
+        participants)} for event_stats.
+        """
+        rng, args = self.rng, self.args
+        participant_id = next_id(self.conn, models.Participant.participant_id)
+        team_id = next_id(self.conn, models.Team.team_id)
+        free_room = {"MALE": 0, "FEMALE": 0}  # index of the first room with a free bed
+        stats = {event_id: [0, 0] for event_id, _, _ in events}
+        sizes = seed_db.MERCH_SIZES + ["XXL"]
+
+        participants, teams, team_events, members, reserved = [], [], [], [], []
+        remaining = args.participants
+        while remaining:
+            event_id, event_name, max_size = rng.choice(events)
+            size = min(rng.randint(1, max_size), remaining)
+            teams.append((team_id, f"{event_name}_team_{team_id}"))
+            team_events.append((team_id, event_id))
+            stats[event_id][0] += 1
+            stats[event_id][1] += size
+
+            for _ in range(size):
+                gender = "MALE" if rng.random() < 0.5 else "FEMALE"
+                name = self._name(gender)
+                participants.append((
+                    participant_id, name, f"9{rng.randrange(10 ** 9):09d}",
+                    f"{name.lower().replace(' ', '.')}.{participant_id}@example.com",
+                    rng.choice(sizes), rng.choice(college_ids),
+                    rng.choice(club_ids) if rng.random() < 0.5 else None, gender
+                ))
+                members.append((team_id, participant_id))
+
+                if rng.random() < args.accommodated:
+                    gender_rooms = rooms[gender]
+                    index = free_room[gender]
+                    if index < len(gender_rooms):
+                        room = gender_rooms[index]
+                        reserved.append((participant_id, room[0]))
+                        room[1] -= 1
+                        if room[1] == 0:
+                            free_room[gender] += 1
+                participant_id += 1
+
+            team_id += 1
+            remaining -= size
+            if len(participants) >= CHUNK_ROWS or not remaining:
+                self._write_registrations(participants, teams, team_events, members, reserved)
+                participants, teams, team_events, members, reserved = [], [], [], [], []
+                print(f"\r  participants: {args.participants - remaining}/{args.participants}",
+                      end="", file=sys.stderr, flush=True)
+        print(file=sys.stderr)
+        return stats
+
+    def _write_registrations(self, participants, teams, team_events, members, reserved):
+        write = self.out.write
+        write(models.Participant.__table__,
+              ("participant_id", "name", "phone", "email", "merch_size", "college_id", "club_id", "gender"),
+              participants)
+        write(models.Team.__table__, ("team_id", "team_name"), teams)
+        write(models.TeamEvent.__table__, ("team_id", "event_id"), team_events)
+        write(models.TeamMember.__table__, ("team_id", "participant_id"), members)
+        write(models.RoomReserved.__table__, ("participant_id", "room_id"), reserved)
+
+    def event_stats(self, stats: dict):
+        self.out.write(models.EventStats.__table__, ("event_id", "team_count", "participant_count"),
+                       [(event_id, teams, people) for event_id, (teams, people) in sorted(stats.items())])
+
+
+def drop_foreign_keys(conn, tables: list) -> list:
+    """
+    Drops the foreign keys of `tables` (PostgreSQL only) and returns the
+    statements that put them back. Re-adding a foreign key checks every row
+    in one pass, which is far cheaper than a check per inserted row.
+    """
+    constraints = conn.execute(text(
+        "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE contype = 'f' AND conrelid::regclass::text = ANY(:tables)"
+    ), {"tables": [t.name for t in tables]}).all()
+    restore = []
+    for table, name, definition in constraints:
+        conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+        restore.append(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+    return restore
+
+
+def reset_sequences(conn):
+    """Moves each serial sequence past the explicit ids we wrote (PostgreSQL only)."""
+    for table, column in [("fests", "fest_id"), ("colleges", "college_id"), ("clubs", "club_id"),
+                          ("events", "event_id"), ("participants", "participant_id"),
+                          ("teams", "team_id"), ("rooms", "room_id")]:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+            f"(SELECT coalesce(max({column}), 1) FROM {table}))"
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--participants", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fests", type=int, default=1)
+    parser.add_argument("--events", type=int, help="default: participants / 2500, at least 4")
+    parser.add_argument("--colleges", type=int, help="default: participants / 400, at least 8 (3 clubs each)")
+    parser.add_argument("--accommodated", type=float, default=0.8, help="share of participants who want a room")
+    args = parser.parse_args()
+    args.events = args.events or max(args.participants // 2500, 4)
+    args.colleges = args.colleges or max(args.participants // 400, len(seed_db.COLLEGES))
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        postgres = conn.dialect.name == "postgresql"
+        restore_foreign_keys = []
+        if postgres:
+            # Nothing is durable until the single commit anyway
+            conn.execute(text("SET LOCAL synchronous_commit = off"))
+            restore_foreign_keys = drop_foreign_keys(conn, LOADED_TABLES)
+        generator = Generator(conn, args)
+        fest_ids = generator.fests()
+        college_ids, club_ids = generator.colleges_and_clubs()
+        events = generator.events(fest_ids)
+        rooms = generator.rooms()
+        stats = generator.registrations(college_ids, club_ids, events, rooms)
+        generator.event_stats(stats)
+        if postgres:
+            for statement in restore_foreign_keys:
+                conn.execute(text(statement))
+            reset_sequences(conn)
+            conn.execute(text("ANALYZE"))
+
+    for table, count in generator.out.counts.items():
+        print(f"  {table:<16}{count:>10}")
+    print(f"done in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
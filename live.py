@@ -0,0 +1,115 @@
+"""
+In-process fan-out of change notifications to live dashboard clients.
+
+crud functions queue(db, topic, message) while they write. The messages
+are published when that session commits and dropped if it rolls back.
+Every open /live/ stream subscribed to the topic then gets each message as
+a server-sent event. Coordinators' tabs then patch the one room or event
+that changed instead of re-running the full occupancy and stats queries
+on every refresh.
+
+Topics and their messages:
+  rooms   {"type": "room_occupancy", "room_id", "current_occupancy"}
+  events  {"type": "event_stats", "event_id", "team_count", "participant_count"}
+          {"type": "team_added" | "team_removed", "event_id", "team_id", "team_name"}
+
+Each subscriber has a bounded queue. A client that falls too far behind
+has its backlog replaced by a single {"type": "resync"} message, telling
+it to reload. Messages only reach clients of the worker process that
+made the change. With several workers, clients connected to another
+worker catch up on their next reload.
+"""
+import asyncio
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import LIVE_QUEUE_SIZE
+
+ROOMS = "rooms"
+EVENTS = "events"
+TOPICS = (ROOMS, EVENTS)
+
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    def __init__(self, topics: set, loop: asyncio.AbstractEventLoop):
+        self.topics = topics
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+
+    def _put(self, message: dict):
+        """Runs on the subscriber's event loop."""
+        if self.queue.full():
+            # Too far behind to catch up message by message
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = RESYNC
+        self.queue.put_nowait(message)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+_subscriptions = set()
+_lock = threading.Lock()
+
+
+def subscribe(topics) -> Subscription:
+    """Call from the event loop that will read the subscription."""
+    subscription = Subscription(set(topics), asyncio.get_running_loop())
+    with _lock:
+        _subscriptions.add(subscription)
+    return subscription
+
+
+def unsubscribe(subscription: Subscription):
+    with _lock:
+        _subscriptions.discard(subscription)
+
+
+def has_subscribers(topic: str) -> bool:
+    """Lets publishers skip building a message nobody will read."""
+    with _lock:
+        return any(topic in s.topics for s in _subscriptions)
+
+
+def publish(topic: str, message: dict):
+    """
+    Queues `message` for every subscriber of `topic`. Safe to call from any
+    thread (crud functions run in the threadpool in sync mode).
+    """
+    with _lock:
+        targets = [s for s in _subscriptions if topic in s.topics]
+    for subscription in targets:
+        try:
+            subscription.loop.call_soon_threadsafe(subscription._put, message)
+        except RuntimeError:
+            # The subscriber's loop has closed (server shutting down)
+            unsubscribe(subscription)
+
+
+# --- Publishing on commit ---
+_PENDING = "live_pending"
+
+def queue(db: Session, topic: str, message: dict):
+    """Publishes `message` once `db` commits (dropped on rollback)."""
+    if has_subscribers(topic):
+        db.info.setdefault(_PENDING, []).append((topic, message))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session):
+    # Releasing a savepoint fires this too; wait for the real commit
+    if session.in_nested_transaction():
+        return
+    for topic, message in session.info.pop(_PENDING, []):
+        publish(topic, message)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING, None)
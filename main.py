@@ -1,12 +1,28 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Response, UploadFile, File, Query
 from fastapi.middleware.cors import CORSMiddleware  # Import this
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import date, time
 
 # Import everything from your other files
-import crud, models, schemas
-from database import SessionLocal, engine
+import crud, models, schemas, security, live, certificates, sql_timing
+import asyncio
+import csv
+import io
+import json
+from database import engine, async_engine, SessionLocal, get_db, run_db, get_pool_status
+from cache import cache_stats
+from etag import ConditionalGetMiddleware
+from compression import CompressionMiddleware
+from serialization import orm_response
+from pagination import Page, InvalidCursor, page_params, set_page_headers
+from config import (
+    MAX_BULK_TEAMS, IMPORT_CHUNK_ROWS, MAX_IMPORT_ERRORS, EXPORT_BATCH_ROWS, ACCESS_TOKEN_TTL,
+    CACHE_CONTROL_RULES, COMPRESSION_MIN_SIZE, GZIP_LEVEL, BROTLI_QUALITY, LIVE_KEEPALIVE_SECONDS,
+    MAX_MERCH_BATCH, CERTIFICATE_BATCH, SQL_TIMING, SQL_QUERY_BUDGET
+)
 
 models.Base.metadata.create_all(bind=engine)
 
@@ -27,44 +43,98 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], # Allows all methods (GET, POST, etc.)
     allow_headers=["*"], # Allows all headers
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag", "Server-Timing"], # Let the frontend read pagination headers
 )
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# ETag + If-None-Match (304) and Cache-Control on the routes in CACHE_CONTROL_RULES
+app.add_middleware(ConditionalGetMiddleware, rules=CACHE_CONTROL_RULES)
+
+# gzip/brotli; added after the ETag middleware so it wraps it (ETags are
+# computed on the uncompressed body)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    gzip_level=GZIP_LEVEL,
+    brotli_quality=BROTLI_QUALITY,
+)
 
+# Statement count and database time per request (Server-Timing header), and
+# a warning when a request goes over SQL_QUERY_BUDGET. Added last so it wraps
+# everything else.
+if SQL_TIMING:
+    sql_timing.instrument(engine)
+    if async_engine is not None:
+        sql_timing.instrument(async_engine.sync_engine)
+    app.add_middleware(sql_timing.QueryTimingMiddleware, budget=SQL_QUERY_BUDGET)
+
+@app.exception_handler(security.HashPoolBusy)
+def hash_pool_busy_handler(request: Request, exc: security.HashPoolBusy):
+    # Shed load during a login storm instead of queueing without bound
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
+@app.exception_handler(InvalidCursor)
+def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    # A bad ?cursor= is the client's fault, not a server error
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
 
 # --- User Endpoints (New) ---
 
 @app.post("/users/", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-def create_user_endpoint(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def create_user_endpoint(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """
     API endpoint to create a new user.
     """
-    # Check if user with that username already exists
-    db_user = crud.get_user_by_username(db, username=user.username)
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered"
-        )
-    # Create the user
-    return crud.create_user(db=db, user=user)
+    # Hash first (on the dedicated hashing pool), so the duplicate check and
+    # the insert are one crud call
+    hashed_password = await security.get_password_hash_async(user.password)
+    try:
+        return await run_db(db, crud.create_user, user=user, hashed_password=hashed_password)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-@app.post("/users/validate/", response_model=schemas.User)
-def validate_user_credentials(
+def _issue_tokens(user) -> dict:
+    """Access and refresh tokens for a user (anything with user_id/username/role)."""
+    return {
+        "access_token": security.create_token(user.user_id, user.username, user.role, security.ACCESS),
+        "refresh_token": security.create_token(user.user_id, user.username, user.role, security.REFRESH),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_TTL,
+    }
+
+def _get_user_and_release(db: Session, username: str):
+    """Loads a user, then closes the session so its connection goes back to the pool."""
+    db_user = crud.get_user_by_username(db, username=username)
+    db.close()
+    return db_user
+
+@app.post("/users/validate/", response_model=schemas.UserLoginResponse)
+async def validate_user_credentials(
     user_login: schemas.UserLogin, 
     db: Session = Depends(get_db)
 ):
     """
     API endpoint to query/check if a username and password are valid.
     
-    Returns the User object if valid, otherwise raises a 401 Unauthorized error.
-    """
-    db_user = crud.check_user_credentials(db, user_login=user_login)
+    Returns the User object plus signed access/refresh tokens if valid,
+    otherwise raises a 401 Unauthorized error.
+    """
+    # Give the connection back before hashing so logins waiting on bcrypt
+    # don't starve other requests of pool connections (db_user stays loaded)
+    db_user = await run_db(db, _get_user_and_release, username=user_login.username)
+
+    new_hash = None
+    # bcrypt is CPU-bound, so verify on the dedicated hashing pool rather
+    # than in the request threadpool or on the event loop
+    if db_user is not None:
+        valid, new_hash = await security.verify_and_update_password_async(
+            user_login.password, db_user.password_hash
+        )
+        if not valid:
+            db_user = None
     
     if db_user is None:
         raise HTTPException(
@@ -72,36 +142,82 @@ def validate_user_credentials(
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"}, # Standard for 401
         )
-        
-    # If credentials are correct, return the user's data
-    return db_user
+
+    # If credentials are correct, return the user's data and their tokens
+    # (built first: the commit below expires db_user)
+    response = schemas.UserLoginResponse(
+        **schemas.User.model_validate(db_user).model_dump(), **_issue_tokens(db_user)
+    )
+
+    if new_hash is not None:
+        # Stored hash uses an old bcrypt cost; upgrade it now that we know the password
+        await run_db(db, crud.update_user_password_hash, user_id=response.user_id, password_hash=new_hash)
+
+    return response
+
+@app.post("/auth/refresh/", response_model=schemas.TokenPair)
+async def refresh_tokens(request: schemas.TokenRefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchanges a refresh token for a new access/refresh pair. The user is
+    re-read here, so a deleted user or a changed role takes effect at the
+    next refresh.
+    """
+    try:
+        claims = security.decode_token(request.refresh_token, security.REFRESH)
+    except security.InvalidToken as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    db_user = await run_db(db, crud.get_user, user_id=claims["sub"])
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User no longer exists",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return _issue_tokens(db_user)
+
+@app.get("/users/me/", response_model=schemas.CurrentUser)
+async def read_current_user(current_user: security.CurrentUser = Depends(security.get_current_user)):
+    """
+    Returns the caller, straight from their access token (no database
+    lookup). Protect other endpoints the same way with
+    Depends(security.get_current_user) or Depends(security.require_role(...)).
+    """
+    return current_user._asdict()
 
 @app.get("/users/", response_model=List[schemas.User])
-def get_all_users(db: Session = Depends(get_db)):
+async def get_all_users(
+    page: Page = Depends(page_params),
+    db: Session = Depends(get_db)
+):
     """
-    API endpoint to get all users.
+    API endpoint to get all users, one page at a time.
     (In production, this should be protected with authentication middleware)
     """
-    users = db.query(models.User).all()
-    return users
+    result = await run_db(db, crud.get_users, page=page)
+    return orm_response(result.items, schemas.User, result)
 
 
 # --- API Endpoint for fests---
 @app.post("/fests/", response_model=schemas.Fest)
-def create_fest_endpoint(fest: schemas.FestCreate, db: Session = Depends(get_db)):
+async def create_fest_endpoint(fest: schemas.FestCreate, db: Session = Depends(get_db)):
     # Now we just call our clean CRUD function
-    return crud.create_fest(db=db, fest = fest)
+    return await run_db(db, crud.create_fest, fest = fest)
 
 @app.get("/fests/{fest_id}", response_model=schemas.Fest)
-def read_fest(fest_id: int, db: Session = Depends(get_db)):
-    db_item = crud.get_fest(db, fest_id=fest_id)
+async def read_fest(fest_id: int, db: Session = Depends(get_db)):
+    db_item = await run_db(db, crud.get_fest, fest_id=fest_id)
     if db_item is None:
         raise HTTPException(status_code=404, detail="Fest not found")
     return db_item
 
 # --- Team Endpoints ---
 @app.post("/teams/add_to_event/", response_model=schemas.FullTeamResponse, status_code=status.HTTP_201_CREATED)
-def add_team_to_event_endpoint(
+async def add_team_to_event_endpoint(
     team_data: schemas.TeamCreateRequest, 
     db: Session = Depends(get_db)
 ):
@@ -117,7 +233,7 @@ def add_team_to_event_endpoint(
     Rolls back all changes if any step fails.
     """
     try:
-        result = crud.add_team_to_event(db=db, team_data=team_data)
+        result = await run_db(db, crud.add_team_to_event, team_data=team_data)
         
         db_team = result["db_team"]
         db_members = result["db_members"]
@@ -146,15 +262,96 @@ def add_team_to_event_endpoint(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_str)
     
     except Exception as e:
-        # Catch any other unexpected database errors
-        db.rollback()
+        # Catch any other unexpected database errors (crud already rolled back)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
+            detail=f"An internal error occurred: {str(e)}"
+        )
+    
+@app.post("/teams/bulk/", response_model=schemas.BulkTeamCreateResponse)
+async def add_teams_bulk_endpoint(
+    request: schemas.BulkTeamCreateRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Registers many teams (with their participants) in one request.
+
+    Each team is validated on its own; the response reports success or
+    the error for every team, in request order. Valid teams are inserted
+    together in one transaction with rooms allocated in bulk.
+    """
+    if len(request.teams) > MAX_BULK_TEAMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BULK_TEAMS} teams per request"
+        )
+
+    try:
+        results = await run_db(db, crud.add_teams_bulk, teams=request.teams)
+    except Exception as e:
+        # Catch any other unexpected database errors (crud already rolled back)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
             detail=f"An internal error occurred: {str(e)}"
         )
+
+    created = sum(1 for r in results if r["team_id"] is not None)
+    return schemas.BulkTeamCreateResponse(
+        created=created,
+        failed=len(results) - created,
+        results=results
+    )
     
+def _import_participants(fileobj, fmt: str):
+    # COPY needs a psycopg2 connection, so the import always runs on a
+    # sync session from the threadpool, whatever DB_MODE is
+    db = SessionLocal()
+    try:
+        return crud.import_participants(
+            db, fileobj, fmt, chunk_size=IMPORT_CHUNK_ROWS, max_errors=MAX_IMPORT_ERRORS
+        )
+    finally:
+        db.close()
+
+@app.post("/participants/import/", response_model=schemas.ParticipantImportResponse)
+async def import_participants_endpoint(
+    file: UploadFile = File(...),
+    format: str | None = None
+):
+    """
+    Imports participants and their teams from an uploaded CSV or NDJSON file.
+
+    Columns/keys: team_name, event_id, name, phone, email, merch_size,
+    college_id, club_id, gender. Rows sharing a team_name and event_id
+    become one team. The format comes from ?format= or the file extension.
+    Invalid rows (and the rest of their team) are skipped and listed in
+    the report, as are teams whose members can't all be given a bed;
+    everything else is imported in one transaction, with rooms allocated.
+    """
+    fmt = format
+    if not fmt and file.filename and "." in file.filename:
+        fmt = file.filename.rsplit(".", 1)[1]
+    fmt = (fmt or "").lower()
+    if fmt == "jsonl":
+        fmt = "ndjson"
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Format must be csv or ndjson (use ?format= or a .csv/.ndjson file name)"
+        )
+
+    try:
+        return await run_in_threadpool(_import_participants, file.file, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {str(e)}"
+        )
+
 @app.delete("/teams/{team_id}", response_model=schemas.TeamDeleteResponse)
-def delete_team_endpoint(team_id: int, db: Session = Depends(get_db)):
+async def delete_team_endpoint(team_id: int, db: Session = Depends(get_db)):
     """
     Deletes a team and all its participants.
     
@@ -163,11 +360,12 @@ def delete_team_endpoint(team_id: int, db: Session = Depends(get_db)):
     - Deletes all Participants on the team
     - Deletes all TeamMember links
     - Deletes all TeamEvent links
+    - Frees their rooms
     
     Rolls back all changes if any step fails.
     """
     try:
-        deleted_team = crud.delete_team_by_id(db=db, team_id=team_id)
+        deleted_team = await run_db(db, crud.delete_team_by_id, team_id=team_id)
         
         return schemas.TeamDeleteResponse(
             team_id=deleted_team.team_id,
@@ -185,49 +383,67 @@ def delete_team_endpoint(team_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_str)
     
     except Exception as e:
-        # Catch any other unexpected database errors
-        db.rollback()
+        # Catch any other unexpected database errors (crud already rolled back)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
             detail=f"An internal error occurred: {str(e)}"
         )
 
+@app.delete("/events/{event_id}/teams/", response_model=schemas.EventTeamsDeleteResponse)
+async def delete_event_teams_endpoint(event_id: int, db: Session = Depends(get_db)):
+    """
+    Deletes every team registered for an event, with their participants,
+    links and room reservations, in one transaction.
+    """
+    try:
+        result = await run_db(db, crud.delete_teams_for_event, event_id=event_id)
+        return schemas.EventTeamsDeleteResponse(
+            **result,
+            message=f"{result['teams_deleted']} team(s) and their participants deleted successfully"
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    except Exception as e:
+        # crud already rolled back
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {str(e)}"
+        )
+
 #--colleges and club endpoints
 @app.post("/colleges/", response_model=schemas.College, status_code=status.HTTP_201_CREATED)
-def create_college_endpoint(
+async def create_college_endpoint(
     college: schemas.CollegeCreate, 
     db: Session = Depends(get_db)
 ):
     """
     API endpoint to create a new college.
     """
-    db_college = crud.get_college_by_name(db, name=college.name)
-    if db_college:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="College with this name already exists"
-        )
-    return crud.create_college(db=db, college=college)
+    try:
+        return await run_db(db, crud.create_college, college=college)
+    except ValueError as e:
+        # College with this name already exists
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @app.post("/clubs/", response_model=schemas.Club, status_code=status.HTTP_201_CREATED)
-def create_club_endpoint(
+async def create_club_endpoint(
     club: schemas.ClubCreate, 
     db: Session = Depends(get_db)
 ):
     """
     API endpoint to create a new club.
     """
-    db_club = crud.get_club_by_name(db, name=club.club_name) # <-- Changed from 'club.name'
-    if db_club:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Club with this name already exists"
-        )
-    return crud.create_club(db=db, club=club)
+    try:
+        return await run_db(db, crud.create_club, club=club)
+    except ValueError as e:
+        # Club with this name already exists
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 #-- rooms endpoint--
 @app.post("/rooms/", response_model=schemas.Room, status_code=status.HTTP_201_CREATED)
-def create_room_endpoint(
+async def create_room_endpoint(
     room: schemas.RoomCreate, 
     db: Session = Depends(get_db)
 ):
@@ -236,51 +452,33 @@ def create_room_endpoint(
     
     Checks for duplicates based on building_name and room_no.
     """
-    # Check if a room with this building name and room number already exists
-    db_room = crud.get_room_by_details(
-        db, 
-        building_name=room.building_name, 
-        room_no=room.room_no
-    )
-    if db_room:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Room with this building name and room number already exists"
-        )
-    
-    # If no duplicate, create the new room
-    return crud.create_room(db=db, room=room)
+    try:
+        return await run_db(db, crud.create_room, room=room)
+    except ValueError as e:
+        # Room with this building name and room number already exists
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 #-- event endpoints--
 @app.post("/events/", response_model=schemas.Event, status_code=status.HTTP_201_CREATED)
-def create_event_endpoint(
+async def create_event_endpoint(
     event: schemas.EventCreate, 
     db: Session = Depends(get_db)
 ):
     """
     API endpoint to create a new event.
     """
-    # Check if event with that name already exists
-    db_event = crud.get_event_by_name(db, name=event.name)
-    if db_event:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Event with name '{event.name}' already exists"
-        )
-    
-    # Check if the fest_id exists
-    db_fest = crud.get_fest(db, fest_id=event.fest_id)
-    if not db_fest:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Fest with fest_id {event.fest_id} not found"
-        )
-        
-    return crud.create_event(db=db, event=event)
+    try:
+        return await run_db(db, crud.create_event, event=event)
+    except ValueError as e:
+        # Duplicate name (400) or unknown fest_id (404)
+        error_str = str(e)
+        if "not found" in error_str:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error_str)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_str)
 
 @app.get("/events/search/", response_model=schemas.Event)
-def read_event_by_name_endpoint(
+async def read_event_by_name_endpoint(
     name: str, 
     db: Session = Depends(get_db)
 ):
@@ -289,56 +487,128 @@ def read_event_by_name_endpoint(
     Usage: /events/search?name=EventName
     """
     # We re-use the CRUD function we already built for validation
-    db_event = crud.get_event_by_name(db, name=name)
+    db_event = await run_db(db, crud.get_event_by_name, name=name)
     if db_event is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
     return db_event
 
 @app.get("/events/{event_id}", response_model=schemas.Event)
-def read_event_endpoint(event_id: int, db: Session = Depends(get_db)):
+async def read_event_endpoint(event_id: int, db: Session = Depends(get_db)):
     """
     API endpoint to get a single event by its ID.
     """
-    db_event = crud.get_event(db, event_id=event_id)
+    db_event = await run_db(db, crud.get_event, event_id=event_id)
     if db_event is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
     return db_event
 
 #--filter endpoints--
 @app.get("/participants/query/", response_model=List[schemas.Participant])
-def query_participants(
+async def query_participants(
     college_name: str | None = None,
     club_id: int | None = None,
     gender: schemas.Gender | None = None,
     state: str | None = None,
     city: str | None = None,
     event_id: int | None = None,
+    page: Page = Depends(page_params),
     db: Session = Depends(get_db)
 ):
     """
     API endpoint to get participants based on dynamic filters.
+    Results are paginated: follow the X-Next-Cursor header with ?cursor=.
     Usage:
     /participants/query/
     /participants/query/?college_name=SomeCollege
     /participants/query/?event_id=10&gender=Male
     /participants/query/?club_id=5&state=SomeState
+    /participants/query/?limit=500&include_total=true
     """
-    participants = crud.get_participants_by_filters(
-        db, 
+    result = await run_db(
+        db,
+        crud.get_participants_by_filters,
         college_name=college_name,
-        club_id=club_id, 
-        gender=gender, 
-        state=state, 
+        club_id=club_id,
+        gender=gender,
+        state=state,
         city=city,
-        event_id=event_id
+        event_id=event_id,
+        page=page
     )
-    return participants\
+    return orm_response(result.items, schemas.Participant, result)
     
-@app.get("/events/query/", response_model=List[schemas.Event])
-def query_events(
+def _export_participants(fmt: schemas.ExportFormat, filters: dict):
+    """
+    Generator behind /participants/export/: renders roster rows as CSV or
+    NDJSON, one chunk per cursor batch. Uses its own sync session (the
+    server-side cursor needs psycopg2) which lives as long as the stream.
+    """
+    db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=crud.EXPORT_COLUMNS)
+        if fmt == schemas.ExportFormat.csv:
+            writer.writeheader()
+
+        rows_in_buffer = 0
+        for row in crud.export_participants(db, batch_size=EXPORT_BATCH_ROWS, **filters):
+            if fmt == schemas.ExportFormat.csv:
+                writer.writerow({**row, "events": "; ".join(row["events"])})
+            else:
+                buffer.write(json.dumps(row))
+                buffer.write("\n")
+            rows_in_buffer += 1
+            if rows_in_buffer >= EXPORT_BATCH_ROWS:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                rows_in_buffer = 0
+
+        yield buffer.getvalue()
+    finally:
+        db.close()
+
+@app.get("/participants/export/")
+async def export_participants(
+    format: schemas.ExportFormat = schemas.ExportFormat.csv,
+    college_name: str | None = None,
+    club_id: int | None = None,
+    gender: schemas.Gender | None = None,
+    state: str | None = None,
+    city: str | None = None,
+    event_id: int | None = None
+):
+    """
+    Streams the full roster (participant, college, club, events, room) of
+    every participant matching the same filters as /participants/query/.
+    Output starts right away and is not paginated.
+    Usage:
+    /participants/export/?event_id=10
+    /participants/export/?format=ndjson&state=SomeState
+    """
+    filters = dict(
+        college_name=college_name, club_id=club_id, gender=gender,
+        state=state, city=city, event_id=event_id
+    )
+    if format == schemas.ExportFormat.csv:
+        media_type, filename = "text/csv", "participants.csv"
+    else:
+        media_type, filename = "application/x-ndjson", "participants.ndjson"
+
+    return StreamingResponse(
+        _export_participants(format, filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+    
+@app.get("/events/query/", response_model=List[schemas.EventWithStats])
+async def query_events(
+    response: Response,
     category: schemas.CategoryEnum | None = None,
     venue: str | None = None,
     date: date | None = None, # Make sure `from datetime import date` is at the top
+    include_stats: bool = False,
+    page: Page = Depends(page_params),
     db: Session = Depends(get_db)
 ):
     """
@@ -347,48 +617,112 @@ def query_events(
     /events/query/
     /events/query/?category=technical
     /events/query/?venue=Auditorium
+    /events/query/?include_stats=true  (embeds team_count and participant_count)
+    """
+    if include_stats:
+        result = await run_db(
+            db,
+            crud.get_events_with_stats_by_filters,
+            category=category,
+            venue=venue,
+            date=date,
+            page=page
+        )
+        set_page_headers(response, result)
+        return [
+            schemas.EventWithStats(
+                **schemas.Event.model_validate(event).model_dump(),
+                team_count=team_count,
+                participant_count=participant_count
+            )
+            for event, team_count, participant_count in result.items
+        ]
+
+    result = await run_db(
+        db,
+        crud.get_events_by_filters,
+        category=category,
+        venue=venue,
+        date=date,
+        page=page
+    )
+    set_page_headers(response, result)
+    return result.items
+
+@app.get("/events/stats/", response_model=List[schemas.EventStats])
+async def query_event_stats(
+    response: Response,
+    category: schemas.CategoryEnum | None = None,
+    venue: str | None = None,
+    date: date | None = None,
+    page: Page = Depends(page_params),
+    db: Session = Depends(get_db)
+):
     """
-    events = crud.get_events_by_filters(
-        db, 
+    API endpoint to get team and participant counts for every event
+    matching the filters, in one grouped query.
+    Usage:
+    /events/stats/
+    /events/stats/?category=cultural
+    """
+    result = await run_db(
+        db,
+        crud.get_event_stats_by_filters,
         category=category,
         venue=venue,
-        date=date
+        date=date,
+        page=page
     )
-    return events
+    set_page_headers(response, result)
+    return [
+        {
+            "event_id": event_id,
+            "team_count": team_count,
+            "participant_count": participant_count
+        }
+        for event_id, team_count, participant_count in result.items
+    ]
 
 @app.get("/colleges/query/", response_model=List[schemas.College])
-def query_colleges(
+async def query_colleges(
     city: str | None = None,
     state: str | None = None,
+    page: Page = Depends(page_params),
     db: Session = Depends(get_db)
 ):
     """
     API endpoint to get colleges based on city and/or state.
     (You already wrote the CRUD function for this!)
     """
-    colleges = crud.get_colleges_by_filters(db, city=city, state=state)
-    return colleges
+    result = await run_db(db, crud.get_colleges_by_filters, city=city, state=state, page=page)
+    return orm_response(result.items, schemas.College, result)
 
 
 @app.get("/clubs/query/", response_model=List[schemas.Club])
-def query_clubs(
+async def query_clubs(
     club_type: schemas.CategoryEnum| None = None,
+    page: Page = Depends(page_params),
     db: Session = Depends(get_db)
 ):
     """
     API endpoint to get clubs based on club type.
     (You already wrote the CRUD function for this!)
     """
-    clubs = crud.get_clubs_by_filters(db, club_type=club_type)
-    return clubs
+    result = await run_db(db, crud.get_clubs_by_filters, club_type=club_type, page=page)
+    return orm_response(result.items, schemas.Club, result)
 
 # --- Fetch all rooms with occupancy ---
 @app.get("/rooms/occupancy/", status_code=status.HTTP_200_OK)
-def get_rooms_with_occupancy(db: Session = Depends(get_db)):
+async def get_rooms_with_occupancy(
+    response: Response,
+    page: Page = Depends(page_params),
+    db: Session = Depends(get_db)
+):
     """
-    Fetch all rooms with their current occupancy count.
+    Fetch all rooms with their current occupancy count, one page at a time.
     """
-    rooms = crud.get_all_rooms_with_occupancy(db)
+    result = await run_db(db, crud.get_all_rooms_with_occupancy, page=page)
+    set_page_headers(response, result)
     return [
         {
             "room_id": room.Room.room_id,
@@ -398,102 +732,268 @@ def get_rooms_with_occupancy(db: Session = Depends(get_db)):
             "max_capacity": room.Room.max_capacity,
             "current_occupancy": room.current_occupancy
         }
-        for room in rooms
+        for room in result.items
     ]
 
 
+@app.get("/rooms/occupancy/audit/", status_code=status.HTTP_200_OK)
+async def audit_room_occupancy(db: Session = Depends(get_db)):
+    """
+    Checks every room's occupancy counter against its reservations. The
+    counters are kept by a database trigger, so "drift" should always be
+    empty; anything listed means someone changed room_occupancy by hand.
+    """
+    drift = await run_db(db, crud.audit_room_occupancy)
+    return {"ok": not drift, "drift": drift}
+
 # --- Fetch participants by room ---
 @app.get("/rooms/{room_id}/participants/", response_model=List[schemas.Participant])
-def get_participants_in_room(room_id: int, db: Session = Depends(get_db)):
+async def get_participants_in_room(
+    room_id: int,
+    page: Page = Depends(page_params),
+    db: Session = Depends(get_db)
+):
     """
-    Returns all participants assigned to a specific room.
+    Returns the participants assigned to a specific room, one page at a time.
     """
-    participants = crud.get_participants_by_room(db, room_id=room_id)
-    if not participants:
+    result = await run_db(db, crud.get_participants_by_room, room_id=room_id, page=page)
+    # An empty page after a cursor just means we ran off the end
+    if not result.items and not page.cursor:
         raise HTTPException(status_code=404, detail="No participants found in this room")
-    return participants
-
-@app.get("/events/{event_id}/teams/", status_code=status.HTTP_200_OK)
-def get_teams_for_event(event_id: int, db: Session = Depends(get_db)):
+    return orm_response(result.items, schemas.Participant, result)
+
+@app.get("/events/{event_id}/teams/", response_model=List[schemas.TeamSummary])
+async def get_teams_for_event(
+    event_id: int,
+    response: Response,
+    sort_by: schemas.TeamSortField = schemas.TeamSortField.team_id,
+    order: schemas.SortOrder = schemas.SortOrder.asc,
+    page: Page = Depends(page_params),
+    db: Session = Depends(get_db)
+):
     """
     Fetch all teams registered for a specific event with participant counts.
+    Usage:
+    /events/{event_id}/teams/
+    /events/{event_id}/teams/?sort_by=size&order=desc
+    /events/{event_id}/teams/?limit=50&cursor=<X-Next-Cursor from previous page>
     """
-    # Check if event exists
-    db_event = crud.get_event(db, event_id=event_id)
-    if not db_event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    # Get all team_events for this event
-    team_events = db.query(models.TeamEvent).filter(
-        models.TeamEvent.event_id == event_id
-    ).all()
-    
-    result = []
-    for te in team_events:
-        # Get the team
-        team = db.query(models.Team).filter(
-            models.Team.team_id == te.team_id
-        ).first()
-        
-        # Count participants in this team
-        participant_count = db.query(models.TeamMember).filter(
-            models.TeamMember.team_id == te.team_id
-        ).count()
-        
-        result.append({
-            "team_id": team.team_id,
-            "team_name": team.team_name,
-            "participant_count": participant_count
-        })
-    
-    return result
+    try:
+        result = await run_db(
+            db,
+            crud.get_teams_for_event,
+            event_id=event_id,
+            sort_by=sort_by,
+            order=order,
+            page=page
+        )
+    except InvalidCursor:
+        raise  # a 400, from its exception handler
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    set_page_headers(response, result)
+    return result.items
 
 
 # --- New endpoint: Get participants for a specific team ---
 @app.get("/teams/{team_id}/participants/", response_model=List[schemas.Participant])
-def get_team_participants(team_id: int, db: Session = Depends(get_db)):
-    team = db.query(models.Team).filter(models.Team.team_id == team_id).first()
-    if not team:
-        raise ValueError("non existent/invalid team_id")
-
-    participants = db.query(models.Participant).join(
-        models.TeamMember,
-        models.Participant.participant_id == models.TeamMember.participant_id
-    ).filter(
-        models.TeamMember.team_id == team_id
-    ).all()
+async def get_team_participants(team_id: int, db: Session = Depends(get_db)):
+    try:
+        participants = await run_db(db, crud.get_participants_from_team, team_id=team_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     
-    return participants
+    return orm_response(participants, schemas.Participant)
 
 
 # --- New endpoint: Get event statistics ---
 @app.get("/events/{event_id}/stats/", status_code=status.HTTP_200_OK)
-def get_event_stats(event_id: int, db: Session = Depends(get_db)):
+async def get_event_stats(event_id: int, db: Session = Depends(get_db)):
     """
     Get statistics for a specific event (team count, participant count).
     """
-    # Check if event exists
-    db_event = crud.get_event(db, event_id=event_id)
-    if not db_event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    team_count = db.query(models.TeamEvent).filter(
-        models.TeamEvent.event_id == event_id
-    ).count()
-    
-    # Count participants (through teams)
-    participant_count = db.query(models.Participant).join(
-        models.TeamMember,
-        models.Participant.participant_id == models.TeamMember.participant_id
-    ).join(
-        models.TeamEvent,
-        models.TeamMember.team_id == models.TeamEvent.team_id
-    ).filter(
-        models.TeamEvent.event_id == event_id
-    ).distinct().count()
+    try:
+        return await run_db(db, crud.get_event_stats, event_id=event_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
-    return {
-        "event_id": event_id,
-        "team_count": team_count,
-        "participant_count": participant_count
-    }
+
+# --- Merch distribution desk ---
+@app.post("/merch/distribute/", response_model=schemas.MerchBatchResponse)
+async def distribute_merch_batch(request: schemas.MerchBatchRequest, db: Session = Depends(get_db)):
+    """
+    Marks a batch of scanned participants as having collected their merch.
+    Idempotent: rescanned participants are reported under
+    "already_distributed", with the time of their first scan.
+    """
+    if len(request.participant_ids) > MAX_MERCH_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_MERCH_BATCH} participants per batch"
+        )
+    return await run_db(db, crud.mark_merch_distributed, participant_ids=request.participant_ids)
+
+@app.post("/merch/distribute/{participant_id}", response_model=schemas.MerchScanResponse)
+async def distribute_merch(participant_id: int, db: Session = Depends(get_db)):
+    """
+    Marks one scanned participant as having collected their merch.
+    Idempotent: a rescan returns already_distributed=true and the first scan's time.
+    """
+    result = await run_db(db, crud.mark_merch_distributed, participant_ids=[participant_id])
+    if result["not_found"]:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Participant not found")
+
+    already = bool(result["already_distributed"])
+    mark = (result["already_distributed"] or result["marked"])[0]
+    return {**mark, "already_distributed": already}
+
+@app.get("/merch/summary/", response_model=List[schemas.MerchSizeSummary])
+async def merch_summary(db: Session = Depends(get_db)):
+    """How many of each size are handed out and still pending."""
+    return await run_db(db, crud.get_merch_summary)
+
+@app.get("/merch/participants/", response_model=List[schemas.ParticipantMerchStatus])
+async def find_merch_participants(
+    response: Response,
+    phone: str | None = None,
+    email: str | None = None,
+    page: Page = Depends(page_params),
+    db: Session = Depends(get_db)
+):
+    """
+    Looks up participants at the desk by phone and/or email, with their merch status.
+    Usage:
+    /merch/participants/?phone=9876543210
+    /merch/participants/?email=someone@example.com
+    """
+    if not phone and not email:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Give a phone number or an email")
+
+    result = await run_db(db, crud.find_participants_for_merch, phone=phone, email=email, page=page)
+    set_page_headers(response, result)
+    return [
+        {
+            **schemas.Participant.model_validate(row.Participant).model_dump(),
+            "distributed": row.distributed,
+            "time_of_distribution": row.time_of_distribution
+        }
+        for row in result.items
+    ]
+
+# --- Certificates ---
+@app.post("/events/{event_id}/certificates/", response_model=schemas.CertificateIssueResponse)
+async def issue_event_certificates(
+    event_id: int,
+    certificate_type: str = Query("participation", min_length=1, max_length=50),
+    db: Session = Depends(get_db)
+):
+    """
+    Issues a certificate to every participant registered for the event who
+    doesn't have one yet. Run it again after late registrations.
+    """
+    try:
+        return await run_db(db, crud.issue_certificates, event_id=event_id, certificate_type=certificate_type)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+def _certificate_zip(event_id: int, after: int, template: dict):
+    """
+    Generator behind /events/{id}/certificates.zip: renders the event's
+    certificates on the process pool and streams them as a zip. Uses its
+    own sync session, which lives as long as the stream.
+    """
+    db = SessionLocal()
+    try:
+        rows = crud.get_certificate_rows(db, event_id=event_id, after_id=after, batch_size=CERTIFICATE_BATCH)
+        yield from certificates.stream_zip(rows, template, certificates.get_pool())
+    finally:
+        db.close()
+
+@app.get("/events/{event_id}/certificates.zip")
+async def download_event_certificates(event_id: int, after: int = 0, db: Session = Depends(get_db)):
+    """
+    Streams the event's certificates as a zip of PDFs, in certificate_id
+    order. X-Total-Count says how many it holds. Every file name starts
+    with its certificate_id: if a download breaks off, pass the last
+    complete one as ?after= to get the rest.
+    Usage:
+    /events/10/certificates.zip
+    /events/10/certificates.zip?after=51234
+    """
+    try:
+        total = await run_db(db, crud.count_certificates, event_id=event_id, after_id=after)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    return StreamingResponse(
+        _certificate_zip(event_id, after, certificates.load_template()),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="certificates-event-{event_id}.zip"',
+            "X-Total-Count": str(total)
+        }
+    )
+
+# --- Live updates ---
+@app.get("/live/")
+async def live_updates(request: Request, topic: List[str] = Query(default=list(live.TOPICS))):
+    """
+    Server-sent events with changes as they are committed: room occupancy
+    (topic=rooms) and teams added to or removed from events, with the new
+    counts (topic=events). Each event is named after the message's "type".
+    Load the tab's data once, then apply these. On a "resync" event, load
+    it again.
+    Usage:
+    new EventSource('/live/?topic=rooms')
+    """
+    unknown = set(topic) - set(live.TOPICS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown topic(s): {', '.join(sorted(unknown))}")
+
+    subscription = live.subscribe(topic)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscription.get(), LIVE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            live.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# --- Internal endpoints ---
+@app.get("/internal/pool-stats/", status_code=status.HTTP_200_OK)
+async def get_pool_stats():
+    """
+    Connection pool usage for this worker process: live checked-out/overflow
+    counts plus cumulative checkouts, wait times and timeouts since start.
+    Use it to size DB_POOL_SIZE / DB_MAX_OVERFLOW against the worker count.
+    """
+    return get_pool_status()
+
+@app.get("/internal/hash-pool-stats/", status_code=status.HTTP_200_OK)
+async def get_hash_pool_stats():
+    """
+    Password hashing pool usage for this worker process: jobs in flight,
+    queue waits and how many logins were turned away with a 503.
+    """
+    return security.hash_pool_stats.snapshot()
+
+@app.get("/internal/cache-stats/", status_code=status.HTTP_200_OK)
+async def get_cache_stats():
+    """
+    Reference data cache for this worker process, per entity type: entries,
+    hits, misses and invalidations since start.
+    """
+    return cache_stats()
@@ -1,8 +1,18 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time, Enum, Boolean, TIMESTAMP
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time, Enum, Boolean, TIMESTAMP, Index, DDL, event, func, text
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
+# The trigram indexes below need pg_trgm; make sure create_all() has it too
+event.listen(
+    Base.metadata, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+def trigram_index(name: str, column: str) -> Index:
+    """GIN trigram index, lets PostgreSQL use an index for ILIKE '%...%' on column."""
+    return Index(name, column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+
 class Fest(Base):
     __tablename__ = 'fests'
     fest_id = Column(Integer, primary_key=True)
@@ -12,8 +22,8 @@ class Fest(Base):
 class Event(Base):
     __tablename__ = 'events'
     event_id = Column(Integer, primary_key= True)
-    name = Column(String, nullable= False)
-    fest_id = Column(Integer, ForeignKey("fests.fest_id"))
+    name = Column(String, nullable= False, index=True)
+    fest_id = Column(Integer, ForeignKey("fests.fest_id"), index=True)
     category = Column(
         Enum("technical", "cultural", "managerial", name="category_enum"), nullable=False)
     venue = Column(String(256))
@@ -21,18 +31,39 @@ class Event(Base):
     time = Column(Time, nullable = False)
     max_team_size = Column(Integer, nullable= False)
 
+    __table_args__ = (
+        trigram_index("ix_events_venue_trgm", "venue"),
+    )
+
+class EventStats(Base):
+    """
+    Team/participant counts per event, kept up to date by the crud functions
+    that add or remove teams (in the same transaction). Recompute with
+    reconcile_event_stats.py if they ever drift.
+    """
+    __tablename__ = "event_stats"
+    event_id = Column(Integer, ForeignKey("events.event_id", ondelete="CASCADE"), primary_key=True)
+    team_count = Column(Integer, nullable=False, default=0, server_default="0")
+    participant_count = Column(Integer, nullable=False, default=0, server_default="0")
+
 class College(Base):
     __tablename__ = "colleges"
     college_id = Column(Integer, primary_key=True)
-    name = Column(String(150), nullable=False)
+    name = Column(String(150), nullable=False, index=True)
     city = Column(String(100))
     state = Column(String(100))
 
+    __table_args__ = (
+        trigram_index("ix_colleges_name_trgm", "name"),
+        trigram_index("ix_colleges_city_trgm", "city"),
+        trigram_index("ix_colleges_state_trgm", "state"),
+    )
+
 class Club(Base):
     __tablename__ = "clubs"
     club_id = Column(Integer, primary_key=True)
-    college_id = Column(Integer, ForeignKey("colleges.college_id"), nullable=False)
-    club_name = Column(String(100), nullable=False)
+    college_id = Column(Integer, ForeignKey("colleges.college_id"), nullable=False, index=True)
+    club_name = Column(String(100), nullable=False, index=True)
     club_type = Column(
         Enum("technical", "cultural", "managerial", name="category_enum"), nullable=False)
     poc = Column(String(100))
@@ -46,10 +77,16 @@ class Participant(Base):
     phone = Column(String(15))
     email = Column(String(100))
     merch_size = Column(Enum("S", "M", "L", "XL", "XXL", name="merch_size_enum"), nullable=False)
-    college_id = Column(Integer, ForeignKey("colleges.college_id"))
-    club_id = Column(Integer, ForeignKey("clubs.club_id"))
+    college_id = Column(Integer, ForeignKey("colleges.college_id"), index=True)
+    club_id = Column(Integer, ForeignKey("clubs.club_id"), index=True)
     gender = Column(Enum("FEMALE", "MALE", name="gender_enum"), nullable=False)
 
+    __table_args__ = (
+        # Lookups at the merch desk: by phone, or by email in any case
+        Index("ix_participants_phone", "phone"),
+        Index("ix_participants_email_lower", func.lower(email)),
+    )
+
 class Team(Base):
     __tablename__ = "teams"
     team_id = Column(Integer, primary_key=True)
@@ -58,12 +95,13 @@ class Team(Base):
 class TeamMember(Base):
     __tablename__ = "team_members"
     team_id = Column(Integer, ForeignKey("teams.team_id"), primary_key=True)
-    participant_id = Column(Integer, ForeignKey("participants.participant_id"), primary_key=True)
+    # The primary key covers lookups by team_id; this one covers participant_id
+    participant_id = Column(Integer, ForeignKey("participants.participant_id"), primary_key=True, index=True)
 
 class TeamEvent(Base):
     __tablename__ = "team_events"
     team_id = Column(Integer, ForeignKey("teams.team_id"), nullable = False, primary_key=True)
-    event_id = Column(Integer, ForeignKey("events.event_id"), nullable=False, primary_key = True)
+    event_id = Column(Integer, ForeignKey("events.event_id"), nullable=False, primary_key = True, index=True)
 
     
 class OrganiserEvent(Base):
@@ -91,8 +129,8 @@ class MerchDistribution(Base):
 class Certificate(Base):
     __tablename__ = "certificates"
     certificate_id = Column(Integer, primary_key=True)
-    participant_id = Column(Integer, ForeignKey("participants.participant_id", ondelete="CASCADE"), nullable=False)
-    event_id = Column(Integer, ForeignKey("events.event_id"), nullable=False)
+    participant_id = Column(Integer, ForeignKey("participants.participant_id", ondelete="CASCADE"), nullable=False, index=True)
+    event_id = Column(Integer, ForeignKey("events.event_id"), nullable=False, index=True)
     certificate_type = Column(String(50))
 
 class Room(Base):
@@ -102,13 +140,124 @@ class Room(Base):
     room_no = Column(String(20))
     gender = Column(Enum("FEMALE", "MALE", name="gender_enum"), nullable=False)
     max_capacity = Column(Integer)
+    # current_occupancy < max_capacity, kept by the room_occupancy triggers
+    # below; never written by the app
+    has_space = Column(Boolean, nullable=False, server_default=text("true"))
+
+    __table_args__ = (
+        Index("ix_rooms_building_name_room_no", "building_name", "room_no"),
+        # Rooms of one gender with a free bed, in room_id order (room
+        # allocation locks these). Full rooms drop out of the index.
+        Index("ix_rooms_gender_with_space", "gender", "room_id",
+              postgresql_where=text("has_space")),
+    )
 
 class RoomOccupancy(Base):
+    """
+    Beds taken per room. Written only by the room_reserved triggers below
+    (and create_room, which adds the row at 0); audit with
+    crud.audit_room_occupancy.
+    """
     __tablename__ = "room_occupancy"
     room_id = Column(Integer, ForeignKey("rooms.room_id"), primary_key=True)
     current_occupancy = Column(Integer, default=0)
 
+    __table_args__ = (
+        # Room allocation wants the least occupied rooms first: walking this
+        # index lets it stop after the few rooms it needs
+        Index("ix_room_occupancy_current_occupancy", "current_occupancy", "room_id"),
+    )
+
 class RoomReserved(Base):
     __tablename__ = "room_reserved"
     participant_id = Column(Integer, ForeignKey("participants.participant_id", ondelete="CASCADE"), primary_key=True)
-    room_id = Column(Integer, ForeignKey("rooms.room_id"), nullable = False)
\ No newline at end of file
+    room_id = Column(Integer, ForeignKey("rooms.room_id"), nullable = False, index=True)
+
+# --- room_occupancy is maintained by the database ---
+# Every INSERT, DELETE or room change on room_reserved adjusts
+# room_occupancy.current_occupancy in the same transaction, so the counter
+# can't drift from the reservations (cascaded deletes included). These are
+# statement-level triggers: a multi-row INSERT does one grouped upsert,
+# taking the room rows in room_id order.
+ROOM_OCCUPANCY_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION room_reserved_sync_occupancy() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO room_occupancy (room_id, current_occupancy)
+            SELECT room_id, count(*) FROM new_rows GROUP BY room_id ORDER BY room_id
+            ON CONFLICT (room_id) DO UPDATE
+            SET current_occupancy = room_occupancy.current_occupancy + EXCLUDED.current_occupancy;
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE room_occupancy o SET current_occupancy = o.current_occupancy - d.n
+            FROM (SELECT room_id, count(*) AS n FROM old_rows GROUP BY room_id ORDER BY room_id) d
+            WHERE o.room_id = d.room_id;
+        ELSE
+            UPDATE room_occupancy o SET current_occupancy = o.current_occupancy + d.n
+            FROM (
+                SELECT room_id, sum(n) AS n FROM (
+                    SELECT room_id, 1 AS n FROM new_rows
+                    UNION ALL
+                    SELECT room_id, -1 AS n FROM old_rows
+                ) moves
+                GROUP BY room_id HAVING sum(n) <> 0 ORDER BY room_id
+            ) d
+            WHERE o.room_id = d.room_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER room_reserved_occupancy_insert AFTER INSERT ON room_reserved
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION room_reserved_sync_occupancy()
+    """,
+    """
+    CREATE TRIGGER room_reserved_occupancy_delete AFTER DELETE ON room_reserved
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION room_reserved_sync_occupancy()
+    """,
+    """
+    CREATE TRIGGER room_reserved_occupancy_update AFTER UPDATE ON room_reserved
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION room_reserved_sync_occupancy()
+    """,
+]
+
+for _statement in ROOM_OCCUPANCY_TRIGGERS:
+    event.listen(RoomReserved.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+
+# --- rooms.has_space is maintained by the database ---
+# Every change to room_occupancy (the room_reserved triggers, create_room,
+# occupancy repairs) recomputes rooms.has_space for the rooms it touched,
+# only writing the rows whose flag actually flips.
+ROOM_HAS_SPACE_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION room_occupancy_sync_has_space() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE rooms r SET has_space = coalesce(n.current_occupancy, 0) < coalesce(r.max_capacity, 0)
+        FROM (SELECT room_id, current_occupancy FROM new_rows ORDER BY room_id) n
+        WHERE r.room_id = n.room_id
+          AND r.has_space <> (coalesce(n.current_occupancy, 0) < coalesce(r.max_capacity, 0));
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER room_occupancy_has_space_insert AFTER INSERT ON room_occupancy
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION room_occupancy_sync_has_space()
+    """,
+    """
+    CREATE TRIGGER room_occupancy_has_space_update AFTER UPDATE ON room_occupancy
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION room_occupancy_sync_has_space()
+    """,
+]
+
+for _statement in ROOM_HAS_SPACE_TRIGGERS:
+    event.listen(RoomOccupancy.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
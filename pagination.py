@@ -0,0 +1,115 @@
+import base64
+import json
+from typing import Any, List, NamedTuple
+
+from fastapi import Query, Response
+
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends back a cursor we can't use."""
+    pass
+
+
+def encode_cursor(*values) -> str:
+    """
+    Packs the sort key(s) of the last row on a page into an opaque,
+    URL-safe token that the client sends back to get the next page.
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _is_a(value, expected: type) -> bool:
+    # bool is a subclass of int, but true/false is never a valid int key
+    if expected is int and isinstance(value, bool):
+        return False
+    return isinstance(value, expected)
+
+
+def decode_cursor(token: str, *types: type) -> list:
+    """
+    Reverses encode_cursor. Raises ValueError if the token was tampered
+    with or did not come from us.
+
+    Pass the expected type of each value (e.g. `int` for a primary key)
+    to have the cursor checked against them too, so a forged cursor is
+    rejected here instead of failing in the database.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+
+    if not isinstance(values, list) or not values:
+        raise InvalidCursor("Invalid cursor")
+    if types and (len(values) != len(types) or not all(map(_is_a, values, types))):
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+class Page(NamedTuple):
+    """What the client asked for: how many rows, starting after which cursor."""
+    limit: int
+    cursor: str | None = None
+    include_total: bool = False
+
+
+class PageResult(NamedTuple):
+    """One page of rows plus the token for the next page (None on the last page)."""
+    items: List[Any]
+    next_cursor: str | None
+    total: int | None = None
+
+
+def page_params(
+    limit: int | None = Query(None, ge=1),
+    cursor: str | None = None,
+    include_total: bool = False
+) -> Page:
+    """
+    FastAPI dependency shared by all list endpoints.
+    ?limit= is clamped to MAX_PAGE_SIZE instead of being rejected.
+    """
+    return Page(
+        limit=min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE),
+        cursor=cursor,
+        include_total=include_total
+    )
+
+
+def paginate(query, key_column, page: Page, key_of=None) -> PageResult:
+    """
+    Keyset-paginates a query on a single, unique, increasing column
+    (normally the primary key): WHERE key > last_key ORDER BY key LIMIT n.
+
+    key_of extracts the key from a result row; by default the attribute
+    with the column's name is used.
+    """
+    if key_of is None:
+        key_of = lambda row: getattr(row, key_column.key)
+
+    # The total ignores the cursor so it stays the same on every page
+    total = query.order_by(None).count() if page.include_total else None
+
+    if page.cursor:
+        values = decode_cursor(page.cursor, key_column.type.python_type)
+        query = query.filter(key_column > values[0])
+
+    # Fetch one extra row to find out whether another page exists
+    rows = query.order_by(key_column.asc()).limit(page.limit + 1).all()
+    if len(rows) <= page.limit:
+        return PageResult(rows, None, total)
+
+    rows = rows[:page.limit]
+    return PageResult(rows, encode_cursor(key_of(rows[-1])), total)
+
+
+def set_page_headers(response: Response, result: PageResult):
+    """Exposes the cursor and total of a page as response headers."""
+    if result.next_cursor:
+        response.headers["X-Next-Cursor"] = result.next_cursor
+    if result.total is not None:
+        response.headers["X-Total-Count"] = str(result.total)
@@ -0,0 +1,46 @@
+"""
+Recounts teams and participants per event and compares them with the
+event_stats counters. Prints every event that drifted; --fix writes the
+recounted values back. Exits 1 if drift was found (and not fixed).
+
+Usage:
+    python reconcile_event_stats.py
+    python reconcile_event_stats.py --fix
+"""
+import argparse
+import sys
+
+import crud
+from database import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fix", action="store_true", help="write the recounted values to event_stats")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        drift = crud.reconcile_event_stats(db, fix=args.fix)
+    finally:
+        db.close()
+
+    for item in drift:
+        stored = item["stored"] or ("-", "-")
+        counted = item["counted"]
+        print(
+            f"event {item['event_id']}: teams {stored[0]} -> {counted[0]}, "
+            f"participants {stored[1]} -> {counted[1]}"
+        )
+
+    if not drift:
+        print("event_stats is in sync")
+    elif args.fix:
+        print(f"fixed {len(drift)} event(s)")
+    else:
+        print(f"{len(drift)} event(s) drifted; run with --fix to correct them")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ from pydantic import BaseModel, EmailStr, field_validator
 from enum import Enum
 import re
 from typing import List
-from datetime import date, time
+from datetime import date, datetime, time
 
 class FestBase(BaseModel):
     name: str
@@ -60,6 +60,26 @@ class UserLogin(BaseModel):
     username: str
     password: str
 
+class TokenPair(BaseModel):
+    """Signed session tokens; send the access token as `Authorization: Bearer`."""
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int  # seconds until the access token expires
+
+class UserLoginResponse(User, TokenPair):
+    """Schema returned by a successful login: the user plus their tokens."""
+    pass
+
+class TokenRefreshRequest(BaseModel):
+    refresh_token: str
+
+class CurrentUser(BaseModel):
+    """The caller as seen by a protected endpoint (taken from the token)."""
+    user_id: int
+    username: str
+    role: UserRole
+
 
 # --- Participant, Team, and Schemas ---
 class Gender(str, Enum):
@@ -112,6 +132,64 @@ class FullTeamResponse(Team):
     event_id: int
     members: List[Participant]
 
+class BulkTeamCreateRequest(BaseModel):
+    """
+    Schema for the bulk registration endpoint: many teams in one request.
+    """
+    teams: List[TeamCreateRequest]
+
+class BulkTeamResult(BaseModel):
+    """
+    Outcome for one team of a bulk registration, in request order.
+    """
+    index: int
+    team_name: str
+    team_id: int | None = None
+    error: str | None = None
+
+class BulkTeamCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkTeamResult]
+
+class ImportRowError(BaseModel):
+    """
+    One rejected row of a participant import (rows are numbered from 1,
+    not counting the CSV header).
+    """
+    row: int
+    team_name: str | None = None
+    error: str
+
+class ParticipantImportResponse(BaseModel):
+    rows: int
+    teams_created: int
+    participants_created: int
+    rejected: int
+    errors: List[ImportRowError]
+
+class TeamSummary(BaseModel):
+    """
+    One row of an event's team listing: the team and how many members it has.
+    """
+    team_id: int
+    team_name: str
+    participant_count: int
+
+class TeamSortField(str, Enum):
+    """Columns the event team listing can be sorted by."""
+    team_id = "team_id"
+    name = "name"
+    size = "size"
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
 class TeamDeleteResponse(BaseModel):
     """
     Response model for a successful team deletion.
@@ -120,6 +198,54 @@ class TeamDeleteResponse(BaseModel):
     team_name: str
     message: str
 
+class EventTeamsDeleteResponse(BaseModel):
+    """
+    Response model for deleting every team of an event.
+    """
+    event_id: int
+    teams_deleted: int
+    participants_deleted: int
+    message: str
+
+
+# --- Certificates ---
+class CertificateIssueResponse(BaseModel):
+    """
+    Response model for issuing an event's certificates.
+    """
+    event_id: int
+    certificate_type: str
+    issued: int
+    total: int
+
+
+# --- Merch distribution ---
+class MerchBatchRequest(BaseModel):
+    participant_ids: List[int]
+
+class MerchMark(BaseModel):
+    participant_id: int
+    time_of_distribution: datetime
+
+class MerchBatchResponse(BaseModel):
+    """Outcome of a batch of scans; marking is idempotent, so rescans are harmless."""
+    marked: List[MerchMark]               # newly marked by this call
+    already_distributed: List[MerchMark]  # marked earlier (time of the first scan)
+    not_found: List[int]
+
+class MerchScanResponse(MerchMark):
+    already_distributed: bool
+
+class MerchSizeSummary(BaseModel):
+    merch_size: str
+    total: int
+    distributed: int
+    pending: int
+
+class ParticipantMerchStatus(Participant):
+    distributed: bool
+    time_of_distribution: datetime | None = None
+
 
 #-- College schema--
 class CollegeBase(BaseModel):
@@ -213,4 +339,15 @@ class Event(EventBase):
     event_id: int
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class EventStats(BaseModel):
+    """Team and participant counts for a single event"""
+    event_id: int
+    team_count: int
+    participant_count: int
+
+class EventWithStats(Event):
+    """An event with its counts embedded (only filled when requested)"""
+    team_count: int | None = None
+    participant_count: int | None = None
@@ -1,8 +1,25 @@
 from passlib.context import CryptContext
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+import asyncio
+import base64
 import hashlib
+import hmac
+import json
+import threading
+import time
 
-# Use bcrypt for password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from config import (
+    BCRYPT_ROUNDS, HASH_WORKERS, HASH_QUEUE_LIMIT,
+    TOKEN_SECRET, ACCESS_TOKEN_TTL, REFRESH_TOKEN_TTL, TOKEN_CACHE_SIZE
+)
+
+# Use bcrypt for password hashing. Stored hashes with a different cost
+# count as outdated, so verify_and_update() rehashes them at login.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 def _prehash_password(password: str) -> str:
     """
@@ -18,8 +35,258 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     prehashed_plain = _prehash_password(plain_password)
     return pwd_context.verify(prehashed_plain, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verifies a password and, if it's correct but was hashed with another
+    bcrypt cost, also returns a new hash to store (otherwise None).
+    """
+    prehashed_plain = _prehash_password(plain_password)
+    return pwd_context.verify_and_update(prehashed_plain, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """Hashes a plain-text password."""
     # Pre-hash the password *before* storing
     prehashed_pass = _prehash_password(password)
-    return pwd_context.hash(prehashed_pass)
\ No newline at end of file
+    return pwd_context.hash(prehashed_pass)
+
+
+# --- Hashing pool ---
+# bcrypt is deliberately slow and CPU-bound. Running it in the request
+# threadpool lets a burst of logins take every slot and stall unrelated
+# endpoints, so hashing gets its own small pool (bcrypt releases the GIL
+# while it works) with a cap on how many jobs may wait for it.
+
+class HashPoolBusy(Exception):
+    """Raised when HASH_QUEUE_LIMIT hashing jobs are already pending."""
+
+
+class HashPoolStats:
+    """Counters for the hashing pool, read through /internal/hash-pool-stats/."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.in_flight = 0          # queued + running right now
+            self.max_in_flight = 0
+            self.completed = 0
+            self.rejected = 0           # turned away because the queue was full
+            self.total_queue_wait = 0.0 # seconds
+            self.max_queue_wait = 0.0   # seconds
+            self.total_run = 0.0        # seconds
+
+    def try_enter(self) -> bool:
+        with self._lock:
+            if self.in_flight >= HASH_QUEUE_LIMIT:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return True
+
+    def leave(self, queue_wait: float, run: float):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_queue_wait += queue_wait
+            self.max_queue_wait = max(self.max_queue_wait, queue_wait)
+            self.total_run += run
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": HASH_WORKERS,
+                "queue_limit": HASH_QUEUE_LIMIT,
+                "bcrypt_rounds": BCRYPT_ROUNDS,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_queue_wait_ms": round(self.total_queue_wait / self.completed * 1000, 3) if self.completed else 0.0,
+                "max_queue_wait_ms": round(self.max_queue_wait * 1000, 3),
+                "avg_run_ms": round(self.total_run / self.completed * 1000, 3) if self.completed else 0.0,
+            }
+
+
+hash_pool_stats = HashPoolStats()
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+
+async def _run_in_hash_pool(fn, *args):
+    """Runs fn(*args) on the hashing pool, or raises HashPoolBusy if it's full."""
+    if not hash_pool_stats.try_enter():
+        raise HashPoolBusy("Too many logins in progress, try again shortly")
+
+    submitted = time.perf_counter()
+
+    # The slot is released by whichever side finishes the job: the job itself
+    # once it has run, or the done-callback if it was cancelled while queued.
+    # Cancelling the await doesn't stop a job that is already running, so the
+    # slot stays taken until the thread is actually free.
+    def job():
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            hash_pool_stats.leave(started - submitted, time.perf_counter() - started)
+
+    def release_if_cancelled(future):
+        if future.cancelled():  # never started, so job() won't release it
+            hash_pool_stats.leave(time.perf_counter() - submitted, 0.0)
+
+    future = _hash_executor.submit(job)
+    future.add_done_callback(release_if_cancelled)
+    return await asyncio.wrap_future(future)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """verify_and_update_password() on the hashing pool."""
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash() on the hashing pool."""
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+# --- Session tokens ---
+# Tokens are base64url(JSON payload) + "." + base64url(HMAC-SHA256 of it).
+# Access tokens carry everything an endpoint needs (user id, username,
+# role), so checking one is a hash and a dict lookup: no database, no
+# bcrypt. They are short-lived; the long-lived refresh token is exchanged
+# for a new pair at /auth/refresh/, which is the only place the user is
+# re-read from the database.
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+class InvalidToken(ValueError):
+    """Raised for a token that is malformed, forged, expired or of the wrong type."""
+
+
+class CurrentUser(NamedTuple):
+    """The caller, as resolved from their access token."""
+    user_id: int
+    username: str
+    role: str
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(TOKEN_SECRET.encode(), payload.encode(), hashlib.sha256).digest())
+
+def create_token(user_id: int, username: str, role: str, token_type: str) -> str:
+    """Issues a signed access or refresh token for a user."""
+    now = int(time.time())
+    ttl = ACCESS_TOKEN_TTL if token_type == ACCESS else REFRESH_TOKEN_TTL
+    payload = _b64encode(json.dumps(
+        {"sub": user_id, "usr": username, "role": role, "typ": token_type, "iat": now, "exp": now + ttl},
+        separators=(",", ":")
+    ).encode())
+    return f"{payload}.{_sign(payload)}"
+
+def decode_token(token: str, token_type: str) -> dict:
+    """Checks a token's signature, type and expiry and returns its payload."""
+    try:
+        payload, signature = token.split(".")
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    # Compare bytes: compare_digest refuses str with non-ASCII characters,
+    # and headers arrive decoded as latin-1
+    if not hmac.compare_digest(signature.encode("utf-8"), _sign(payload).encode()):
+        raise InvalidToken("Invalid token signature")
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    if claims.get("typ") != token_type:
+        raise InvalidToken(f"Wrong token type (expected {token_type})")
+    if claims.get("exp", 0) <= time.time():
+        raise InvalidToken("Token expired")
+    return claims
+
+
+class _TokenCache:
+    """
+    LRU of verified access tokens -> (CurrentUser, expiry), so repeat calls
+    with the same token skip signature checking and JSON parsing.
+    """
+
+    def __init__(self, max_size: int):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.max_size = max_size
+
+    def get(self, token: str):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return entry[0]
+
+    def put(self, token: str, user: CurrentUser, expires: float):
+        with self._lock:
+            self._entries[token] = (user, expires)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = _TokenCache(TOKEN_CACHE_SIZE)
+_bearer = HTTPBearer(auto_error=False)
+
+def resolve_access_token(token: str) -> CurrentUser:
+    """Turns an access token into the CurrentUser it was issued for."""
+    user = token_cache.get(token)
+    if user is None:
+        claims = decode_token(token, ACCESS)
+        user = CurrentUser(user_id=claims["sub"], username=claims["usr"], role=claims["role"])
+        token_cache.put(token, user, claims["exp"])
+    return user
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer)
+) -> CurrentUser:
+    """
+    Dependency for protected endpoints: resolves the caller from the
+    `Authorization: Bearer <access token>` header, or answers 401.
+    `async` because nothing here blocks: a plain `def` would cost a
+    threadpool hop on every protected call.
+    """
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        return resolve_access_token(credentials.credentials)
+    except InvalidToken as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+def require_role(*roles: str):
+    """
+    Dependency factory restricting an endpoint to some roles, e.g.
+    `Depends(require_role("Admin", "Coordinator"))`.
+    """
+    async def dependency(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+        if user.role not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed for your role")
+        return user
+    return dependency
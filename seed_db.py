@@ -55,6 +55,65 @@ def random_name(gender=None):
     return f"{first} {last}"
 
 
+# --------------------------------
+#       SEED DATA
+# --------------------------------
+# (also used by benchmarks/load_test.py)
+
+COLLEGES = [
+    {"name": "Indian Institute of Technology Bombay", "city": "Mumbai", "state": "Maharashtra"},
+    {"name": "Indian Institute of Technology Delhi", "city": "New Delhi", "state": "Delhi"},
+    {"name": "Indian Institute of Science Bangalore", "city": "Bengaluru", "state": "Karnataka"},
+    {"name": "Birla Institute of Technology and Science Pilani", "city": "Pilani", "state": "Rajasthan"},
+    {"name": "National Institute of Technology Tiruchirappalli", "city": "Tiruchirappalli", "state": "Tamil Nadu"},
+    {"name": "Anna University", "city": "Chennai", "state": "Tamil Nadu"},
+    {"name": "Jadavpur University", "city": "Kolkata", "state": "West Bengal"},
+    {"name": "Delhi Technological University", "city": "New Delhi", "state": "Delhi"},
+]
+
+CLUB_TEMPLATES = [
+    ("Coding Club", "technical"),
+    ("Dance Club", "cultural"),
+    ("Robotics Club", "technical"),
+    ("Music Club", "cultural"),
+    ("Literary Club", "managerial")
+]
+
+EVENTS = {
+    "callidus": ("technical", "2025-12-01", "10:00:00", 4, "Auditorium A"),
+    "parivesh": ("cultural", "2025-12-02", "18:00:00", 5, "Open Stage"),
+    "hackatron": ("technical", "2025-12-03", "09:00:00", 4, "Lab 1"),
+    "hardwired": ("technical", "2025-12-04", "09:30:00", 4, "Hardware Lab")
+}
+
+MERCH_SIZES = ["S", "M", "L", "XL"]
+
+def random_participant(colleges, clubs, used_emails: set):
+    """A participant payload for /teams/add_to_event/ with an email not in used_emails."""
+    gender = random.choice(["MALE", "FEMALE"])
+    college = random.choice(colleges)
+    club_choice = random.choice(clubs) if clubs and random.random() < 0.5 else None
+    club_id = club_choice["club_id"] if club_choice else None
+
+    name = random_name(gender)
+    email = f"{name.lower().replace(' ', '.')}@example.com"
+    cnt = 1
+    while email in used_emails:
+        email = f"{name.lower().replace(' ', '.')}{cnt}@example.com"
+        cnt += 1
+    used_emails.add(email)
+
+    return {
+        "name": name,
+        "phone": f"9{random.randint(100000000, 999999999)}"[:10],
+        "email": email,
+        "merch_size": random.choice(MERCH_SIZES),
+        "college_id": college["college_id"],
+        "club_id": club_id,
+        "gender": gender
+    }
+
+
 # --------------------------------
 #       CREATION HELPERS
 # --------------------------------
@@ -94,29 +153,10 @@ def create_rooms():
     return rooms
 
 def create_colleges_and_clubs():
-    colleges = [
-        {"name": "Indian Institute of Technology Bombay", "city": "Mumbai", "state": "Maharashtra"},
-        {"name": "Indian Institute of Technology Delhi", "city": "New Delhi", "state": "Delhi"},
-        {"name": "Indian Institute of Science Bangalore", "city": "Bengaluru", "state": "Karnataka"},
-        {"name": "Birla Institute of Technology and Science Pilani", "city": "Pilani", "state": "Rajasthan"},
-        {"name": "National Institute of Technology Tiruchirappalli", "city": "Tiruchirappalli", "state": "Tamil Nadu"},
-        {"name": "Anna University", "city": "Chennai", "state": "Tamil Nadu"},
-        {"name": "Jadavpur University", "city": "Kolkata", "state": "West Bengal"},
-        {"name": "Delhi Technological University", "city": "New Delhi", "state": "Delhi"},
-    ]
-
     created_colleges = []
     created_clubs = []
-    club_templates = [
-        ("Coding Club", "technical"),
-        ("Dance Club", "cultural"),
-        ("Robotics Club", "technical"),
-        ("Music Club", "cultural"),
-        ("Literary Club", "managerial")
-    ]
-
     poc_base_phone = 9000000000
-    for idx, c in enumerate(colleges):
+    for idx, c in enumerate(COLLEGES):
         r = post("/colleges/", c)
         r.raise_for_status()
         college_obj = r.json()
@@ -124,7 +164,7 @@ def create_colleges_and_clubs():
         college_id = college_obj["college_id"]
 
         for j in range(3):
-            tpl = club_templates[(idx + j) % len(club_templates)]
+            tpl = CLUB_TEMPLATES[(idx + j) % len(CLUB_TEMPLATES)]
             suffix = random.randint(10, 99)
             base_prefix = college_obj['name'].split()[0][:10]
             club_payload = {
@@ -144,14 +184,8 @@ def create_colleges_and_clubs():
     return created_colleges, created_clubs
 
 def create_events(fest_id: int):
-    events = {
-        "callidus": ("technical", "2025-12-01", "10:00:00", 4, "Auditorium A"),
-        "parivesh": ("cultural", "2025-12-02", "18:00:00", 5, "Open Stage"),
-        "hackatron": ("technical", "2025-12-03", "09:00:00", 4, "Lab 1"),
-        "hardwired": ("technical", "2025-12-04", "09:30:00", 4, "Hardware Lab")
-    }
     created_events = {}
-    for name, (category, date, time_s, max_size, venue) in events.items():
+    for name, (category, date, time_s, max_size, venue) in EVENTS.items():
         payload = {
             "name": name,
             "fest_id": fest_id,
@@ -169,7 +203,6 @@ def create_events(fest_id: int):
 
 def create_teams_for_events(events, colleges, clubs):
     team_count = 12
-    merch_sizes = ["S", "M", "L", "XL"]
     used_emails = set()
 
     for ev_name, ev in events.items():
@@ -180,32 +213,7 @@ def create_teams_for_events(events, colleges, clubs):
         for tnum in range(1, team_count + 1):
             team_name = f"{ev_name}_team_{tnum}"
             size = random.randint(1, max_size)
-            participants = []
-
-            for i in range(size):
-                gender = random.choice(["MALE", "FEMALE"])
-                college = random.choice(colleges)
-                club_choice = random.choice(clubs) if random.random() < 0.5 else None
-                club_id = club_choice["club_id"] if club_choice else None
-
-                name = random_name(gender)
-                email = f"{name.lower().replace(' ', '.')}@example.com"
-                cnt = 1
-                while email in used_emails:
-                    email = f"{name.lower().replace(' ', '.')}{cnt}@example.com"
-                    cnt += 1
-                used_emails.add(email)
-
-                participant = {
-                    "name": name,
-                    "phone": f"9{random.randint(100000000, 999999999)}"[:10],
-                    "email": email,
-                    "merch_size": random.choice(merch_sizes),
-                    "college_id": college["college_id"],
-                    "club_id": club_id,
-                    "gender": gender
-                }
-                participants.append(participant)
+            participants = [random_participant(colleges, clubs, used_emails) for _ in range(size)]
 
             payload = {"team_name": team_name, "event_id": ev_id, "participants": participants}
             r = post("/teams/add_to_event/", payload)
@@ -0,0 +1,152 @@
+"""
+Per-request SQL statement counts and database time.
+
+QueryTimingMiddleware gives every HTTP request a RequestQueries tally. Two
+SQLAlchemy engine listeners (see instrument()) add each statement and the
+time it took to that tally. The response then carries
+
+    Server-Timing: db;dur=12.4;desc="7 queries"
+
+which browser dev tools show next to the request. When a request runs more
+statements than SQL_QUERY_BUDGET, a warning is logged with the statement
+that repeated the most, normalised into a fingerprint. That is usually an
+N+1 query loop.
+
+The listeners return at once when no request is active (scripts, alembic,
+background work). During a request they only take two perf_counter() calls
+and bump a Counter keyed on the statement string. SQLAlchemy's compiled
+cache hands back the same string object for every run of the same query,
+so the key's hash is cached. Fingerprints are only built when a warning is
+actually logged.
+
+The tally lives in a ContextVar. Starlette's threadpool (sync mode) and
+SQLAlchemy's greenlets (async mode) both run with a copy of the request's
+context, so they see the same RequestQueries object. Statements run by a
+streamed body after the headers went out still count towards the budget,
+but they are not in the header.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar = ContextVar("request_queries", default=None)
+
+# Literals and parameter lists, so the same query with different values
+# gives the same fingerprint
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+|\?")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """A statement with its literals and bound parameters replaced by `?`."""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _PARAMETER.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PARAMETER_LIST.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class RequestQueries:
+    """Statements run on behalf of one request."""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.statements = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def most_repeated(self) -> tuple:
+        """(fingerprint, times run) of the statement run the most often."""
+        repeats = Counter()
+        for statement, times in self.statements.items():
+            repeats[fingerprint(statement)] += times
+        return repeats.most_common(1)[0] if repeats else ("", 0)
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _current.get()
+    if queries is None:
+        return
+    started = conn.info.get("query_started")
+    if not started:
+        return  # the statement started before the request did
+    queries.record(statement, time.perf_counter() - started.pop())
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute: drop its start time
+    connection = exception_context.connection
+    if connection is not None and _current.get() is not None:
+        started = connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def instrument(engine):
+    """
+    Attaches the listeners to an Engine. Pass async_engine.sync_engine for
+    an AsyncEngine. Calling it twice on the same engine is harmless.
+    """
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(engine, name, listener):
+            event.listen(engine, name, listener)
+
+
+class QueryTimingMiddleware:
+    def __init__(self, app, budget: int):
+        self.app = app
+        self.budget = budget  # statements per request; 0 turns the warning off
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        queries = RequestQueries()
+        token = _current.set(queries)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", queries.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if self.budget and queries.count > self.budget:
+                statement, times = queries.most_repeated()
+                logger.warning(
+                    "%s %s ran %d SQL statements (budget %d) in %.1f ms; "
+                    "most frequent (%d of them): %s",
+                    scope["method"], scope["path"], queries.count, self.budget,
+                    queries.duration * 1000, times, statement,
+                )